@@ -5,6 +5,11 @@ Lancer :  streamlit run app/streamlit_app.py
 Outil d'exploration et de formation, PAS un outil de diagnostic valide.
 Le tableau de bord affiche M(t) avec bande d'incertitude et D(t) comme
 indicateur avance, plutot que M(t) seul.
+
+Les simulations passent par un cache LRU (mcs.cache) partage entre les
+reexecutions du script : revenir a une position de curseur deja vue ne
+relance pas la simulation. Les trajectoires vont aux graphiques en
+tableaux NumPy, sans DataFrame intermediaire.
 """
 
 import sys
@@ -12,12 +17,24 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-import pandas as pd
 import streamlit as st
 
-from mcs import (ControlParams, RecoveryParams, SimConfig, ThetaParams,
-                 core, simulate)
+from mcs import (ZONES, ControlParams, RecoveryParams, SimConfig,
+                 ThetaParams, margin_uncertainty)
+from mcs.cache import ScenarioCache, SimulationCache
 from mcs.scenarios import ALL_SCENARIOS
+from mcs.uncertainty import monte_carlo_bands
+
+
+@st.cache_resource
+def simulation_cache() -> SimulationCache:
+    return SimulationCache(maxsize=256)
+
+
+@st.cache_resource
+def scenario_cache() -> ScenarioCache:
+    return ScenarioCache(ALL_SCENARIOS)
+
 
 st.set_page_config(page_title="MCS - Indice de Marge Systemique",
                    layout="wide")
@@ -70,49 +87,53 @@ with st.sidebar:
 
     st.header("Incertitude")
     err = st.slider("Erreur relative des proxys (%)", 0, 30, 10) / 100.0
+    use_mc = st.checkbox("Bandes Monte-Carlo (5 %-95 %, 2000 tirages)")
 
 cfg = SimConfig(L=L, R=R, B=B, theta0=theta0, D0=D0, rho=rho, s=s,
                 mu0=mu0, gamma=gamma, D_crit=0.6,
                 theta_params=tp, control=cp, recovery=rp)
-res = simulate(cfg, n_steps)
+res = simulation_cache().simulate(cfg, n_steps)
 
-df = pd.DataFrame(res.to_dict()).set_index("t")
-df["dM"] = [core.margin_uncertainty(m, a, c, rel_err_R=err, rel_err_B=err)
-            for m, a, c in zip(df["M"], df["A"], df["C"])]
-df["M_lo"], df["M_hi"] = df["M"] - df["dM"], df["M"] + df["dM"]
+# incertitude au premier ordre (erreurs sur R et B) sur toute la trajectoire
+dM = margin_uncertainty(res.M, res.A, res.C, rel_err_R=err, rel_err_B=err)
+M_lo, M_hi = res.M - dM, res.M + dM
+if use_mc:
+    # erreurs tirees a chaque pas et propagees par la dette
+    bands = monte_carlo_bands(cfg, n_steps, n_draws=2000, rel_err_R=err,
+                              rel_err_B=err, quantiles=(0.05, 0.95))
+    M_lo, M_hi = bands.M
 
 c1, c2 = st.columns(2)
 with c1:
     st.subheader("Indice de Marge Systemique M(t)")
-    st.line_chart(df[["M", "M_lo", "M_hi"]],
+    st.line_chart({"M": res.M, "M_lo": M_lo, "M_hi": M_hi},
                   color=["#1f77b4", "#c0c0c0", "#c0c0c0"])
     st.caption("Zones pedagogiques : viable > 0.30 | tension > 0.10 | "
                "saturation > 0.05 | pre-rupture [-0.05, 0.05] | rupture < -0.05")
 with c2:
     st.subheader("Dette invisible D(t) - indicateur avance")
-    st.line_chart(df[["D"]], color=["#d62728"])
+    st.line_chart({"D": res.D}, color=["#d62728"])
 
 c3, c4 = st.columns(2)
 with c3:
     st.subheader("Capacite C(t) vs charge totale A(t)")
-    st.line_chart(df[["A", "C"]])
+    st.line_chart({"A": res.A, "C": res.C})
 with c4:
     st.subheader("Etats internes")
-    st.line_chart(df[["R_eff", "B_eff", "theta", "U"]])
+    st.line_chart({"R_eff": res.R_eff, "B_eff": res.B_eff,
+                   "theta": res.theta, "U": res.U})
 
-last = df.iloc[-1]
-zone = res.zone[-1].value.replace("_", " ")
+zone = ZONES[res.zone[-1]].value.replace("_", " ")
 st.metric("Zone finale (avec hysteresis)", zone,
-          delta=f"M = {last['M']:.3f} +/- {last['dM']:.3f}")
+          delta=f"M = {res.M[-1]:.3f} +/- {dM[-1]:.3f}")
 
 st.divider()
 st.subheader("Scenarios pedagogiques (§ 7)")
 name = st.selectbox("Charger un scenario", ["-"] + list(ALL_SCENARIOS))
 if name != "-":
-    out = ALL_SCENARIOS[name]()
+    out = scenario_cache()[name]      # calcule a la premiere demande
     if isinstance(out, list):     # reseau couple
-        for i, r in enumerate(out):
-            st.line_chart(pd.DataFrame({"M": r.M, "D": r.D}),
-                          height=200)
+        for r in out:
+            st.line_chart({"M": r.M, "D": r.D}, height=200)
     else:
-        st.line_chart(pd.DataFrame({"M": out.M, "D": out.D}))
+        st.line_chart({"M": out.M, "D": out.D})
@@ -11,10 +11,12 @@ ou organisationnel valide.
 from .core import (
     DEFAULT_THRESHOLDS,
     HysteresisClassifier,
+    ZONES,
     Zone,
     bounded_margin_index,
     capacity,
     classify,
+    debt_after,
     debt_rest_level,
     debt_update,
     leak,
@@ -24,6 +26,7 @@ from .core import (
     overflow,
     total_load,
 )
+from .ensemble import EnsembleResult, simulate_ensemble
 from .extensions import (
     ControlParams,
     RecoveryParams,
@@ -42,13 +45,25 @@ from .extensions import (
     theta_update,
     viability_repayment_threshold,
 )
-from .network import NetworkConfig, saturation, simulate_network
-from .simulator import SimConfig, SimResult, simulate
+from .network import (
+    CSRCoupling,
+    NetworkConfig,
+    network_gain,
+    saturation,
+    simulate_network,
+    small_gain_spectral,
+    spectral_radius,
+)
+from .simulator import SimArrays, SimConfig, SimResult, simulate
+from .sweep import SweepResult, run_sweep
+from .uncertainty import UncertaintyBands, monte_carlo_bands
+from .zones import hysteresis_codes, zone_codes
 
 __version__ = "0.1.0"
 __all__ = [
-    "DEFAULT_THRESHOLDS", "HysteresisClassifier", "Zone",
-    "bounded_margin_index", "capacity", "classify", "debt_rest_level",
+    "DEFAULT_THRESHOLDS", "HysteresisClassifier", "ZONES", "Zone",
+    "bounded_margin_index", "capacity", "classify", "debt_after",
+    "debt_rest_level",
     "debt_update", "leak", "margin", "margin_index", "margin_uncertainty",
     "overflow", "total_load",
     "ControlParams", "RecoveryParams", "ThetaParams", "alpha_runaway",
@@ -56,6 +71,11 @@ __all__ = [
     "effective_load", "effective_recovery", "normalized_debt",
     "optimal_control", "repayment_rate", "rescale_time_step",
     "theta_target", "theta_update", "viability_repayment_threshold",
-    "NetworkConfig", "saturation", "simulate_network",
-    "SimConfig", "SimResult", "simulate",
+    "EnsembleResult", "simulate_ensemble",
+    "CSRCoupling", "NetworkConfig", "network_gain", "saturation",
+    "simulate_network", "small_gain_spectral", "spectral_radius",
+    "SimArrays", "SimConfig", "SimResult", "simulate",
+    "SweepResult", "run_sweep",
+    "UncertaintyBands", "monte_carlo_bands",
+    "hysteresis_codes", "zone_codes",
 ]
@@ -0,0 +1,209 @@
+"""Banc de performance du simulateur et du moteur reseau.
+
+Mesure, pour plusieurs horizons et tailles de reseau, le debit (pas
+simules par seconde ; pas x noeuds ou x membres pour les ensembles) et le
+pic memoire (tracemalloc, passe separee pour ne pas fausser le temps).
+Les mesures s'ecrivent dans un fichier JSON de reference ; une execution
+ulterieure compare a cette reference et echoue (code 1) si le debit ou
+la memoire regressent au-dela des seuils.
+
+    python -m mcs.bench --save benchmarks/baseline.json
+    python -m mcs.bench --compare benchmarks/baseline.json \\
+        --max-slowdown 0.25 --max-memory-growth 0.25
+
+Les references dependent de la machine : les regenerer sur la machine
+(ou le runner CI) qui compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from . import extensions as ext
+from .ensemble import simulate_ensemble
+from .network import CSRCoupling, NetworkConfig, simulate_network
+from .scenarios import ALL_SCENARIOS
+from .simulator import SimConfig, simulate
+
+FORMAT_VERSION = 1
+
+HORIZONS = (52, 520, 5200)
+NODE_COUNTS = (10, 100, 1000, 10_000)
+ENSEMBLE_SIZES = (100, 10_000)
+QUICK_HORIZONS = (52, 520)
+QUICK_NODE_COUNTS = (10, 1000)
+QUICK_ENSEMBLE_SIZES = (100,)
+NETWORK_STEPS = 60
+
+DEFAULT_MAX_SLOWDOWN = 0.25
+DEFAULT_MAX_MEMORY_GROWTH = 0.25
+
+
+@dataclass
+class Case:
+    """Un point de mesure : run() execute `steps` pas elementaires."""
+    name: str
+    run: Callable[[], object]
+    steps: int
+
+
+def _full_config() -> SimConfig:
+    """Toutes les extensions actives : chemin le plus couteux par pas."""
+    return SimConfig(
+        L=0.45, R=0.7, B=0.6, rho=0.8, mu0=0.3, D_crit=0.6,
+        theta_params=ext.ThetaParams(alpha=0.25, beta=0.15, tau=0.15),
+        control=ext.ControlParams(chi=0.15, kappa=0.4, eta=0.5, delta=0.05,
+                                  u_max=1.5, gain=4.0, m_ref=0.2),
+        recovery=ext.RecoveryParams(delta_D=0.3, delta_B=0.5, B_crit=0.4))
+
+
+def _cascade(n: int) -> NetworkConfig:
+    """Chaine A -> B -> ... (coupled_cascade a n noeuds), couplage CSR."""
+    nodes = [SimConfig(L=0.5, R=0.6, B=0.55, rho=0.85, D_crit=0.5)]
+    nodes += [SimConfig(L=0.3, R=0.85, B=0.85, rho=0.8, D_crit=0.5)
+              ] * (n - 1)
+    W = CSRCoupling.from_edges(n, range(1, n), range(n - 1), [0.4] * (n - 1))
+    return NetworkConfig(nodes=nodes, coupling=W)
+
+
+def default_cases(quick: bool = False) -> list[Case]:
+    horizons = QUICK_HORIZONS if quick else HORIZONS
+    node_counts = QUICK_NODE_COUNTS if quick else NODE_COUNTS
+    sizes = QUICK_ENSEMBLE_SIZES if quick else ENSEMBLE_SIZES
+    cfg = _full_config()
+    cases = [Case(f"simulate/T={T}", lambda T=T: simulate(cfg, T), T)
+             for T in horizons]
+    cases += [Case(f"simulate_compact/T={T}",
+                   lambda T=T: simulate(cfg, T, compact=True), T)
+              for T in horizons]
+    for n in node_counts:
+        net = _cascade(n)
+        cases.append(Case(f"simulate_network/n={n}",
+                          lambda net=net: simulate_network(
+                              net, NETWORK_STEPS, compact=True),
+                          n * NETWORK_STEPS))
+    for n in sizes:
+        cfgs = [cfg] * n
+        cases.append(Case(f"simulate_ensemble/N={n}",
+                          lambda cfgs=cfgs: simulate_ensemble(cfgs, 52),
+                          n * 52))
+    for name, fn in ALL_SCENARIOS.items():
+        out = fn()
+        runs = out if isinstance(out, list) else [out]
+        cases.append(Case(f"scenario/{name}", fn,
+                          sum(len(r.t) for r in runs)))
+    return cases
+
+
+def measure(case: Case, repeat: int = 3) -> dict:
+    """Meilleur temps sur `repeat` executions, puis pic memoire."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        case.run()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"steps": case.steps, "best_s": best,
+            "steps_per_s": case.steps / best if best > 0 else float("inf"),
+            "peak_kib": peak / 1024.0}
+
+
+def run_suite(cases: list[Case], repeat: int = 3,
+              log: Callable[[str], None] | None = None) -> dict:
+    results = {}
+    for case in cases:
+        results[case.name] = measure(case, repeat)
+        if log is not None:
+            r = results[case.name]
+            log(f"{case.name:<45} {r['steps_per_s']:>14,.0f} pas/s "
+                f"{r['peak_kib']:>12,.0f} KiB")
+    return {"format": FORMAT_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "results": results}
+
+
+def compare(current: dict, baseline: dict,
+            max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+            max_memory_growth: float = DEFAULT_MAX_MEMORY_GROWTH
+            ) -> list[str]:
+    """Regressions de current par rapport a baseline (liste vide si rien).
+
+    Debit : echec si baseline / current - 1 > max_slowdown.
+    Memoire : echec si current / baseline - 1 > max_memory_growth.
+    Les cas absents de l'une des deux mesures sont ignores.
+    """
+    problems = []
+    base = baseline.get("results", {})
+    for name, cur in current.get("results", {}).items():
+        ref = base.get(name)
+        if ref is None:
+            continue
+        slowdown = ref["steps_per_s"] / cur["steps_per_s"] - 1.0
+        if slowdown > max_slowdown:
+            problems.append(f"{name}: debit -{slowdown:.0%} "
+                            f"({cur['steps_per_s']:,.0f} vs "
+                            f"{ref['steps_per_s']:,.0f} pas/s)")
+        if ref["peak_kib"] > 0:
+            growth = cur["peak_kib"] / ref["peak_kib"] - 1.0
+            if growth > max_memory_growth:
+                problems.append(f"{name}: memoire +{growth:.0%} "
+                                f"({cur['peak_kib']:,.0f} vs "
+                                f"{ref['peak_kib']:,.0f} KiB)")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m mcs.bench",
+                                 description=__doc__.splitlines()[0])
+    ap.add_argument("--quick", action="store_true",
+                    help="echelles reduites (CI, verification rapide)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", default=None,
+                    help="ne garder que les cas dont le nom contient ce texte")
+    ap.add_argument("--save", type=Path, default=None,
+                    help="ecrire les mesures (reference JSON)")
+    ap.add_argument("--compare", type=Path, default=None,
+                    help="reference JSON a comparer")
+    ap.add_argument("--max-slowdown", type=float,
+                    default=DEFAULT_MAX_SLOWDOWN)
+    ap.add_argument("--max-memory-growth", type=float,
+                    default=DEFAULT_MAX_MEMORY_GROWTH)
+    args = ap.parse_args(argv)
+
+    cases = default_cases(args.quick)
+    if args.only:
+        cases = [c for c in cases if args.only in c.name]
+    current = run_suite(cases, args.repeat, log=print)
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(current, indent=2) + "\n",
+                             encoding="utf-8")
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        problems = compare(current, baseline, args.max_slowdown,
+                           args.max_memory_growth)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Memoisation des simulations pour les usages interactifs (§ 8).
+
+Le prototype Streamlit relance tout le script a chaque mouvement de
+curseur ; la plupart des configurations demandees l'ont deja ete. Ce
+module garde les resultats (SimArrays, en lecture seule) dans un cache
+LRU borne, indexe par une forme canonique de SimConfig, et calcule les
+scenarios pedagogiques a la premiere demande seulement.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import astuple, fields, is_dataclass
+
+import numpy as np
+
+from .simulator import SimArrays, SimConfig, simulate
+
+DEFAULT_MAXSIZE = 128
+
+
+def _canonical(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _canonical(v)) for k, v in value.items()))
+    if is_dataclass(value):
+        return (type(value).__name__,) + tuple(_canonical(v)
+                                               for v in astuple(value))
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_canonical(v) for v in value)
+    raise TypeError(f"valeur non canonisable : {type(value).__name__}")
+
+
+def config_key(cfg: SimConfig) -> tuple | None:
+    """Cle hashable de cfg, ou None si une entree est une fonction de t
+    (le resultat ne peut alors pas etre identifie par sa configuration).
+
+    Deux configurations egales champ a champ ont la meme cle : 1 et 1.0,
+    liste, tuple ou tableau, ordre d'insertion des cles du dict de seuils
+    sont indifferents. L'ordre des valeurs d'une sequence compte.
+    """
+    if any(callable(getattr(cfg, k)) for k in ("L", "R", "B")):
+        return None
+    return tuple((f.name, _canonical(getattr(cfg, f.name)))
+                 for f in fields(cfg))
+
+
+def _freeze(res: SimArrays) -> SimArrays:
+    for arr in res.arrays().values():
+        arr.flags.writeable = False
+    return res
+
+
+class SimulationCache:
+    """Cache LRU borne de simulate(cfg, n_steps, compact=True).
+
+    Les resultats sont partages entre appelants : leurs tableaux sont en
+    lecture seule (copier avant de modifier). Une instance peut servir
+    plusieurs threads (sessions Streamlit via st.cache_resource) : lecture
+    et insertion sont sous verrou, la simulation hors verrou (deux
+    sessions peuvent calculer la meme configuration, la seconde insertion
+    remplace la premiere).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize doit etre >= 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._store: OrderedDict[tuple, SimArrays] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def simulate(self, cfg: SimConfig, n_steps: int = 52) -> SimArrays:
+        key = config_key(cfg)
+        if key is not None:
+            key = (key, n_steps)
+        with self._lock:
+            res = self._store.get(key) if key is not None else None
+            if res is not None:
+                self.hits += 1
+                self._store.move_to_end(key)
+                return res
+            self.misses += 1
+        res = _freeze(simulate(cfg, n_steps, compact=True))
+        if key is None:
+            return res
+        with self._lock:
+            self._store[key] = res
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return res
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self.hits = self.misses = 0
+
+
+class ScenarioCache:
+    """Scenarios pedagogiques calcules a la premiere demande, puis gardes
+    (un SimArrays, ou une liste pour un reseau couple)."""
+
+    def __init__(self, scenarios: dict) -> None:
+        self.scenarios = scenarios
+        self._results: dict[str, SimArrays | list[SimArrays]] = {}
+
+    def __getitem__(self, name: str) -> SimArrays | list[SimArrays]:
+        if name not in self._results:
+            out = self.scenarios[name]()
+            if isinstance(out, list):        # reseau couple
+                self._results[name] = [_freeze(SimArrays.from_result(r))
+                                       for r in out]
+            else:
+                self._results[name] = _freeze(SimArrays.from_result(out))
+        return self._results[name]
+
+    def computed(self) -> list[str]:
+        return list(self._results)
+
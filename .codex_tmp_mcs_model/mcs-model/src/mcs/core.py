@@ -18,6 +18,8 @@ import math
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
 
 def clip(x: float, lo: float, hi: float) -> float:
     """Borne x dans [lo, hi]."""
@@ -125,6 +127,32 @@ def debt_rest_level(L: float, R: float, B: float, rho: float) -> float:
     return leak(L, R, B) / (1.0 - rho)
 
 
+def debt_after(D: float, k, L: float, R: float, B: float, C: float,
+               rho: float) -> float:
+    """D(t+k) en forme close, entrees constantes et noyau seul.
+
+    C ne dependant pas de D, le debordement max(0, L-C) est constant et
+    la recurrence est affine : D(t+1) = rho*D + q, q = fuite + debordement.
+      rho < 1 : D(t+k) = rho^k * D + q * (1 - rho^k) / (1 - rho)
+      rho = 1 : D(t+k) = D + k*q
+    Saut de k pas en O(1) ; k peut etre un tableau NumPy d'entiers (toute
+    la trajectoire d'un coup).
+
+    1 - rho^k est calcule par -expm1(k * log1p(rho - 1)) : la forme
+    D* + rho^k * (D - D*) perd jusqu'a ~1e-5 en relatif quand rho -> 1
+    (difference de deux grands termes voisins).
+    """
+    if not (0.0 <= rho <= 1.0):
+        raise ValueError("rho doit etre borne entre 0 et 1")
+    q = leak(L, R, B) + overflow(L, C)
+    if rho == 1.0:
+        return D + k * q
+    if rho == 0.0:                        # 0^0 = 1 : pas de log1p(-1)
+        return np.where(np.asarray(k) > 0, q, D)[()]
+    growth = -np.expm1(k * np.log1p(rho - 1.0))
+    return rho ** k * D + q * growth / (1.0 - rho)
+
+
 # ---------------------------------------------------------------------------
 # Zones systemiques (§ 4) - lecture ordinale avec hysteresis
 # ---------------------------------------------------------------------------
@@ -142,6 +170,11 @@ class Zone(str, Enum):
 DEFAULT_THRESHOLDS = {"viable": 0.30, "tension": 0.10,
                       "saturation": 0.05, "pre_rupture": -0.05}
 
+#: Ordre des codes entiers de zone (stockage compact int8) :
+#: 0 = viable ... 4 = rupture ; ZONES[code] -> Zone.
+ZONES: tuple[Zone, ...] = tuple(Zone)
+ZONE_CODES: dict[Zone, int] = {z: i for i, z in enumerate(ZONES)}
+
 
 def classify(M: float, thresholds: dict | None = None) -> Zone:
     """Classe une valeur de M dans une zone systemique (sans hysteresis)."""
@@ -186,18 +219,24 @@ class HysteresisClassifier:
         return self._current
 
 
-def margin_uncertainty(M: float, A: float, C: float,
-                       rel_err_A: float = 0.0, rel_err_theta: float = 0.0,
-                       rel_err_R: float = 0.0, rel_err_B: float = 0.0) -> float:
+def margin_uncertainty(M, A, C, rel_err_A: float = 0.0,
+                       rel_err_theta: float = 0.0, rel_err_R: float = 0.0,
+                       rel_err_B: float = 0.0):
     """Propagation d'incertitude au premier ordre (§ 4) :
 
     dM = -dA/C + (1 - M) * (dTheta/Theta + dR/R + dB/B)
 
     Retourne une demi-largeur d'intervalle (somme des valeurs absolues,
-    lecture prudente). Au voisinage du seuil, 10 % d'erreur sur un proxy
-    deplace M d'environ 0.1 : la largeur d'une bande entiere.
+    lecture prudente), infinie si C = 0. Au voisinage du seuil, 10 %
+    d'erreur sur un proxy deplace M d'environ 0.1 : la largeur d'une
+    bande entiere.
+
+    M, A, C scalaires : retourne un float. Tableaux NumPy (trajectoire
+    entiere) : retourne un tableau de meme forme.
     """
-    if C == 0.0:
-        return math.inf
-    return (abs(A / C) * rel_err_A
-            + abs(1.0 - M) * (rel_err_theta + rel_err_R + rel_err_B))
+    M, A, C = np.asarray(M, float), np.asarray(A, float), np.asarray(C, float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dM = (np.abs(A / C) * rel_err_A
+              + np.abs(1.0 - M) * (rel_err_theta + rel_err_R + rel_err_B))
+    dM = np.where(C == 0.0, np.inf, dM)
+    return float(dM) if dM.ndim == 0 else dM
@@ -0,0 +1,340 @@
+"""Simulation d'ensemble : N configurations avancees en parallele (NumPy).
+
+Meme ordre de calcul que simulator.simulate (§ 5.1), meme extensions
+(remboursement, Theta evolutif, controle, recuperation effective), mais
+chaque grandeur est un vecteur de taille N et chaque pas coute une
+poignee d'operations NumPy au lieu de N boucles Python.
+
+Les operations sont ecrites dans le meme ordre que les fonctions scalaires
+de core.py / extensions.py : pour N = 1, les trajectoires sont identiques
+bit a bit a celles de simulate. Une extension inactive pour un membre est
+neutralisee par masque (np.where), jamais par un parametre "nul" qui
+changerait les arrondis.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Sequence
+
+import numpy as np
+
+from . import core
+from .core import ZONES
+from .simulator import FIELDS, SimArrays, SimConfig, SimResult, Series, _at
+from .zones import THRESHOLD_KEYS, hysteresis_codes
+
+
+
+# ---------------------------------------------------------------------------
+# Preparation : entrees exogenes et parametres empiles
+# ---------------------------------------------------------------------------
+
+def input_matrix(series: Sequence[Series], n_steps: int) -> np.ndarray:
+    """Evalue N entrees exogenes sur t = 0..n_steps-1 -> tableau (N, n_steps).
+
+    Constantes et sequences sont remplies sans boucle par pas ; seules les
+    fonctions de t sont appelees pas a pas.
+    """
+    out = np.empty((len(series), n_steps))
+    for i, x in enumerate(series):
+        if callable(x):
+            out[i] = [_at(x, t) for t in range(n_steps)]
+        elif isinstance(x, (int, float)):
+            out[i] = float(x)
+        else:
+            seq = np.asarray(x, dtype=float)
+            out[i] = seq[np.minimum(np.arange(n_steps), len(seq) - 1)]
+    return out
+
+
+@dataclass
+class EnsembleParams:
+    """Parametres de N configurations, un tableau de taille N par champ.
+
+    Les masques has_* indiquent les extensions actives ; les parametres
+    d'une extension inactive valent 0 et ne sont jamais lus.
+    """
+    theta0: np.ndarray
+    D0: np.ndarray
+    rho: np.ndarray
+    s: np.ndarray
+    mu0: np.ndarray
+    gamma: np.ndarray
+    D_crit: np.ndarray
+    # 6.2
+    has_theta: np.ndarray
+    theta_min: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    tau: np.ndarray
+    # 6.3
+    has_control: np.ndarray
+    chi: np.ndarray
+    kappa: np.ndarray
+    eta: np.ndarray
+    delta: np.ndarray
+    u_max: np.ndarray
+    gain: np.ndarray
+    m_ref: np.ndarray
+    # 6.5
+    has_recovery: np.ndarray
+    delta_D: np.ndarray
+    delta_B: np.ndarray
+    B_crit: np.ndarray
+    R_min: np.ndarray
+    # Lecture
+    hysteresis_k: np.ndarray
+    thresholds: np.ndarray   # (N, 4) : viable, tension, saturation, pre_rupture
+
+    @property
+    def size(self) -> int:
+        return int(self.rho.size)
+
+    def repeat(self, n: int) -> "EnsembleParams":
+        """Chaque membre repete n fois (tirages Monte-Carlo d'une meme
+        configuration), sans reconstruire de SimConfig."""
+        return EnsembleParams(**{f.name: np.repeat(getattr(self, f.name), n,
+                                                   axis=0)
+                                 for f in fields(self)})
+
+    @classmethod
+    def from_configs(cls, cfgs: Sequence[SimConfig]) -> "EnsembleParams":
+        def col(get, dtype=float):
+            return np.array([get(c) for c in cfgs], dtype=dtype)
+
+        def opt(name, attr):
+            return col(lambda c: getattr(getattr(c, name), attr)
+                       if getattr(c, name) is not None else 0.0)
+
+        return cls(
+            theta0=col(lambda c: c.theta_params.theta0 if c.theta_params
+                       else c.theta0),
+            D0=col(lambda c: c.D0), rho=col(lambda c: c.rho),
+            s=col(lambda c: c.s), mu0=col(lambda c: c.mu0),
+            gamma=col(lambda c: c.gamma), D_crit=col(lambda c: c.D_crit),
+            has_theta=col(lambda c: c.theta_params is not None, bool),
+            theta_min=opt("theta_params", "theta_min"),
+            alpha=opt("theta_params", "alpha"),
+            beta=opt("theta_params", "beta"),
+            tau=opt("theta_params", "tau"),
+            has_control=col(lambda c: c.control is not None, bool),
+            chi=opt("control", "chi"), kappa=opt("control", "kappa"),
+            eta=opt("control", "eta"), delta=opt("control", "delta"),
+            u_max=opt("control", "u_max"), gain=opt("control", "gain"),
+            m_ref=opt("control", "m_ref"),
+            has_recovery=col(lambda c: c.recovery is not None, bool),
+            delta_D=opt("recovery", "delta_D"),
+            delta_B=opt("recovery", "delta_B"),
+            B_crit=opt("recovery", "B_crit"),
+            R_min=opt("recovery", "R_min"),
+            hysteresis_k=col(lambda c: c.hysteresis_k, np.int64),
+            thresholds=np.array(
+                [[(c.thresholds or core.DEFAULT_THRESHOLDS)[k]
+                  for k in THRESHOLD_KEYS] for c in cfgs],
+                dtype=float).reshape(len(cfgs), 4),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Resultat
+# ---------------------------------------------------------------------------
+
+@dataclass
+class EnsembleResult:
+    """Trajectoires d'ensemble : tableaux (N, n_steps), zone en codes int8
+    (indices dans ZONES). Le membre i se lit res.M[i], res.D[i], ..."""
+    t: np.ndarray
+    L: np.ndarray
+    L_eff: np.ndarray
+    D: np.ndarray
+    R_eff: np.ndarray
+    B_eff: np.ndarray
+    theta: np.ndarray
+    A: np.ndarray
+    C: np.ndarray
+    M: np.ndarray
+    M_bounded: np.ndarray
+    U: np.ndarray
+    mu: np.ndarray
+    zone: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return int(self.M.shape[0])
+
+    def member(self, i: int, compact: bool = False) -> SimResult | SimArrays:
+        """Trajectoire du membre i au format de simulate (listes), ou en
+        SimArrays dont les colonnes sont des vues sur l'ensemble."""
+        if compact:
+            return SimArrays(t=self.t, **{f: getattr(self, f)[i]
+                                          for f in FIELDS[1:]})
+        res = SimResult(t=self.t.tolist())
+        for f in fields(SimResult):
+            if f.name not in ("t", "zone"):
+                setattr(res, f.name, getattr(self, f.name)[i].tolist())
+        res.zone = [ZONES[z] for z in self.zone[i]]
+        return res
+
+
+# ---------------------------------------------------------------------------
+# Boucle vectorisee (§ 5.1)
+# ---------------------------------------------------------------------------
+
+def _check(bad: np.ndarray, message: str) -> None:
+    if np.any(bad):
+        raise ValueError(message)
+
+
+def _clip(x: np.ndarray, lo, hi) -> np.ndarray:
+    """core.clip vectorise : max(lo, min(hi, x))."""
+    return np.maximum(lo, np.minimum(hi, x))
+
+
+def capacity_margins(theta: np.ndarray, R: np.ndarray, B: np.ndarray,
+                     s: np.ndarray, L: np.ndarray, D: np.ndarray):
+    """core.capacity, total_load, margin_index et bounded_margin_index
+    vectorises (memes controles de domaine) -> (C, A, M, M_bounded)."""
+    _check(theta <= 0, "Theta doit rester strictement positive")
+    _check((R < 0.0) | (R > 1.0) | (B < 0.0) | (B > 1.0),
+           "R et B doivent etre bornes entre 0 et 1")
+    _check((L < 0) | (D < 0), "L et D doivent etre positifs ou nuls")
+    C = theta * (s * (R + B) / 2.0 + (1.0 - s) * R * B)
+    A = L + D
+    a0, c0 = A == 0.0, C == 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        M = np.where(a0, 1.0, np.where(c0, -np.inf, 1.0 - A / C))
+        M_b = np.where(a0, 1.0, np.where(c0 & (A > 0.0), -1.0,
+                                         (C - A) / (C + A)))
+    return C, A, M, M_b
+
+
+def allocate(L: np.ndarray) -> EnsembleResult:
+    """Resultat preallouee pour des entrees L de forme (N, n_steps).
+
+    Ordre Fortran : les valeurs du pas t sont contigues en memoire.
+    """
+    N, n_steps = L.shape
+
+    def alloc(dtype=float):
+        return np.empty((N, n_steps), dtype=dtype, order="F")
+
+    return EnsembleResult(
+        t=np.arange(n_steps), L=L, L_eff=alloc(), D=alloc(), R_eff=alloc(),
+        B_eff=alloc(), theta=alloc(), A=alloc(), C=alloc(), M=alloc(),
+        M_bounded=alloc(), U=alloc(), mu=alloc(), zone=alloc(np.int8))
+
+
+def check_params(p: EnsembleParams) -> None:
+    """Controles de domaine independants du pas de temps."""
+    _check(p.D_crit <= 0, "D_crit doit etre strictement positif")
+    _check((p.mu0 <= 0.0) & ((p.rho < 0.0) | (p.rho > 1.0)),
+           "rho doit etre borne entre 0 et 1")
+    _check((p.s < 0.0) | (p.s > 1.0), "s doit etre borne entre 0 et 1")
+
+
+def run_ensemble(p: EnsembleParams, L: np.ndarray, R: np.ndarray,
+                 B: np.ndarray,
+                 theta_factor: np.ndarray | None = None) -> EnsembleResult:
+    """Simule l'ensemble sur des entrees deja evaluees.
+
+    L, B : (N, n_steps) ; R : (N, n_steps + 1), la colonne t+1 servant a
+    la mise a jour de R_eff (extension 6.5).
+    theta_factor : (N, n_steps) facultatif, erreur multiplicative sur le
+    proxy de Theta au pas t (C et theta enregistre) ; l'etat Theta de
+    l'extension 6.2 evolue sans elle.
+    """
+    N, n_steps = L.shape
+    if R.shape != (N, n_steps + 1) or B.shape != (N, n_steps):
+        raise ValueError("L, B : (N, n_steps) ; R : (N, n_steps + 1)")
+    if theta_factor is not None and theta_factor.shape != (N, n_steps):
+        raise ValueError("theta_factor : (N, n_steps)")
+    check_params(p)
+    out = allocate(L)
+
+    D = p.D0.copy()
+    theta = p.theta0.copy()
+    R_state = R[:, 0].copy()        # R_eff (6.5) ou R_brut
+    U = np.zeros(N)
+    has_mu = p.mu0 > 0.0
+    ctrl, rec, th_on = p.has_control, p.has_recovery, p.has_theta
+
+    for t in range(n_steps):
+        # 1. Entrees exogenes
+        L_t = L[:, t]
+        R_t = np.where(rec, R_state, R[:, t]) if t else R[:, 0]
+        B_t = B[:, t]
+
+        # 2. Controle
+        L_eff = np.where(ctrl, L_t + p.chi * U, L_t)
+        B_eff = np.where(
+            ctrl, _clip(B_t * (1.0 + p.kappa * U - p.eta * U * U),
+                        0.0, 1.0), B_t)
+
+        # 3. C(t), A(t), M(t)
+        theta_t = theta if theta_factor is None else theta * theta_factor[:, t]
+        C, A, M, M_b = capacity_margins(theta_t, R_t, B_eff, p.s, L_eff, D)
+
+        out.L_eff[:, t] = L_eff
+        out.D[:, t] = D
+        out.R_eff[:, t] = R_t
+        out.B_eff[:, t] = B_eff
+        out.theta[:, t] = theta_t
+        out.A[:, t] = A
+        out.C[:, t] = C
+        out.M[:, t] = M
+        out.M_bounded[:, t] = M_b
+        out.U[:, t] = U
+
+        # 4. Commande du pas suivant, a partir de M(t)
+        # (0 * inf des membres sans controle : masque par np.where)
+        with np.errstate(invalid="ignore"):
+            U_next = np.where(
+                ctrl, _clip(p.gain * (p.m_ref - M), 0.0, p.u_max), 0.0)
+
+        # 5. Mises a jour d'etat pour t+1
+        D_n = np.minimum(1.0, D / p.D_crit)
+        leak = (1.0 - R_t) * L_eff * (1.0 - B_eff)
+        over = np.maximum(0.0, L_eff - C)
+        mu = np.where(has_mu, p.mu0 * R_t / (1.0 + p.gamma * D_n), 0.0)
+        extra = np.where(ctrl, p.delta * U, 0.0)
+        slack = np.maximum(0.0, C - L_eff)
+        D = np.where(has_mu,
+                     np.maximum(0.0, p.rho * D + leak + over
+                                - (mu + extra) * slack),
+                     p.rho * D + leak + over)
+        out.mu[:, t] = mu
+
+        D_n_new = np.minimum(1.0, D / p.D_crit)
+        R_state = np.where(
+            rec, _clip(R[:, t + 1] - p.delta_D * D_n_new
+                       - p.delta_B * np.maximum(0.0, p.B_crit - B_eff),
+                       p.R_min, 1.0), R_state)
+        theta = np.where(th_on, theta_step(p, theta, D_n_new, B_eff), theta)
+        U = U_next
+
+    out.zone[:] = hysteresis_codes(out.M, p.hysteresis_k, p.thresholds)
+    return out
+
+
+def theta_step(p: EnsembleParams, theta: np.ndarray, D_n: np.ndarray,
+               B: np.ndarray) -> np.ndarray:
+    """extensions.theta_update vectorise (sans masque has_theta)."""
+    target = np.maximum(p.theta_min, p.theta0 * (
+        1.0 - p.alpha * D_n - p.beta * (1.0 - B)))
+    return theta + p.tau * (target - theta)
+
+
+def simulate_ensemble(cfgs: Sequence[SimConfig],
+                      n_steps: int = 52) -> EnsembleResult:
+    """Execute n_steps pas pour chaque configuration, en parallele.
+
+    Equivalent a [simulate(c, n_steps) for c in cfgs] (res.member(i)),
+    pour un cout par pas quasi independant de N en Python.
+    """
+    cfgs = list(cfgs)
+    p = EnsembleParams.from_configs(cfgs)
+    return run_ensemble(p,
+                        input_matrix([c.L for c in cfgs], n_steps),
+                        input_matrix([c.R for c in cfgs], n_steps + 1),
+                        input_matrix([c.B for c in cfgs], n_steps))
@@ -7,14 +7,25 @@ Dans un reseau, la dette d'un systeme devient une charge pour un autre :
 La dette normalisee D_n dans [0,1] garantit la bornitude globale ; la
 saturation continue sigma(D) = D / (D + D_seuil) conserve la
 differenciation aux fortes dettes.
+
+Pour les grands graphes, le couplage se donne en CSR (CSRCoupling) et la
+condition de petit gain se verifie sur le rayon spectral de la carte de
+dette linearisee (network_gain), estime par iteration de la puissance
+sans jamais densifier la matrice.
 """
 
 from __future__ import annotations
 
+import warnings
 from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
 
-from . import core, extensions as ext
-from .simulator import SimConfig, SimResult, _at
+from . import ensemble as ens
+from .ensemble import EnsembleResult
+from .simulator import SimConfig, SimResult
+from .zones import hysteresis_codes
 
 
 def saturation(D: float, D_seuil: float) -> float:
@@ -31,88 +42,313 @@ def small_gain_bound(rho: float, couplings_row_sum: float,
 
     Approximation pedagogique : pour des couplages asymetriques, la
     condition exacte porte sur le rayon spectral de la matrice de
-    couplage (a verifier numeriquement, cf. tests).
+    couplage (voir network_gain et small_gain_spectral).
     """
     return rho + leak_gain * couplings_row_sum < 1.0
 
 
+# ---------------------------------------------------------------------------
+# Couplage creux (CSR) et rayon spectral
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, eq=False)
+class CSRCoupling:
+    """Matrice de couplage n x n au format CSR, sans diagonale.
+
+    Ligne i : poids lambda_ij (data[indptr[i]:indptr[i+1]]) des voisins
+    j = indices[...]. Le produit `W @ x` coute O(nnz) ; rien n'est
+    jamais densifie (to_dense() sert aux tests et aux petits reseaux).
+    """
+    n: int
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    _row: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if (self.indptr.shape != (self.n + 1,)
+                or self.indices.shape != self.data.shape):
+            raise ValueError("structure CSR incoherente")
+        # indice de ligne de chaque coefficient, pour le produit par bincount
+        object.__setattr__(self, "_row", np.repeat(np.arange(self.n),
+                                                   np.diff(self.indptr)))
+
+    @classmethod
+    def from_edges(cls, n: int, rows, cols, weights) -> "CSRCoupling":
+        """Depuis des aretes (i, j, lambda_ij) : doublons sommes,
+        diagonale et poids nuls ecartes."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        w = np.asarray(weights, dtype=float)
+        if not (rows.shape == cols.shape == w.shape):
+            raise ValueError("rows, cols et weights : tailles differentes")
+        if rows.size and (min(rows.min(), cols.min()) < 0
+                          or max(rows.max(), cols.max()) >= n):
+            raise ValueError("indice de noeud hors de [0, n)")
+        keep = rows != cols
+        key, inv = np.unique(rows[keep] * n + cols[keep], return_inverse=True)
+        data = np.bincount(inv, weights=w[keep], minlength=key.size)
+        nz = data != 0.0
+        key, data = key[nz], data[nz]
+        r = key // n
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(r, minlength=n), out=indptr[1:])
+        return cls(n, indptr, key % n, data)
+
+    @classmethod
+    def from_dense(cls, matrix) -> "CSRCoupling":
+        m = np.asarray(matrix, dtype=float)
+        if m.ndim != 2 or m.shape[0] != m.shape[1]:
+            raise ValueError("coupling doit etre une matrice n x n")
+        rows, cols = np.nonzero(m)
+        return cls.from_edges(m.shape[0], rows, cols, m[rows, cols])
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.n, self.n)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.data.size)
+
+    def __matmul__(self, x: np.ndarray) -> np.ndarray:
+        return np.bincount(self._row, weights=self.data * x[self.indices],
+                           minlength=self.n)
+
+    def abs(self) -> "CSRCoupling":
+        return CSRCoupling(self.n, self.indptr, self.indices,
+                           np.abs(self.data))
+
+    def row_sums(self) -> np.ndarray:
+        return self @ np.ones(self.n)
+
+    def to_dense(self) -> np.ndarray:
+        m = np.zeros((self.n, self.n))
+        m[self._row, self.indices] = self.data
+        return m
+
+
+#: Composantes de x (norme max 1) sous ce seuil ignorees par le minorant.
+SUPPORT_EPS = 1e-6
+
+
+def spectral_radius(op, n: int | None = None, tol: float = 1e-9,
+                    max_iter: int = 1000) -> float:
+    """Rayon spectral d'un operateur positif (coefficients >= 0), par
+    iteration de la puissance a partir du vecteur 1.
+
+    op : matrice (dense, CSRCoupling, scipy.sparse) ou fonction x -> A x
+         (n requis). Pour une matrice signee, passer |W| : rho(W) <= rho(|W|).
+
+    L'iteration porte sur l'operateur decale x -> A x + c x (c = majorant
+    courant) : x reste > 0 meme si A est reductible (graphe creux), et
+    l'encadrement de Collatz-Wielandt vaut a chaque iteration :
+      max_S min_{i in S} (A x_S)_i / x_i <= rho <= max_i (A x)_i / x_i
+    avec x_S = x restreint a S, tout S valant. On prend les composantes
+    > SUPPORT_EPS dont le quotient depasse le milieu de l'encadrement :
+    hors du support du vecteur de Perron, x tend vers 0 et le quotient
+    reste en deca de rho. A^k 1 est itere en parallele : majorant de
+    Gelfand ||A^k 1||_inf^(1/k), et rho = 0 exactement s'il s'annule
+    (A nilpotent).
+
+    Retourne le majorant, a tol pres (relatif) si l'encadrement converge ;
+    sinon RuntimeWarning et majorant prudent apres max_iter.
+    """
+    if callable(op):
+        if n is None:
+            raise ValueError("n est requis pour un operateur fonctionnel")
+        matvec: Callable[[np.ndarray], np.ndarray] = op
+    else:
+        n = op.shape[0]
+        matvec = op.__matmul__
+    if n == 0:
+        return 0.0
+    x = np.ones(n)
+    g = np.ones(n)
+    log_norm = 0.0
+    upper, lower = np.inf, 0.0
+    for k in range(1, max_iter + 1):
+        y = matvec(x)
+        if np.any(y < 0):
+            raise ValueError("spectral_radius suppose un operateur positif")
+        g = matvec(g)
+        g_norm = float(g.max())
+        if g_norm == 0.0:
+            return 0.0                          # nilpotent : A^k 1 = 0
+        log_norm += np.log(g_norm)
+        g /= g_norm
+        ratio = y / x
+        upper = min(upper, float(np.exp(log_norm / k)), float(ratio.max()))
+        lower = max(lower, float(ratio.min()))
+        if upper - lower > tol * upper:
+            support = (x > SUPPORT_EPS) & (ratio >= (upper + lower) / 2.0)
+            if support.any() and not support.all():
+                y_s = matvec(np.where(support, x, 0.0))
+                lower = max(lower, float(np.min(y_s[support] / x[support])))
+        if upper - lower <= tol * upper:
+            return upper
+        x = y + upper * x
+        x = np.maximum(x / x.max(), np.finfo(float).tiny)
+    warnings.warn(f"spectral_radius : encadrement [{lower:.6g}, {upper:.6g}] "
+                  f"non converge apres {max_iter} iterations (tol={tol:g}) ; "
+                  "majorant retourne", RuntimeWarning, stacklevel=2)
+    return upper
+
+
+def network_gain(net: "NetworkConfig", t: int = 0) -> float:
+    """Rayon spectral de la carte de dette linearisee au voisinage de D = 0.
+
+    J = diag(rho + g_D) + diag(g_L) |W| diag(s'), avec
+      g_L = (1-R)(1-B) + 1[L > C] + mu * 1[C > L]   (sensibilite de D(t+1) a L)
+      g_D = mu0 * R * gamma / D_crit * max(0, C-L)  (piege de dette, § 6.1)
+      s'  = 1 / D_crit (dette normalisee) ou 1 / D_seuil (saturation),
+    les entrees etant lues au pas t (Theta = Theta0, sans couplage).
+    Condition de petit gain : network_gain(net) < 1.
+    """
+    n = len(net.nodes)
+    W = coupling_operator(net.coupling, n)
+    W = W.abs() if isinstance(W, CSRCoupling) else abs(W)
+    p = ens.EnsembleParams.from_configs(net.nodes)
+    L = ens.input_matrix([c.L for c in net.nodes], t + 1)[:, t]
+    R = ens.input_matrix([c.R for c in net.nodes], t + 1)[:, t]
+    B = ens.input_matrix([c.B for c in net.nodes], t + 1)[:, t]
+    C = p.theta0 * (p.s * (R + B) / 2.0 + (1.0 - p.s) * R * B)
+    mu = np.where(p.mu0 > 0.0, p.mu0 * R, 0.0)
+    slack = np.maximum(0.0, C - L)
+    g_L = (1.0 - R) * (1.0 - B) + (L > C) + mu * (C > L)
+    g_D = mu * p.gamma / p.D_crit * slack
+    scale = (np.full(n, 1.0 / net.D_seuil) if net.use_saturation
+             else 1.0 / p.D_crit)
+    diag = p.rho + g_D
+
+    def matvec(x: np.ndarray) -> np.ndarray:
+        return diag * x + g_L * (W @ (scale * x))
+
+    return spectral_radius(matvec, n)
+
+
+def small_gain_spectral(net: "NetworkConfig", t: int = 0) -> bool:
+    """Version exacte (au sens du rayon spectral) de small_gain_bound."""
+    return network_gain(net, t) < 1.0
+
+
 @dataclass
 class NetworkConfig:
     """Reseau de n systemes MCS couples par leur dette.
 
-    nodes    : configurations individuelles (leurs extensions s'appliquent)
+    nodes    : configurations individuelles (remboursement 6.1 et Theta
+               evolutif 6.2 s'appliquent)
     coupling : matrice lambda[i][j] - poids de la dette du noeud j
-               dans la charge du noeud i
+               dans la charge du noeud i (liste de listes, tableau NumPy,
+               CSRCoupling ou matrice scipy.sparse ; diagonale ignoree)
     use_saturation : si True, utilise sigma(D_j) au lieu de D_n,j
     D_seuil  : echelle de saturation
     """
     nodes: list[SimConfig]
-    coupling: list[list[float]]
+    coupling: list[list[float]] | np.ndarray | CSRCoupling
     use_saturation: bool = False
     D_seuil: float = 1.0
 
 
-def simulate_network(net: NetworkConfig, n_steps: int = 52) -> list[SimResult]:
+def coupling_operator(coupling, n: int):
+    """Operateur de couplage sans diagonale, applicable par `W @ x`.
+
+    Dense (np.ndarray) par defaut ; CSRCoupling et scipy.sparse restent
+    creux, ce qui rend chaque pas O(nnz) au lieu de O(n^2).
+    """
+    if isinstance(coupling, CSRCoupling):
+        if coupling.n != n:
+            raise ValueError("coupling doit etre une matrice n x n")
+        return coupling
+    if hasattr(coupling, "tocsr"):
+        W = coupling.tocsr(copy=True)
+        if W.shape != (n, n):
+            raise ValueError("coupling doit etre une matrice n x n")
+        W.setdiag(0.0)
+        W.eliminate_zeros()
+        return W
+    if isinstance(coupling, np.ndarray):
+        W = np.array(coupling, dtype=float)
+    else:
+        if len(coupling) != n or any(len(row) != n for row in coupling):
+            raise ValueError("coupling doit etre une matrice n x n")
+        W = np.array(coupling, dtype=float).reshape(n, n)
+    if W.shape != (n, n):
+        raise ValueError("coupling doit etre une matrice n x n")
+    np.fill_diagonal(W, 0.0)
+    return W
+
+
+def simulate_network(net: NetworkConfig, n_steps: int = 52,
+                     compact: bool = False, require_small_gain: bool = False
+                     ) -> list[SimResult] | EnsembleResult:
     """Simulation couplee : a chaque pas, la charge de i est augmentee
     de la dette (normalisee ou saturee) de ses voisins au pas courant.
+
+    Tous les noeuds avancent ensemble sur des tableaux NumPy ; le couplage
+    est un produit matrice-vecteur L_eff = L + W @ signal(D).
+    compact=True retourne un EnsembleResult (tableaux (n, n_steps)) au
+    lieu d'une liste de SimResult, utile au-dela de quelques centaines
+    de noeuds. require_small_gain=True refuse (ValueError) un reseau dont
+    la carte de dette linearisee n'est pas contractante (network_gain >= 1).
     """
     n = len(net.nodes)
-    if len(net.coupling) != n or any(len(row) != n for row in net.coupling):
-        raise ValueError("coupling doit etre une matrice n x n")
+    W = coupling_operator(net.coupling, n)
+    if require_small_gain:
+        gain = network_gain(net)
+        if gain >= 1.0:
+            raise ValueError(f"condition de petit gain violee : rayon "
+                             f"spectral {gain:.4g} >= 1")
+    if net.use_saturation and net.D_seuil <= 0:
+        raise ValueError("D_seuil doit etre strictement positif")
 
-    results = [SimResult() for _ in range(n)]
-    classifiers = [core.HysteresisClassifier(k=c.hysteresis_k,
-                                             thresholds=c.thresholds)
-                   for c in net.nodes]
-    D = [c.D0 for c in net.nodes]
-    theta = [c.theta_params.theta0 if c.theta_params else c.theta0
-             for c in net.nodes]
+    p = ens.EnsembleParams.from_configs(net.nodes)
+    ens.check_params(p)
+    L_own = ens.input_matrix([c.L for c in net.nodes], n_steps)
+    R = ens.input_matrix([c.R for c in net.nodes], n_steps)
+    B = ens.input_matrix([c.B for c in net.nodes], n_steps)
+    out = ens.allocate(L_own)
+    has_mu = p.mu0 > 0.0
+    zero = np.zeros(n)
 
+    D = p.D0.copy()
+    theta = p.theta0.copy()
     for t in range(n_steps):
         # Couplage : dette des voisins au debut du pas
         if net.use_saturation:
-            debt_signal = [saturation(d, net.D_seuil) for d in D]
+            debt_signal = D / (D + net.D_seuil)
         else:
-            debt_signal = [ext.normalized_debt(d, net.nodes[j].D_crit)
-                           for j, d in enumerate(D)]
-
-        D_next = []
-        for i, cfg in enumerate(net.nodes):
-            L_own = _at(cfg.L, t)
-            L = L_own + sum(net.coupling[i][j] * debt_signal[j]
-                            for j in range(n) if j != i)
-            R = _at(cfg.R, t)
-            B = _at(cfg.B, t)
-
-            C = core.capacity(theta[i], R, B, cfg.s)
-            A = core.total_load(L, D[i])
-            M = core.margin_index(A, C)
-
-            r = results[i]
-            r.t.append(t); r.L.append(L_own); r.L_eff.append(L)
-            r.D.append(D[i]); r.R_eff.append(R); r.B_eff.append(B)
-            r.theta.append(theta[i]); r.A.append(A); r.C.append(C)
-            r.M.append(M)
-            r.M_bounded.append(core.bounded_margin_index(A, C))
-            r.U.append(0.0)
-            r.zone.append(classifiers[i].update(M))
-
-            D_n = ext.normalized_debt(D[i], cfg.D_crit)
-            if cfg.mu0 > 0.0:
-                mu = ext.repayment_rate(cfg.mu0, R, D_n, cfg.gamma)
-                d_new = ext.debt_update_with_repayment(D[i], L, R, B, C,
-                                                       cfg.rho, mu)
-            else:
-                mu = 0.0
-                d_new = core.debt_update(D[i], L, R, B, C, cfg.rho)
-            r.mu.append(mu)
-            D_next.append(d_new)
-
-            if cfg.theta_params is not None:
-                theta[i] = ext.theta_update(
-                    theta[i], cfg.theta_params,
-                    ext.normalized_debt(d_new, cfg.D_crit), B)
-
-        D = D_next
-
-    return results
+            debt_signal = np.minimum(1.0, D / p.D_crit)
+        L = L_own[:, t] + W @ debt_signal
+        R_t, B_t = R[:, t], B[:, t]
+
+        C, A, M, M_b = ens.capacity_margins(theta, R_t, B_t, p.s, L, D)
+        out.L_eff[:, t] = L
+        out.D[:, t] = D
+        out.R_eff[:, t] = R_t
+        out.B_eff[:, t] = B_t
+        out.theta[:, t] = theta
+        out.A[:, t] = A
+        out.C[:, t] = C
+        out.M[:, t] = M
+        out.M_bounded[:, t] = M_b
+        out.U[:, t] = zero
+
+        D_n = np.minimum(1.0, D / p.D_crit)
+        leak = (1.0 - R_t) * L * (1.0 - B_t)
+        over = np.maximum(0.0, L - C)
+        mu = np.where(has_mu, p.mu0 * R_t / (1.0 + p.gamma * D_n), 0.0)
+        slack = np.maximum(0.0, C - L)
+        D = np.where(has_mu,
+                     np.maximum(0.0, p.rho * D + leak + over - mu * slack),
+                     p.rho * D + leak + over)
+        out.mu[:, t] = mu
+
+        D_n_new = np.minimum(1.0, D / p.D_crit)
+        theta = np.where(p.has_theta,
+                         ens.theta_step(p, theta, D_n_new, B_t), theta)
+
+    out.zone[:] = hysteresis_codes(out.M, p.hysteresis_k, p.thresholds)
+    if compact:
+        return out
+    return [out.member(i) for i in range(n)]
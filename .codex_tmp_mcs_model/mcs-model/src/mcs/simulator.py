@@ -17,7 +17,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Callable, Sequence
 
+import numpy as np
+
 from . import core, extensions as ext
+from .zones import hysteresis_codes
 
 
 Series = Sequence[float] | Callable[[int], float] | float
@@ -70,6 +73,11 @@ class SimConfig:
     thresholds: dict | None = None
 
 
+#: Champs enregistres a chaque pas.
+FIELDS = ("t", "L", "L_eff", "D", "R_eff", "B_eff", "theta",
+          "A", "C", "M", "M_bounded", "U", "mu", "zone")
+
+
 @dataclass
 class SimResult:
     """Trajectoires simulees (listes de longueur n_steps)."""
@@ -89,16 +97,127 @@ class SimResult:
     zone: list[core.Zone] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        d = {k: getattr(self, k) for k in
-             ("t", "L", "L_eff", "D", "R_eff", "B_eff", "theta",
-              "A", "C", "M", "M_bounded", "U", "mu")}
+        d = {k: getattr(self, k) for k in FIELDS[:-1]}
         d["zone"] = [z.value for z in self.zone]
         return d
 
 
-def simulate(cfg: SimConfig, n_steps: int = 52) -> SimResult:
-    """Execute n_steps pas de simulation et retourne les trajectoires."""
-    res = SimResult()
+@dataclass
+class SimArrays:
+    """Trajectoires en colonnes NumPy preallouees (variante compacte).
+
+    Un tableau float64 de longueur n_steps par grandeur, t en int64 et la
+    zone en codes int8 (core.ZONES[code]). Les tableaux sont exposes tels
+    quels (arrays(), to_pandas() sans copie) ; to_dict() garde le format
+    de SimResult pour les appelants existants.
+    """
+    t: np.ndarray
+    L: np.ndarray
+    L_eff: np.ndarray
+    D: np.ndarray
+    R_eff: np.ndarray
+    B_eff: np.ndarray
+    theta: np.ndarray
+    A: np.ndarray
+    C: np.ndarray
+    M: np.ndarray
+    M_bounded: np.ndarray
+    U: np.ndarray
+    mu: np.ndarray
+    zone: np.ndarray
+
+    @classmethod
+    def empty(cls, n_steps: int) -> "SimArrays":
+        cols = {k: np.empty(n_steps) for k in FIELDS[1:-1]}
+        return cls(t=np.arange(n_steps), zone=np.empty(n_steps, np.int8),
+                   **cols)
+
+    @classmethod
+    def from_result(cls, res: SimResult) -> "SimArrays":
+        """Conversion d'un SimResult (listes) en colonnes."""
+        cols = {k: np.asarray(getattr(res, k), dtype=float)
+                for k in FIELDS[1:-1]}
+        return cls(t=np.asarray(res.t, dtype=np.int64),
+                   zone=np.array([core.ZONE_CODES[z] for z in res.zone],
+                                 dtype=np.int8), **cols)
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def zones(self) -> list[core.Zone]:
+        return [core.ZONES[z] for z in self.zone]
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Colonnes par nom, sans copie."""
+        return {k: getattr(self, k) for k in FIELDS}
+
+    def to_pandas(self):
+        """DataFrame (pandas >= 2 requis) partageant la memoire des colonnes.
+
+        copy=False : pas de consolidation par dtype, chaque colonne reste
+        un bloc distinct sur le tableau d'origine (verifie par les tests).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.arrays(), copy=False)
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k).tolist() for k in FIELDS[:-1]}
+        d["zone"] = [z.value for z in self.zones]
+        return d
+
+    def to_result(self) -> SimResult:
+        d = self.to_dict()
+        d["zone"] = self.zones
+        return SimResult(**d)
+
+
+def is_stationary(cfg: SimConfig) -> bool:
+    """Entrees L, R, B constantes et aucune extension active : la dette
+    suit une recurrence affine a coefficients constants (core.debt_after)."""
+    return (all(isinstance(x, (int, float)) for x in (cfg.L, cfg.R, cfg.B))
+            and cfg.mu0 <= 0.0 and cfg.theta_params is None
+            and cfg.control is None and cfg.recovery is None)
+
+
+def _closed_form(cfg: SimConfig, n_steps: int) -> SimArrays:
+    """Trajectoires d'une configuration stationnaire sans boucle par pas :
+    D(t) par core.debt_after, puis A, M et zones sur tout l'horizon."""
+    L, R, B = float(cfg.L), float(cfg.R), float(cfg.B)
+    C = core.capacity(cfg.theta0, R, B, cfg.s)
+    core.total_load(L, cfg.D0)
+    ext.normalized_debt(cfg.D0, cfg.D_crit)   # memes gardes que la boucle
+    res = SimArrays.empty(n_steps)
+    res.D[:] = core.debt_after(cfg.D0, res.t, L, R, B, C, cfg.rho)
+    A = L + res.D
+    res.L[:] = res.L_eff[:] = L
+    res.R_eff[:], res.B_eff[:], res.theta[:] = R, B, cfg.theta0
+    res.A[:] = A
+    res.C[:] = C
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res.M[:] = np.where(A == 0.0, 1.0,
+                            -np.inf if C == 0.0 else 1.0 - A / C)
+        res.M_bounded[:] = np.where(A == 0.0, 1.0,
+                                    -1.0 if C == 0.0 else (C - A) / (C + A))
+    res.U[:] = 0.0
+    res.mu[:] = 0.0
+    res.zone[:] = hysteresis_codes(res.M, cfg.hysteresis_k, cfg.thresholds)
+    return res
+
+
+def simulate(cfg: SimConfig, n_steps: int = 52, compact: bool = False,
+             fast_forward: bool = False) -> SimResult | SimArrays:
+    """Execute n_steps pas de simulation et retourne les trajectoires.
+
+    compact=True : stockage preallouee en tableaux NumPy (SimArrays).
+    fast_forward=True : forme close si la configuration est stationnaire
+    (is_stationary), sinon simulation pas a pas. Egal a la boucle aux
+    arrondis pres (la forme close ne cumule pas d'erreur d'arrondi).
+    """
+    if fast_forward and is_stationary(cfg):
+        res = _closed_form(cfg, n_steps)
+        return res if compact else res.to_result()
+    res = SimArrays.empty(n_steps) if compact else SimResult()
     classifier = core.HysteresisClassifier(k=cfg.hysteresis_k,
                                            thresholds=cfg.thresholds)
 
@@ -126,20 +245,29 @@ def simulate(cfg: SimConfig, n_steps: int = 52) -> SimResult:
         A = core.total_load(L_eff, D)
         M = core.margin_index(A, C)
 
-        # Enregistrement
-        res.t.append(t)
-        res.L.append(L)
-        res.L_eff.append(L_eff)
-        res.D.append(D)
-        res.R_eff.append(R)
-        res.B_eff.append(B_eff)
-        res.theta.append(theta)
-        res.A.append(A)
-        res.C.append(C)
-        res.M.append(M)
-        res.M_bounded.append(core.bounded_margin_index(A, C))
-        res.U.append(U)
-        res.zone.append(classifier.update(M))
+        # Enregistrement (mu est connu apres la mise a jour de la dette)
+        M_bounded = core.bounded_margin_index(A, C)
+        zone = classifier.update(M)
+        if compact:
+            res.L[t], res.L_eff[t], res.D[t] = L, L_eff, D
+            res.R_eff[t], res.B_eff[t], res.theta[t] = R, B_eff, theta
+            res.A[t], res.C[t], res.M[t] = A, C, M
+            res.M_bounded[t], res.U[t] = M_bounded, U
+            res.zone[t] = core.ZONE_CODES[zone]
+        else:
+            res.t.append(t)
+            res.L.append(L)
+            res.L_eff.append(L_eff)
+            res.D.append(D)
+            res.R_eff.append(R)
+            res.B_eff.append(B_eff)
+            res.theta.append(theta)
+            res.A.append(A)
+            res.C.append(C)
+            res.M.append(M)
+            res.M_bounded.append(M_bounded)
+            res.U.append(U)
+            res.zone.append(zone)
 
         # 4. Commande du pas suivant, choisie a partir de M(t)
         if cfg.control is not None:
@@ -157,7 +285,10 @@ def simulate(cfg: SimConfig, n_steps: int = 52) -> SimResult:
         else:
             mu = 0.0
             D = core.debt_update(D, L_eff, R, B_eff, C, cfg.rho)
-        res.mu.append(mu)
+        if compact:
+            res.mu[t] = mu
+        else:
+            res.mu.append(mu)
 
         if cfg.recovery is not None:
             D_n_new = ext.normalized_debt(D, cfg.D_crit)
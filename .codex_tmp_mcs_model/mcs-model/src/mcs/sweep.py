@@ -0,0 +1,249 @@
+"""Balayages de parametres (Phase 1 de la feuille de route, § 9.6).
+
+Une configuration de base (SimConfig) et une liste de jeux de parametres
+(grille ou tirages aleatoires) ; chaque jeu remplace des champs de la
+base, y compris ceux des extensions via un nom pointe ("control.gain",
+"theta_params.alpha", ...).
+
+Les jeux sont decoupes en paquets (shards) simules par simulate_ensemble,
+eventuellement dans un pool de processus, et resumes en une table a une
+ligne par jeu : parametres, occupation des zones, temps de rupture.
+
+Avec checkpoint_dir, chaque paquet termine est ecrit sur disque ; une
+reprise ne recalcule que les paquets manquants.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from . import extensions as ext
+from .cache import config_key
+from .core import ZONE_CODES, ZONES, Zone
+from .ensemble import EnsembleResult, simulate_ensemble
+from .simulator import SimConfig
+
+Params = dict[str, float]
+
+#: Extensions creees avec leurs valeurs par defaut si la base ne les
+#: active pas et qu'un parametre pointe les vise.
+EXTENSIONS = {"theta_params": ext.ThetaParams,
+              "control": ext.ControlParams,
+              "recovery": ext.RecoveryParams}
+
+DEFAULT_SHARD_SIZE = 10_000
+
+
+# ---------------------------------------------------------------------------
+# Jeux de parametres
+# ---------------------------------------------------------------------------
+
+def grid(**axes: Sequence[float]) -> list[Params]:
+    """Produit cartesien : grid(rho=[0.7, 0.9], **{"control.gain": [1, 4]})."""
+    names = list(axes)
+    return [dict(zip(names, map(float, values)))
+            for values in itertools.product(*(axes[k] for k in names))]
+
+
+def random_draws(n: int, seed: int = 0, **ranges) -> list[Params]:
+    """n tirages independants : (bas, haut) -> uniforme, liste -> choix."""
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for name, spec in ranges.items():
+        if isinstance(spec, tuple) and len(spec) == 2:
+            cols[name] = rng.uniform(spec[0], spec[1], n)
+        else:
+            cols[name] = rng.choice(np.asarray(spec, dtype=float), n)
+    return [{k: float(v[i]) for k, v in cols.items()} for i in range(n)]
+
+
+def apply_params(base: SimConfig, params: Params) -> SimConfig:
+    """Copie de base avec les champs de params remplaces."""
+    top: dict = {}
+    nested: dict[str, dict] = {}
+    for name, value in params.items():
+        head, _, attr = name.partition(".")
+        if attr:
+            if head not in EXTENSIONS:
+                raise ValueError(f"extension inconnue : {head}")
+            nested.setdefault(head, {})[attr] = value
+        else:
+            top[head] = value
+    for head, values in nested.items():
+        current = getattr(base, head) or EXTENSIONS[head]()
+        top[head] = replace(current, **values)
+    return replace(base, **top)
+
+
+# ---------------------------------------------------------------------------
+# Indicateurs par trajectoire
+# ---------------------------------------------------------------------------
+
+def _zone_column(z: Zone) -> str:
+    return f"occ_{z.value}"
+
+
+#: Colonnes d'indicateurs de la table de resultats, dans l'ordre.
+METRICS = ([_zone_column(z) for z in ZONES]
+           + ["t_rupture", "M_final", "M_min", "D_final", "D_max"])
+
+
+def summarize(res: EnsembleResult) -> dict[str, np.ndarray]:
+    """Indicateurs par membre : part du temps dans chaque zone (apres
+    hysteresis), premier pas en rupture (NaN si jamais), M et D."""
+    out = {_zone_column(z): (res.zone == code).mean(axis=1)
+           for z, code in ZONE_CODES.items()}
+    rupture = res.zone == ZONE_CODES[Zone.RUPTURE]
+    hit = rupture.any(axis=1)
+    out["t_rupture"] = np.where(hit, rupture.argmax(axis=1), np.nan)
+    out["M_final"] = res.M[:, -1].copy()
+    out["M_min"] = res.M.min(axis=1)
+    out["D_final"] = res.D[:, -1].copy()
+    out["D_max"] = res.D.max(axis=1)
+    return out
+
+
+def _run_shard(base: SimConfig, params: list[Params],
+               n_steps: int) -> dict[str, np.ndarray]:
+    res = simulate_ensemble([apply_params(base, p) for p in params], n_steps)
+    return summarize(res)
+
+
+# ---------------------------------------------------------------------------
+# Resultat et reprise
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SweepResult:
+    """Table a une ligne par jeu de parametres (colonnes NumPy)."""
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def to_pandas(self):
+        """DataFrame (pandas >= 2 requis), sans copie des colonnes."""
+        import pandas as pd
+        return pd.DataFrame(self.columns, copy=False)
+
+
+#: Entrees exogenes de SimConfig (constante, sequence ou fonction de t).
+SERIES = ("L", "R", "B")
+
+
+def _fingerprint(base: SimConfig, params: list[Params], n_steps: int,
+                 shard_size: int) -> str:
+    """Empreinte du balayage, sur la forme canonique de base (config_key).
+
+    Les sequences L, R, B sont remplacees par le sha256 de leurs valeurs
+    en float64 : toutes les valeurs comptent (repr() abrege les grands
+    tableaux) sans canoniser element par element.
+    """
+    series = {}
+    for k in SERIES:
+        v = getattr(base, k)
+        if callable(v):
+            raise ValueError(f"{k} est une fonction de t : pas d'empreinte "
+                             "possible pour la reprise")
+        if not isinstance(v, (int, float)):
+            data = np.ascontiguousarray(v, dtype=np.float64)
+            series[k] = [list(data.shape),
+                         hashlib.sha256(data.tobytes()).hexdigest()]
+    key = config_key(replace(base, **{k: 0.0 for k in series}))
+    blob = json.dumps({"base": key, "series": series, "params": params,
+                       "n_steps": n_steps, "shard_size": shard_size},
+                      sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class _Checkpoint:
+    """Un fichier .npz par paquet termine, et sweep.json pour verifier
+    qu'une reprise porte sur le meme balayage."""
+
+    def __init__(self, directory: Path, fingerprint: str) -> None:
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        meta = self.dir / "sweep.json"
+        if meta.exists():
+            found = json.loads(meta.read_text(encoding="utf-8"))["fingerprint"]
+            if found != fingerprint:
+                raise ValueError(f"{self.dir} contient un autre balayage")
+        else:
+            meta.write_text(json.dumps({"fingerprint": fingerprint}),
+                            encoding="utf-8")
+
+    def _path(self, i: int) -> Path:
+        return self.dir / f"shard_{i:05d}.npz"
+
+    def load(self, i: int) -> dict[str, np.ndarray] | None:
+        path = self._path(i)
+        if not path.exists():
+            return None
+        with np.load(path) as z:
+            return {k: z[k] for k in z.files}
+
+    def save(self, i: int, cols: dict[str, np.ndarray]) -> None:
+        tmp = self.dir / f"shard_{i:05d}.tmp.npz"
+        np.savez(tmp, **cols)
+        tmp.replace(self._path(i))        # un paquet est ecrit ou absent
+
+
+def run_sweep(base: SimConfig, params: Sequence[Params], n_steps: int = 52,
+              workers: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+              checkpoint_dir: str | Path | None = None) -> SweepResult:
+    """Simule base modifiee par chaque jeu de params et resume le tout.
+
+    workers > 1 : paquets repartis sur un pool de processus (base doit
+    etre picklable : pas de lambda pour L, R ou B). Avec checkpoint_dir,
+    les paquets deja presents sont relus au lieu d'etre recalcules ; la
+    base (valeurs de tous ses champs), les params, n_steps et shard_size
+    doivent etre identiques d'une execution a l'autre, et L, R, B ne
+    peuvent pas etre des fonctions de t (ValueError).
+    """
+    params = [dict(p) for p in params]
+    if shard_size < 1:
+        raise ValueError("shard_size doit etre >= 1")
+    shards = [params[i:i + shard_size]
+              for i in range(0, len(params), shard_size)]
+    ckpt = None
+    if checkpoint_dir is not None:
+        ckpt = _Checkpoint(checkpoint_dir,
+                           _fingerprint(base, params, n_steps, shard_size))
+
+    parts: list[dict[str, np.ndarray] | None] = [
+        ckpt.load(i) if ckpt else None for i in range(len(shards))]
+    todo = [i for i, part in enumerate(parts) if part is None]
+
+    def done(i: int, cols: dict[str, np.ndarray]) -> None:
+        parts[i] = cols
+        if ckpt is not None:
+            ckpt.save(i, cols)
+
+    if workers <= 1 or len(todo) <= 1:
+        for i in todo:
+            done(i, _run_shard(base, shards[i], n_steps))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run_shard, base, shards[i], n_steps): i
+                       for i in todo}
+            for fut in as_completed(futures):
+                done(futures[fut], fut.result())
+
+    names = list(dict.fromkeys(k for p in params for k in p))
+    columns = {k: np.array([p.get(k, np.nan) for p in params])
+               for k in names}
+    for k in METRICS:
+        columns[k] = (np.concatenate([part[k] for part in parts])
+                      if parts else np.empty(0))
+    return SweepResult(columns)
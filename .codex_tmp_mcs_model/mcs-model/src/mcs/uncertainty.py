@@ -0,0 +1,96 @@
+"""Bandes d'incertitude par Monte-Carlo (§ 4, § 9.6).
+
+core.margin_uncertainty donne une demi-largeur au premier ordre, en un
+point. Ici, les proxys L, R, B et Theta d'une configuration sont perturbes
+a chaque pas sur des milliers de tirages, simules en un seul passage du
+simulateur d'ensemble, et M(t), D(t) sont resumes par quantiles pas par
+pas. La dette integre les erreurs passees : la bande de D(t), et donc de
+M(t), s'elargit avec le temps, ce que l'ordre un ponctuel ne voit pas.
+
+Modele d'erreur : valeur observee = valeur * (1 + err * z), z ~ N(0, 1),
+tiree a chaque pas (per_step=True) ou une fois par trajectoire (biais
+persistant), puis ramenee dans le domaine (L >= 0, R et B dans [0, 1],
+Theta > 0).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .ensemble import (EnsembleParams, EnsembleResult, input_matrix,
+                       run_ensemble)
+from .simulator import SimConfig
+
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+@dataclass
+class UncertaintyBands:
+    """Quantiles pas par pas : M[q, t], D[q, t] pour q dans quantiles."""
+    t: np.ndarray
+    quantiles: tuple[float, ...]
+    M: np.ndarray
+    D: np.ndarray
+    n_draws: int
+
+    def band(self, name: str, q: float) -> np.ndarray:
+        """Trajectoire du quantile q de "M" ou "D"."""
+        return getattr(self, name)[self.quantiles.index(q)]
+
+
+def _perturb(rng: np.random.Generator, nominal: np.ndarray, err: float,
+             n_draws: int, per_step: bool) -> np.ndarray:
+    shape = (n_draws, nominal.shape[1] if per_step else 1)
+    if err == 0.0:
+        return np.broadcast_to(nominal, (n_draws, nominal.shape[1])).copy()
+    return nominal * (1.0 + err * rng.standard_normal(shape))
+
+
+def monte_carlo_draws(cfg: SimConfig, n_steps: int = 52,
+                      n_draws: int = 1000, rel_err_L: float = 0.0,
+                      rel_err_theta: float = 0.0, rel_err_R: float = 0.0,
+                      rel_err_B: float = 0.0, per_step: bool = True,
+                      seed: int | None = 0) -> EnsembleResult:
+    """Trajectoires des n_draws tirages (tableaux (n_draws, n_steps))."""
+    if n_draws < 1:
+        raise ValueError("n_draws doit etre >= 1")
+    rng = np.random.default_rng(seed)
+    L = _perturb(rng, input_matrix([cfg.L], n_steps), rel_err_L, n_draws,
+                 per_step)
+    R = _perturb(rng, input_matrix([cfg.R], n_steps + 1), rel_err_R,
+                 n_draws, per_step)
+    B = _perturb(rng, input_matrix([cfg.B], n_steps), rel_err_B, n_draws,
+                 per_step)
+    theta = _perturb(rng, np.ones((1, n_steps)), rel_err_theta, n_draws,
+                     per_step)
+    p = EnsembleParams.from_configs([cfg]).repeat(n_draws)
+    return run_ensemble(p, np.maximum(L, 0.0), np.clip(R, 0.0, 1.0),
+                        np.clip(B, 0.0, 1.0),
+                        np.maximum(theta, np.finfo(float).tiny))
+
+
+def monte_carlo_bands(cfg: SimConfig, n_steps: int = 52,
+                      n_draws: int = 1000, rel_err_L: float = 0.0,
+                      rel_err_theta: float = 0.0, rel_err_R: float = 0.0,
+                      rel_err_B: float = 0.0,
+                      quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                      per_step: bool = True,
+                      seed: int | None = 0) -> UncertaintyBands:
+    """Bandes de quantiles de M(t) et D(t) sous erreurs relatives des
+    proxys (memes noms que core.margin_uncertainty ; rel_err_L joue le
+    role de rel_err_A sur la charge fraiche).
+
+    Quantiles empiriques (valeurs tirees, sans interpolation) : robustes
+    aux M = -inf des tirages ou C = 0.
+    """
+    res = monte_carlo_draws(cfg, n_steps, n_draws, rel_err_L, rel_err_theta,
+                            rel_err_R, rel_err_B, per_step, seed)
+    q = tuple(float(x) for x in quantiles)
+    return UncertaintyBands(
+        t=res.t, quantiles=q,
+        M=np.quantile(res.M, q, axis=0, method="inverted_cdf"),
+        D=np.quantile(res.D, q, axis=0, method="inverted_cdf"),
+        n_draws=n_draws)
@@ -0,0 +1,90 @@
+"""Classification vectorisee des zones (§ 4) sur des trajectoires entieres.
+
+Equivalent de core.classify et core.HysteresisClassifier pour des tableaux
+de M : 1-D (une trajectoire) ou 2-D (une trajectoire par ligne, le temps
+sur le dernier axe). Resultat en codes int8, core.ZONES[code].
+
+Hysteresis en deux passes :
+1. zones brutes par np.digitize sur les seuils ;
+2. confirmation par plages : un changement de zone est acquis au pas ou
+   la plage courante de zones brutes identiques atteint max(k, 2) pas
+   (meme regle que HysteresisClassifier, dont le compteur demarre a 1 au
+   premier pas hors zone et n'est teste qu'a partir du second) ; la
+   premiere plage est acquise d'emblee. La zone lue a l'instant t est la
+   zone brute du dernier pas confirme.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .core import DEFAULT_THRESHOLDS
+
+THRESHOLD_KEYS = ("viable", "tension", "saturation", "pre_rupture")
+RUPTURE_CODE = 4
+
+
+def threshold_array(thresholds: dict | None = None) -> np.ndarray:
+    """Seuils (viable, tension, saturation, pre_rupture) en tableau."""
+    th = thresholds or DEFAULT_THRESHOLDS
+    return np.array([th[k] for k in THRESHOLD_KEYS], dtype=float)
+
+
+def _digitize(M: np.ndarray, th: np.ndarray) -> np.ndarray:
+    # bornes croissantes ; right=True donne les inegalites strictes
+    # (M > seuil) de classify, sauf pour pre_rupture (M >= seuil) : la
+    # borne est decalee d'un ulp vers le bas.
+    bins = np.array([np.nextafter(th[3], -np.inf), th[2], th[1], th[0]])
+    codes = RUPTURE_CODE - np.digitize(M, bins, right=True)
+    return np.where(np.isnan(M), RUPTURE_CODE, codes).astype(np.int8)
+
+
+def zone_codes(M, thresholds=None) -> np.ndarray:
+    """core.classify vectorise -> codes int8 de meme forme que M.
+
+    thresholds : dict (ou None, seuils par defaut), ou tableau (N, 4) de
+    seuils par ligne pour M de forme (N, T).
+    """
+    M = np.asarray(M, dtype=float)
+    if thresholds is None or isinstance(thresholds, dict):
+        return _digitize(M, threshold_array(thresholds))
+    th = np.asarray(thresholds, dtype=float)
+    if M.ndim != 2 or th.shape != (M.shape[0], 4):
+        raise ValueError("seuils par ligne : tableau (N, 4) pour M (N, T)")
+    out = np.empty(M.shape, dtype=np.int8)
+    uniq, inv = np.unique(th, axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    for g, row in enumerate(uniq):
+        rows = inv == g
+        out[rows] = _digitize(M[rows], row)
+    return out
+
+
+def confirm_runs(raw: np.ndarray, k=3) -> np.ndarray:
+    """Passe d'hysteresis sur des zones brutes (1-D ou 2-D, temps en
+    dernier axe) ; k entier ou tableau (N,) pour des lignes."""
+    raw = np.asarray(raw)
+    if raw.size == 0:                     # trajectoire vide (n_steps = 0)
+        return raw.astype(np.int8)
+    flat = raw.reshape(-1, raw.shape[-1]) if raw.ndim else raw.reshape(1, 1)
+    n, T = flat.shape
+    need = np.maximum(np.broadcast_to(np.asarray(k), (n,)), 2)[:, None]
+
+    t = np.broadcast_to(np.arange(T), (n, T))
+    new_run = np.ones((n, T), dtype=bool)
+    new_run[:, 1:] = flat[:, 1:] != flat[:, :-1]
+    run_start = np.maximum.accumulate(np.where(new_run, t, 0), axis=1)
+    confirmed = (t - run_start + 1 >= need) | (run_start == 0)
+    last = np.maximum.accumulate(np.where(confirmed, t, 0), axis=1)
+    out = np.take_along_axis(flat, last, axis=1)
+    return out.reshape(raw.shape).astype(np.int8)
+
+
+def hysteresis_codes(M, k=3, thresholds=None) -> np.ndarray:
+    """HysteresisClassifier applique a des trajectoires entieres.
+
+    M : (T,) ou (N, T) ; k : entier ou tableau (N,) ; thresholds : voir
+    zone_codes. Pour chaque ligne, identique a
+    [HysteresisClassifier(k, thresholds).update(m) for m in ligne].
+    """
+    return confirm_runs(zone_codes(M, thresholds), k)
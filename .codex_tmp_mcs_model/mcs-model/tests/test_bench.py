@@ -0,0 +1,48 @@
+"""Tests du banc de performance (mesure et detection des regressions)."""
+
+import json
+
+from mcs import bench
+
+
+def _results(sps, kib):
+    return {"results": {"simulate/T=52": {"steps_per_s": sps,
+                                          "peak_kib": kib}}}
+
+
+def test_compare_thresholds():
+    base = _results(1000.0, 100.0)
+    assert bench.compare(_results(900.0, 110.0), base) == []
+    # 1000 / 800 - 1 = 25 % de ralentissement
+    assert bench.compare(_results(800.0, 100.0), base, max_slowdown=0.3) == []
+    slow = bench.compare(_results(800.0, 100.0), base, max_slowdown=0.2)
+    assert len(slow) == 1 and "debit" in slow[0]
+    fat = bench.compare(_results(1000.0, 200.0), base)
+    assert len(fat) == 1 and "memoire" in fat[0]
+    # cas absent de la reference : ignore
+    assert bench.compare(_results(1.0, 1e9), {"results": {}}) == []
+
+
+def test_cases_cover_simulator_network_and_scenarios():
+    names = [c.name for c in bench.default_cases(quick=True)]
+    assert any(n.startswith("simulate/") for n in names)
+    assert any(n.startswith("simulate_network/") for n in names)
+    assert {f"scenario/{s}" for s in bench.ALL_SCENARIOS} <= set(names)
+
+
+def test_cli_save_then_compare(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    args = ["--quick", "--repeat", "1", "--only", "T=52"]
+    assert bench.main(args + ["--save", str(path)]) == 0
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["format"] == bench.FORMAT_VERSION
+    r = saved["results"]["simulate/T=52"]
+    assert r["steps"] == 52 and r["steps_per_s"] > 0 and r["peak_kib"] > 0
+
+    # reference artificiellement rapide et sobre : regression detectee
+    for r in saved["results"].values():
+        r["steps_per_s"] *= 1e6
+        r["peak_kib"] /= 1e6
+    path.write_text(json.dumps(saved), encoding="utf-8")
+    assert bench.main(args + ["--compare", str(path)]) == 1
+    assert "REGRESSION" in capsys.readouterr().err
@@ -0,0 +1,90 @@
+"""Tests du cache de simulations (prototype interactif, § 8)."""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from mcs import SimArrays, SimConfig, simulate
+from mcs import extensions as ext
+from mcs.cache import ScenarioCache, SimulationCache, config_key
+from mcs.scenarios import ALL_SCENARIOS
+
+
+def test_config_key_is_canonical():
+    a = SimConfig(L=[0.3, 0.4], R=1, B=0.8,
+                  thresholds={"viable": 0.3, "tension": 0.1,
+                              "saturation": 0.05, "pre_rupture": -0.05})
+    b = SimConfig(L=(0.3, 0.4), R=1.0, B=0.8,
+                  thresholds={"pre_rupture": -0.05, "saturation": 0.05,
+                              "tension": 0.1, "viable": 0.3})
+    assert config_key(a) == config_key(b)
+    assert config_key(a) == config_key(SimConfig(L=np.array([0.3, 0.4]),
+                                                 R=1, B=0.8,
+                                                 thresholds=b.thresholds))
+    # l'ordre des valeurs d'une serie, lui, compte
+    assert config_key(SimConfig(L=[0.4, 0.3])) != config_key(
+        SimConfig(L=[0.3, 0.4]))
+    hash(config_key(a))
+    c = SimConfig(control=ext.ControlParams(gain=2.0))
+    assert config_key(c) != config_key(SimConfig())
+    assert config_key(SimConfig(L=lambda t: 0.4)) is None
+
+
+def test_lru_hits_and_eviction():
+    cache = SimulationCache(maxsize=2)
+    cfgs = [SimConfig(rho=r) for r in (0.5, 0.6, 0.7)]
+    first = cache.simulate(cfgs[0], 30)
+    assert cache.simulate(SimConfig(rho=0.5), 30) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.simulate(cfgs[0], 31) is not first        # n_steps compte
+    cache.simulate(cfgs[1], 30)
+    assert len(cache) == 2
+    assert cache.simulate(cfgs[0], 30) is not first        # evince
+    assert first.to_dict() == simulate(cfgs[0], 30).to_dict()
+    with pytest.raises(ValueError):
+        first.M[0] = 0.0                                   # lecture seule
+
+
+def test_callable_inputs_bypass_the_cache():
+    cache = SimulationCache()
+    cfg = SimConfig(L=lambda t: 0.3 + 0.01 * t)
+    res = cache.simulate(cfg, 20)
+    assert len(cache) == 0
+    assert res.to_dict() == simulate(cfg, 20).to_dict()
+
+
+def test_scenarios_are_computed_lazily():
+    scen = ScenarioCache(ALL_SCENARIOS)
+    assert scen.computed() == []
+    res = scen["equipe_projet_9_4"]
+    assert isinstance(res, SimArrays)
+    assert scen["equipe_projet_9_4"] is res
+    assert scen.computed() == ["equipe_projet_9_4"]
+    ref = ALL_SCENARIOS["equipe_projet_9_4"]()
+    np.testing.assert_array_equal(res.M, ref.M)
+    assert res.zones == ref.zone
+
+
+def test_eviction_by_another_session_between_lookup_and_touch():
+    # sessions Streamlit : une instance partagee entre threads. Une autre
+    # session s'execute entre get() et move_to_end() et evince la cle.
+    cache = SimulationCache(maxsize=1)
+    a, b = SimConfig(rho=0.5), SimConfig(rho=0.6)
+    cache.simulate(a, 5)
+    other = threading.Thread(target=cache.simulate, args=(b, 5))
+
+    class Store(OrderedDict):
+        def get(self, key, default=None):
+            res = super().get(key, default)
+            if other.ident is None:
+                other.start()
+                other.join(timeout=0.5)   # sans verrou : b evince a ici
+            return res
+
+    cache._store = Store(cache._store)
+    assert cache.simulate(a, 5).to_dict() == simulate(a, 5).to_dict()
+    other.join()
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 1
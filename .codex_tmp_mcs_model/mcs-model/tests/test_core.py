@@ -2,6 +2,7 @@
 
 import math
 
+import numpy as np
 import pytest
 
 from mcs import core
@@ -97,3 +98,15 @@ class TestZones:
         # § 4 : pres du seuil, 10 % d'erreur sur un proxy ~ 0.1 sur M
         dM = core.margin_uncertainty(M=0.0, A=0.5, C=0.5, rel_err_R=0.10)
         assert dM == pytest.approx(0.10, abs=0.02)
+
+    def test_uncertainty_vectorized(self):
+        M = np.array([0.5, 0.0, -math.inf, 1.0])
+        A = np.array([0.4, 0.5, 0.3, 0.0])
+        C = np.array([0.8, 0.5, 0.0, 0.0])
+        err = dict(rel_err_A=0.05, rel_err_R=0.1, rel_err_B=0.1)
+        dM = core.margin_uncertainty(M, A, C, **err)
+        assert dM.shape == (4,)
+        for i in range(4):
+            assert dM[i] == core.margin_uncertainty(M[i], A[i], C[i], **err)
+        assert dM[2] == math.inf and dM[3] == math.inf
+        assert isinstance(core.margin_uncertainty(0.5, 0.4, 0.8), float)
@@ -1,8 +1,12 @@
 """Tests de la dynamique de dette (§ 3.1) et du remboursement actif (§ 6.1)."""
 
+from fractions import Fraction
+
+import numpy as np
 import pytest
 
 from mcs import core, extensions as ext
+from mcs.simulator import SimConfig, is_stationary, simulate
 
 
 class TestDebtDynamics:
@@ -60,6 +64,65 @@ class TestDebtDynamics:
         assert D == 0.0
 
 
+class TestFastForward:
+    def test_debt_after_matches_stepping(self):
+        for L, R, B, rho in [(0.3, 0.8, 0.7, 0.6), (0.9, 0.5, 0.5, 0.85),
+                             (0.4, 0.6, 0.6, 1.0), (0.5, 0.7, 0.4, 0.0)]:
+            C = core.capacity(1.0, R, B)
+            D = 0.2
+            for _ in range(37):
+                D = core.debt_update(D, L, R, B, C, rho)
+            assert core.debt_after(0.2, 37, L, R, B, C, rho) == \
+                pytest.approx(D, rel=1e-12)
+
+    def test_simulate_fast_forward(self):
+        """Configuration stationnaire : forme close, memes trajectoires."""
+        for cfg in (SimConfig(L=0.4, R=0.7, B=0.65, rho=0.85),
+                    SimConfig(L=0.9, R=0.5, B=0.4, rho=0.95, D0=0.1,
+                              hysteresis_k=1),
+                    SimConfig(L=0.3, R=0.9, B=0.9, rho=1.0, s=0.5)):
+            ref = simulate(cfg, 300)
+            ff = simulate(cfg, 300, fast_forward=True)
+            assert ff.D == pytest.approx(ref.D, rel=1e-9)
+            assert ff.M == pytest.approx(ref.M, rel=1e-9)
+            assert ff.zone == ref.zone
+            assert ff.t == ref.t and ff.mu == ref.mu
+            # meme loi que core.debt_after, pas une copie de la recurrence
+            C = core.capacity(cfg.theta0, cfg.R, cfg.B, cfg.s)
+            for k in (0, 1, 37, 299):
+                assert ff.D[k] == core.debt_after(cfg.D0, k, cfg.L, cfg.R,
+                                                  cfg.B, C, cfg.rho)
+        with pytest.raises(ValueError, match="rho"):
+            simulate(SimConfig(rho=1.5), 10, fast_forward=True)
+        with pytest.raises(ValueError, match="D_crit"):
+            simulate(SimConfig(D_crit=0.0), 10, fast_forward=True)
+
+    def test_debt_after_accurate_near_unit_rho(self):
+        """Pas de compensation catastrophique quand rho -> 1 : erreur
+        d'arrondi de l'ordre de l'ulp, contre une reference exacte."""
+        L, R, B, D0, k = 0.4, 0.8, 0.8, 0.1, 2000
+        C = core.capacity(1.0, R, B)
+        q = Fraction(core.leak(L, R, B) + core.overflow(L, C))
+        for rho in (0.8, 1 - 1e-9, 1 - 1e-12, 1 - 1e-15):
+            r = Fraction(rho)
+            exact = r ** k * Fraction(D0) + q * (1 - r ** k) / (1 - r)
+            got = Fraction(float(core.debt_after(D0, k, L, R, B, C, rho)))
+            assert abs(got - exact) / exact < 1e-15
+        # rho = 0 : la dette ne garde que l'apport du pas precedent
+        ks = np.arange(3)
+        np.testing.assert_array_equal(
+            core.debt_after(D0, ks, L, R, B, C, 0.0), [D0, float(q), float(q)])
+
+    def test_fast_forward_falls_back_to_stepping(self):
+        cfg = SimConfig(L=[0.3, 0.5], R=0.8, B=0.8, mu0=0.2)
+        assert not is_stationary(cfg)
+        assert simulate(cfg, 20, fast_forward=True) == simulate(cfg, 20)
+        long = simulate(SimConfig(), 1_000_000, compact=True,
+                        fast_forward=True)
+        assert long.D[-1] == pytest.approx(
+            core.debt_rest_level(0.4, 0.8, 0.8, 0.8))
+
+
 class TestActiveRepayment:
     def test_viability_condition(self):
         """En deca du seuil mu*, la dette derive ; au-dela, elle se
@@ -0,0 +1,87 @@
+"""Tests du simulateur d'ensemble : equivalence exacte avec simulate."""
+
+import math
+
+import numpy as np
+import pytest
+
+from mcs import SimConfig, Zone, simulate, simulate_ensemble
+from mcs import extensions as ext
+from mcs.ensemble import ZONES
+
+
+def _configs():
+    """Une configuration par extension, plus des entrees variees."""
+    return [
+        SimConfig(L=[0.30, 0.35, 0.40, 0.45, 0.45, 0.42, 0.38, 0.32],
+                  R=[0.85, 0.80, 0.75, 0.70, 0.65, 0.60, 0.65, 0.75],
+                  B=[0.90, 0.85, 0.80, 0.75, 0.70, 0.65, 0.70, 0.80],
+                  rho=0.85, hysteresis_k=1),
+        SimConfig(L=lambda t: 0.75 if 5 <= t < 10 else 0.35, R=0.9, B=0.85,
+                  rho=0.7, mu0=0.5, D_crit=0.5),
+        SimConfig(L=0.4, R=0.7, B=0.65, rho=0.85, D_crit=0.6,
+                  theta_params=ext.ThetaParams(theta0=1.0, theta_min=0.3,
+                                               alpha=0.25, beta=0.15,
+                                               tau=0.15)),
+        SimConfig(L=0.45, R=0.7, B=0.6, rho=0.8, mu0=0.3, D_crit=0.6,
+                  control=ext.ControlParams(chi=0.15, kappa=0.4, eta=0.5,
+                                            delta=0.05, u_max=1.5,
+                                            gain=12.0, m_ref=0.2)),
+        SimConfig(L=0.4, R=lambda t: 0.85 - 0.002 * t, B=0.25, rho=0.8,
+                  D_crit=0.6, s=0.3,
+                  recovery=ext.RecoveryParams(delta_D=0.3, delta_B=0.5,
+                                              B_crit=0.4, R_min=0.2)),
+        SimConfig(L=0.9, R=0.5, B=0.4, rho=0.95, D0=0.2,
+                  thresholds={"viable": 0.5, "tension": 0.2,
+                              "saturation": 0.0, "pre_rupture": -0.5}),
+        SimConfig(L=0.0, R=0.0, B=0.0, rho=0.5),       # A = 0 et C = 0
+        SimConfig(L=0.2, R=0.0, B=0.5, rho=0.5),       # C = 0, A > 0
+    ]
+
+
+def _assert_same(res, ref):
+    assert res.to_dict() == ref.to_dict()
+    assert res.zone == ref.zone
+
+
+@pytest.mark.parametrize("idx", range(len(_configs())))
+def test_single_member_matches_simulate_exactly(idx):
+    cfg = _configs()[idx]
+    _assert_same(simulate_ensemble([cfg], 60).member(0), simulate(cfg, 60))
+
+
+def test_mixed_ensemble_matches_each_member():
+    cfgs = _configs()
+    res = simulate_ensemble(cfgs, 40)
+    assert res.M.shape == (len(cfgs), 40)
+    assert res.zone.dtype == np.int8
+    for i, cfg in enumerate(cfgs):
+        _assert_same(res.member(i), simulate(cfg, 40))
+
+
+def test_edge_cases_follow_section_5():
+    res = simulate_ensemble(_configs()[-2:], 3)
+    assert res.M[0].tolist() == [1.0, 1.0, 1.0]
+    assert res.M[1, 0] == -math.inf
+    assert res.M_bounded[1, 0] == -1.0
+    assert ZONES[res.zone[1, 0]] == Zone.RUPTURE
+
+
+def test_random_draws_match_scalar_runs():
+    rng = np.random.default_rng(7)
+    cfgs = [SimConfig(L=float(L), R=float(R), B=float(B), rho=float(rho),
+                      mu0=float(mu0), D_crit=0.5,
+                      control=ext.ControlParams(gain=float(g)))
+            for L, R, B, rho, mu0, g in rng.uniform(
+                [0.1, 0.3, 0.3, 0.5, 0.0, 0.0],
+                [0.8, 1.0, 1.0, 0.99, 0.6, 5.0], size=(50, 6))]
+    res = simulate_ensemble(cfgs, 30)
+    for i in (0, 17, 49):
+        _assert_same(res.member(i), simulate(cfgs[i], 30))
+
+
+def test_invalid_parameters_raise_like_simulate():
+    with pytest.raises(ValueError, match="rho"):
+        simulate_ensemble([SimConfig(), SimConfig(rho=1.5)], 5)
+    with pytest.raises(ValueError, match="R et B"):
+        simulate_ensemble([SimConfig(R=1.2)], 5)
@@ -1,9 +1,14 @@
 """Tests des extensions 6.2, 6.3, 6.4, 6.5 et du changement de pas (§ 9.1)."""
 
+import warnings
+
+import numpy as np
 import pytest
 
 from mcs import core, extensions as ext
-from mcs.network import NetworkConfig, saturation, simulate_network
+from mcs.network import (CSRCoupling, NetworkConfig, network_gain,
+                         saturation, simulate_network, small_gain_spectral,
+                         spectral_radius)
 from mcs.simulator import SimConfig, simulate
 
 
@@ -118,6 +123,160 @@ class TestNetwork:
         res = simulate_network(net, 200)
         assert max(res[1].L_eff) <= 0.2 + 0.7 + 1e-9
 
+    def test_matrix_form_matches_node_by_node_loop(self):
+        """W @ signal reproduit la somme explicite sur les voisins."""
+        rng = np.random.default_rng(3)
+        nodes = [SimConfig(L=float(L), R=float(R), B=float(B), rho=0.85,
+                           D_crit=0.5, mu0=0.3 * (i % 2),
+                           theta_params=ext.ThetaParams(alpha=0.2, tau=0.3)
+                           if i % 3 == 0 else None)
+                 for i, (L, R, B) in enumerate(
+                     rng.uniform([0.2, 0.4, 0.4], [0.7, 0.9, 0.9], (5, 3)))]
+        lam = rng.uniform(0.0, 0.3, (5, 5)).tolist()
+        for use_sat in (False, True):
+            net = NetworkConfig(nodes=nodes, coupling=lam,
+                                use_saturation=use_sat, D_seuil=0.4)
+            res = simulate_network(net, 30)
+            D = [c.D0 for c in nodes]
+            theta = [1.0] * 5
+            for t in range(30):
+                sig = [saturation(d, 0.4) if use_sat
+                       else ext.normalized_debt(d, 0.5) for d in D]
+                for i, c in enumerate(nodes):
+                    L = c.L + sum(lam[i][j] * sig[j]
+                                  for j in range(5) if j != i)
+                    C = core.capacity(theta[i], c.R, c.B)
+                    assert res[i].L_eff[t] == pytest.approx(L, rel=1e-12)
+                    assert res[i].D[t] == pytest.approx(D[i], rel=1e-12)
+                    if c.mu0 > 0:
+                        mu = ext.repayment_rate(
+                            c.mu0, c.R, ext.normalized_debt(D[i], 0.5), 1.0)
+                        D[i] = ext.debt_update_with_repayment(
+                            D[i], L, c.R, c.B, C, c.rho, mu)
+                    else:
+                        D[i] = core.debt_update(D[i], L, c.R, c.B, C, c.rho)
+                    if c.theta_params is not None:
+                        theta[i] = ext.theta_update(
+                            theta[i], c.theta_params,
+                            ext.normalized_debt(D[i], 0.5), c.B)
+
+    def test_array_coupling_and_compact_result(self):
+        nodes = [SimConfig(L=0.5, R=0.6, B=0.55, rho=0.85, D_crit=0.5),
+                 SimConfig(L=0.3, R=0.9, B=0.9, rho=0.8, D_crit=0.5)]
+        W = np.array([[9.0, 0.0], [0.5, 9.0]])       # diagonale ignoree
+        lists = simulate_network(NetworkConfig(nodes, [[0, 0], [0.5, 0]]), 20)
+        res = simulate_network(NetworkConfig(nodes, W), 20, compact=True)
+        assert res.M.shape == (2, 20)
+        for i in range(2):
+            assert res.member(i) == lists[i]
+        with pytest.raises(ValueError):
+            simulate_network(NetworkConfig(nodes, np.zeros((3, 3))), 5)
+
+    def test_sparse_cascade_scales(self):
+        sparse = pytest.importorskip("scipy.sparse")
+        n = 10_000
+        nodes = [SimConfig(L=0.5, R=0.6, B=0.55, rho=0.85, D_crit=0.5)]
+        nodes += [SimConfig(L=0.3, R=0.85, B=0.85, rho=0.8, D_crit=0.5)
+                  ] * (n - 1)
+        W = sparse.diags([0.4] * (n - 1), -1, format="csr")
+        res = simulate_network(NetworkConfig(nodes, W), 60, compact=True)
+        assert res.L_eff[1, -1] > res.L[1, -1]
+        assert res.M[1, -1] < res.M[1, 0]
+
+    def test_csr_coupling_matches_dense(self):
+        rng = np.random.default_rng(11)
+        dense = rng.uniform(0.0, 0.3, (6, 6)) * (rng.random((6, 6)) < 0.5)
+        W = CSRCoupling.from_dense(dense)
+        np.fill_diagonal(dense, 0.0)
+        assert np.array_equal(W.to_dense(), dense)
+        x = rng.random(6)
+        assert W @ x == pytest.approx(dense @ x, rel=1e-12)
+        dup = CSRCoupling.from_edges(3, [1, 1, 2, 0], [0, 0, 2, 2],
+                                     [0.2, 0.3, 9.0, 0.1])
+        assert dup.nnz == 2 and dup.to_dense()[1, 0] == pytest.approx(0.5)
+        nodes = [SimConfig(L=0.3 + 0.05 * i, R=0.8, B=0.7, D_crit=0.5)
+                 for i in range(6)]
+        a = simulate_network(NetworkConfig(nodes, dense), 30, compact=True)
+        b = simulate_network(NetworkConfig(nodes, W), 30, compact=True)
+        assert b.D == pytest.approx(a.D, rel=1e-12)
+
+    def test_spectral_radius_power_iteration(self):
+        rng = np.random.default_rng(5)
+        m = rng.uniform(0.0, 1.0, (40, 40))
+        exact = max(abs(np.linalg.eigvals(m)))
+        assert spectral_radius(m) == pytest.approx(exact, rel=1e-8)
+        assert spectral_radius(CSRCoupling.from_dense(m)) == pytest.approx(
+            max(abs(np.linalg.eigvals(m - np.diag(np.diag(m))))), rel=1e-8)
+        # cascade en chaine : nilpotente, rayon nul
+        chain = CSRCoupling.from_edges(50, range(1, 50), range(49),
+                                       [0.4] * 49)
+        assert spectral_radius(chain) == 0.0
+
+    def test_spectral_radius_reducible_sparse(self):
+        """Graphes creux (operateur reductible) : encadrement resserre
+        malgre les composantes nulles du vecteur de Perron."""
+        rng = np.random.default_rng(11)
+        for _ in range(200):
+            n = int(rng.integers(3, 30))
+            m = ((rng.random((n, n)) < rng.uniform(0.05, 0.3))
+                 * rng.random((n, n)) * rng.uniform(1e-3, 2.0))
+            exact = max(abs(np.linalg.eigvals(m)))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                got = spectral_radius(m)
+            assert got >= exact * (1 - 1e-12)            # toujours majorant
+            assert got == pytest.approx(exact, rel=1e-6, abs=1e-300)
+        # deux blocs de rayons voisins, l'un alimentant l'autre
+        m = np.zeros((6, 6))
+        m[0, 1] = m[1, 0] = 0.0099
+        m[2, 3] = m[3, 2] = 0.0095
+        m[4, 5], m[0, 2] = 0.5, 0.3
+        assert spectral_radius(m) == pytest.approx(0.0099, rel=1e-9)
+
+    def test_spectral_radius_warns_if_not_converged(self):
+        rng = np.random.default_rng(5)
+        m = rng.uniform(0.0, 1.0, (40, 40))
+        with pytest.warns(RuntimeWarning, match="non converge"):
+            got = spectral_radius(m, tol=1e-15, max_iter=2)
+        assert got >= max(abs(np.linalg.eigvals(m)))
+
+    def test_network_gain_matches_dense_jacobian(self):
+        """Rayon spectral de la carte de dette linearisee, et garde du
+        simulateur : asymetrique mais contractant vs cycle amplificateur."""
+        nodes = [SimConfig(L=0.4, R=0.6, B=0.5, rho=0.8, D_crit=0.5),
+                 SimConfig(L=0.3, R=0.9, B=0.8, rho=0.7, D_crit=0.4,
+                           mu0=0.2),
+                 SimConfig(L=0.5, R=0.7, B=0.6, rho=0.6, D_crit=0.5)]
+        lam = np.array([[0.0, 0.3, 0.0], [0.1, 0.0, 0.2], [0.4, 0.0, 0.0]])
+        net = NetworkConfig(nodes, CSRCoupling.from_dense(lam))
+        R = np.array([0.6, 0.9, 0.7]); B = np.array([0.5, 0.8, 0.6])
+        L = np.array([0.4, 0.3, 0.5]); C = R * B
+        mu = np.array([0.0, 0.2 * 0.9, 0.0])
+        g_L = (1 - R) * (1 - B) + (L > C) + mu * (C > L)
+        g_D = mu * 1.0 / np.array([0.5, 0.4, 0.5]) * np.maximum(0, C - L)
+        J = (np.diag(np.array([0.8, 0.7, 0.6]) + g_D)
+             + np.diag(g_L) @ lam @ np.diag(1 / np.array([0.5, 0.4, 0.5])))
+        gain = network_gain(net)
+        assert gain == pytest.approx(max(abs(np.linalg.eigvals(J))),
+                                     rel=1e-8)
+        assert small_gain_spectral(net) is (gain < 1.0)
+        strong = NetworkConfig(nodes, CSRCoupling.from_dense(lam * 10))
+        assert not small_gain_spectral(strong)
+        with pytest.raises(ValueError, match="petit gain"):
+            simulate_network(strong, 5, require_small_gain=True)
+
+    def test_large_csr_cascade_without_scipy(self):
+        n = 10_000
+        nodes = [SimConfig(L=0.5, R=0.6, B=0.55, rho=0.85, D_crit=0.5)]
+        nodes += [SimConfig(L=0.3, R=0.85, B=0.85, rho=0.8, D_crit=0.5)
+                  ] * (n - 1)
+        W = CSRCoupling.from_edges(n, range(1, n), range(n - 1),
+                                   [0.4] * (n - 1))
+        res = simulate_network(NetworkConfig(nodes, W), 60, compact=True,
+                               require_small_gain=True)
+        assert res.L_eff[1, -1] > res.L[1, -1]
+        assert res.M[1, -1] < res.M[1, 0]
+
     def test_saturation_keeps_differentiation(self):
         s1, s2 = saturation(1.0, 0.5), saturation(10.0, 0.5)
         assert s1 < s2 < 1.0    # differencie les fortes dettes
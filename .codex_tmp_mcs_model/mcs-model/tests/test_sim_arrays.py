@@ -0,0 +1,46 @@
+"""Tests du stockage compact (SimArrays) : meme trajectoires, sans listes."""
+
+import numpy as np
+import pytest
+
+from mcs import SimArrays, SimConfig, ZONES, simulate, simulate_ensemble
+from mcs import extensions as ext
+
+
+CFG = SimConfig(L=0.45, R=0.7, B=0.6, rho=0.8, mu0=0.3, D_crit=0.6,
+                control=ext.ControlParams(chi=0.15, kappa=0.4, eta=0.5,
+                                          delta=0.05, u_max=1.5,
+                                          gain=4.0, m_ref=0.2))
+
+
+def test_compact_matches_lists():
+    ref = simulate(CFG, 60)
+    res = simulate(CFG, 60, compact=True)
+    assert isinstance(res, SimArrays)
+    assert len(res) == 60
+    assert res.M.dtype == np.float64 and res.zone.dtype == np.int8
+    assert res.to_dict() == ref.to_dict()
+    assert res.zones == ref.zone
+    assert res.to_result() == ref
+
+
+def test_exports_share_memory():
+    res = simulate(CFG, 20, compact=True)
+    cols = res.arrays()
+    assert cols["M"] is res.M
+    pd = pytest.importorskip("pandas")
+    df = res.to_pandas()
+    assert isinstance(df, pd.DataFrame)
+    # dtypes melanges (t int64, zone int8, reste float64) : aucune colonne
+    # consolidee ni copiee
+    assert sorted(map(str, set(df.dtypes))) == ["float64", "int64", "int8"]
+    for name, arr in cols.items():
+        assert np.shares_memory(df[name].to_numpy(), arr), name
+
+
+def test_ensemble_member_views():
+    ens = simulate_ensemble([CFG, SimConfig()], 30)
+    res = ens.member(0, compact=True)
+    assert np.shares_memory(res.M, ens.M)
+    assert res.to_dict() == simulate(CFG, 30).to_dict()
+    assert [ZONES[z] for z in ens.zone[1]] == simulate(SimConfig(), 30).zone
@@ -0,0 +1,97 @@
+"""Tests du moteur de balayage : parametres, indicateurs, reprise."""
+
+import numpy as np
+import pytest
+
+from mcs import SimConfig, Zone, simulate
+from mcs import extensions as ext
+from mcs import sweep
+
+
+BASE = SimConfig(L=0.45, R=0.7, B=0.6, rho=0.8, mu0=0.3, D_crit=0.6,
+                 control=ext.ControlParams(chi=0.15, kappa=0.4, eta=0.5,
+                                           delta=0.05, u_max=1.5,
+                                           gain=4.0, m_ref=0.2))
+
+
+def test_grid_and_apply_params():
+    params = sweep.grid(rho=[0.7, 0.9], **{"control.gain": [1.0, 12.0],
+                                          "theta_params.alpha": [0.2]})
+    assert len(params) == 4
+    cfg = sweep.apply_params(BASE, params[-1])
+    assert cfg.rho == 0.9 and cfg.control.gain == 12.0
+    assert cfg.control.chi == 0.15                # reste de la base conserve
+    assert cfg.theta_params == ext.ThetaParams(alpha=0.2)
+    assert BASE.control.gain == 4.0
+    with pytest.raises(ValueError):
+        sweep.apply_params(BASE, {"foo.bar": 1.0})
+
+
+def test_metrics_match_scalar_runs():
+    params = sweep.random_draws(12, seed=1, rho=(0.6, 0.95),
+                                **{"control.gain": [1.0, 4.0, 12.0]})
+    table = sweep.run_sweep(BASE, params, n_steps=40, shard_size=5)
+    assert len(table) == 12
+    assert list(table.columns)[:2] == ["rho", "control.gain"]
+    for i in (0, 7, 11):
+        res = simulate(sweep.apply_params(BASE, params[i]), 40)
+        occ = sum(z == Zone.VIABLE for z in res.zone) / 40
+        assert table["occ_coherence_viable"][i] == occ
+        assert table["M_final"][i] == res.M[-1]
+        rupt = [t for t, z in enumerate(res.zone) if z == Zone.RUPTURE]
+        if rupt:
+            assert table["t_rupture"][i] == rupt[0]
+        else:
+            assert np.isnan(table["t_rupture"][i])
+    occ = sum(table[f"occ_{z.value}"] for z in Zone)
+    assert occ == pytest.approx(np.ones(12))
+    pytest.importorskip("pandas")
+    df = table.to_pandas()
+    assert all(np.shares_memory(df[k].to_numpy(), v)
+               for k, v in table.columns.items())
+
+
+def test_parallel_and_checkpoint_resume(tmp_path):
+    params = sweep.grid(rho=np.linspace(0.5, 0.95, 6),
+                        D_crit=[0.3, 0.6, 1.0])
+    ref = sweep.run_sweep(BASE, params, 30, shard_size=4)
+    ckpt = tmp_path / "ckpt"
+    par = sweep.run_sweep(BASE, params, 30, workers=2, shard_size=4,
+                          checkpoint_dir=ckpt)
+    for k in ref.columns:
+        np.testing.assert_array_equal(par[k], ref[k])
+    shards = sorted(ckpt.glob("shard_*.npz"))
+    assert len(shards) == 5
+
+    # reprise apres interruption : un paquet manquant est recalcule seul
+    shards[2].unlink()
+    mtime = shards[0].stat().st_mtime_ns
+    again = sweep.run_sweep(BASE, params, 30, shard_size=4,
+                            checkpoint_dir=ckpt)
+    assert shards[0].stat().st_mtime_ns == mtime
+    for k in ref.columns:
+        np.testing.assert_array_equal(again[k], ref[k])
+    with pytest.raises(ValueError, match="autre balayage"):
+        sweep.run_sweep(BASE, params, 31, shard_size=4, checkpoint_dir=ckpt)
+
+
+def test_fingerprint_covers_whole_series():
+    # repr() d'un tableau de plus de 1000 valeurs est abrege par "..."
+    L = np.full(2000, 0.4)
+    L2 = L.copy()
+    L2[1000] = 0.5
+    assert repr(SimConfig(L=L)) == repr(SimConfig(L=L2))
+    fp = sweep._fingerprint(SimConfig(L=L), [], 52, 10)
+    assert fp != sweep._fingerprint(SimConfig(L=L2), [], 52, 10)
+    # meme valeurs, meme empreinte : liste ou tableau, 1 ou 1.0
+    assert fp == sweep._fingerprint(SimConfig(L=L.tolist()), [], 52, 10)
+    assert (sweep._fingerprint(SimConfig(rho=1), [], 52, 10)
+            == sweep._fingerprint(SimConfig(rho=1.0), [], 52, 10))
+
+
+def test_checkpoint_rejects_callable_inputs(tmp_path):
+    base = SimConfig(L=lambda t: 0.4 + 0.01 * t)
+    params = sweep.grid(rho=[0.7, 0.9])
+    with pytest.raises(ValueError, match="fonction de t"):
+        sweep.run_sweep(base, params, 10, checkpoint_dir=tmp_path / "c")
+    assert len(sweep.run_sweep(base, params, 10)) == 2
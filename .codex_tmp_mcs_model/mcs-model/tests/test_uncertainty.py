@@ -0,0 +1,51 @@
+"""Tests des bandes d'incertitude Monte-Carlo contre l'ordre un (§ 4)."""
+
+import numpy as np
+import pytest
+
+from mcs import SimConfig, core, simulate
+from mcs import extensions as ext
+from mcs.uncertainty import monte_carlo_bands, monte_carlo_draws
+
+CFG = SimConfig(L=0.4, R=0.7, B=0.65, rho=0.85, D_crit=0.6,
+                theta_params=ext.ThetaParams(theta0=1.0, theta_min=0.3,
+                                             alpha=0.25, beta=0.15,
+                                             tau=0.15))
+
+
+def test_no_error_collapses_to_nominal():
+    bands = monte_carlo_bands(CFG, 40, n_draws=5)
+    ref = simulate(CFG, 40)
+    for q in bands.quantiles:
+        np.testing.assert_array_equal(bands.band("M", q), ref.M)
+        np.testing.assert_array_equal(bands.band("D", q), ref.D)
+
+
+def test_first_step_matches_first_order_propagation():
+    """Au pas 0 (D = D0), M = 1 - A/C : l'ecart-type Monte-Carlo suit
+    (1 - M) * err, comme l'ordre un pour une seule source d'erreur."""
+    err = 0.01
+    bands = monte_carlo_bands(CFG, 5, n_draws=20_000, rel_err_R=err,
+                              quantiles=(0.05, 0.95), seed=1)
+    ref = simulate(CFG, 5)
+    half = (bands.M[1, 0] - bands.M[0, 0]) / 2
+    first = core.margin_uncertainty(ref.M[0], ref.A[0], ref.C[0],
+                                    rel_err_R=err)
+    assert half == pytest.approx(1.645 * first, rel=0.05)
+
+
+def test_debt_band_widens_and_draws_are_reproducible():
+    kw = dict(n_draws=2000, rel_err_L=0.1, rel_err_theta=0.05,
+              rel_err_R=0.1, rel_err_B=0.1)
+    bands = monte_carlo_bands(CFG, 60, **kw)
+    width = bands.D[-1] - bands.D[0]
+    assert width[0] == 0.0                      # D0 connu
+    assert width[-1] > width[5] > 0.0
+    assert np.all(np.diff(bands.M, axis=0) >= 0.0)  # quantiles ordonnes
+    again = monte_carlo_bands(CFG, 60, **kw)
+    np.testing.assert_array_equal(again.M, bands.M)
+
+    draws = monte_carlo_draws(CFG, 60, per_step=False, **kw)
+    # biais persistant : un seul facteur par trajectoire
+    assert np.all(draws.L == draws.L[:, :1])
+    assert np.all((draws.B_eff >= 0.0) & (draws.B_eff <= 1.0))
@@ -0,0 +1,69 @@
+"""Tests de la classification vectorisee contre core.classify et
+core.HysteresisClassifier."""
+
+import numpy as np
+import pytest
+
+from mcs import SimConfig, core, simulate, simulate_ensemble
+from mcs.core import ZONES
+from mcs.network import NetworkConfig, simulate_network
+from mcs.zones import hysteresis_codes, zone_codes
+
+
+def _scalar(M, k, thresholds=None):
+    clf = core.HysteresisClassifier(k=k, thresholds=thresholds)
+    return [clf.update(m) for m in M]
+
+
+def test_raw_codes_match_classify_on_boundaries():
+    th = core.DEFAULT_THRESHOLDS
+    M = np.array([1.0, 0.30, 0.2, 0.10, 0.07, 0.05, 0.0, -0.05, -0.0500001,
+                  -np.inf, np.inf, np.nan] + list(th.values()))
+    codes = zone_codes(M)
+    assert [ZONES[c] for c in codes] == [core.classify(m) for m in M]
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3, 5])
+def test_hysteresis_matches_scalar_classifier(k):
+    rng = np.random.default_rng(k)
+    # marche bruitee autour des seuils : nombreux aller-retours
+    M = np.cumsum(rng.normal(0, 0.05, (20, 200)), axis=1) * 0.5 + 0.1
+    M[3, 50:60] = np.nan
+    codes = hysteresis_codes(M, k)
+    assert codes.dtype == np.int8 and codes.shape == M.shape
+    for row, c in zip(M, codes):
+        assert [ZONES[z] for z in c] == _scalar(row, k)
+    assert [ZONES[z] for z in hysteresis_codes(M[0], k)] == _scalar(M[0], k)
+
+
+def test_per_row_k_and_thresholds():
+    rng = np.random.default_rng(9)
+    M = rng.uniform(-0.3, 0.6, (6, 80))
+    k = np.array([1, 2, 3, 3, 4, 6])
+    custom = {"viable": 0.5, "tension": 0.2, "saturation": 0.0,
+              "pre_rupture": -0.2}
+    ths = [None, custom, None, custom, custom, None]
+    th_arr = np.array([[(t or core.DEFAULT_THRESHOLDS)[key] for key in
+                        ("viable", "tension", "saturation", "pre_rupture")]
+                       for t in ths])
+    codes = hysteresis_codes(M, k, th_arr)
+    for i in range(6):
+        assert [ZONES[z] for z in codes[i]] == _scalar(M[i], k[i], ths[i])
+
+
+def test_empty_trajectories():
+    assert hysteresis_codes(np.empty(0)).shape == (0,)
+    codes = hysteresis_codes(np.empty((3, 0)), k=np.array([1, 2, 3]))
+    assert codes.shape == (3, 0) and codes.dtype == np.int8
+
+
+def test_engines_accept_zero_steps():
+    nodes = [SimConfig(), SimConfig(L=0.6)]
+    assert simulate(nodes[0], 0).zone == []
+    assert len(simulate(nodes[0], 0, compact=True)) == 0
+    assert simulate(nodes[0], 0, fast_forward=True).zone == []
+    ens = simulate_ensemble(nodes, 0)
+    assert ens.M.shape == ens.zone.shape == (2, 0)
+    net = NetworkConfig(nodes, [[0.0, 0.1], [0.1, 0.0]])
+    assert [r.zone for r in simulate_network(net, 0)] == [[], []]
+    assert simulate_network(net, 0, compact=True).zone.shape == (2, 0)
@@ -20,6 +20,7 @@ OUT_DIR=""
 STRICT="false"
 PARALLEL="false"
 CORR_THRESHOLD="0.6"
+CAS_DIR=""
 
 usage() {
   cat <<'EOF'
@@ -32,6 +33,7 @@ Options:
   --strict               Fail if expected artifacts are missing
   --corr-threshold N     RiftLens correlation threshold, default: 0.6
   --parallel             Accepted for compatibility, currently runs sequentially
+  --cas-dir DIR          Shared content-addressed store (DIR/objects/<sha256>)
   -h, --help             Show this help
 EOF
 }
@@ -58,6 +60,10 @@ while [ $# -gt 0 ]; do
       PARALLEL="true"
       shift 1
       ;;
+    --cas-dir)
+      CAS_DIR="${2:-}"
+      shift 2
+      ;;
     --help|-h)
       usage
       exit 0
@@ -137,6 +143,7 @@ write_failure_manifest() {
         --multi-csv "$MULTI_CSV" \
         --current-csv "$CURRENT_CSV" \
         --previous-csv "$PREVIOUS_CSV" \
+        ${CAS_DIR:+--cas-dir "$CAS_DIR"} \
         --status FAIL \
         --failure-step "$CURRENT_STEP" \
         --strict >/dev/null 2>&1 || true
@@ -147,6 +154,7 @@ write_failure_manifest() {
         --multi-csv "$MULTI_CSV" \
         --current-csv "$CURRENT_CSV" \
         --previous-csv "$PREVIOUS_CSV" \
+        ${CAS_DIR:+--cas-dir "$CAS_DIR"} \
         --status FAIL \
         --failure-step "$CURRENT_STEP" >/dev/null 2>&1 || true
     fi
@@ -165,6 +173,7 @@ PREVIOUS_CSV=$PREVIOUS_CSV
 STRICT=$STRICT
 PARALLEL=$PARALLEL
 CORR_THRESHOLD=$CORR_THRESHOLD
+CAS_DIR=$CAS_DIR
 EOF
 
 CURRENT_STEP="riftlens"
@@ -191,6 +200,7 @@ if [ "$STRICT" = "true" ]; then
     --multi-csv "$MULTI_CSV" \
     --current-csv "$CURRENT_CSV" \
     --previous-csv "$PREVIOUS_CSV" \
+    ${CAS_DIR:+--cas-dir "$CAS_DIR"} \
     --status PASS \
     --strict
 else
@@ -200,6 +210,7 @@ else
     --multi-csv "$MULTI_CSV" \
     --current-csv "$CURRENT_CSV" \
     --previous-csv "$PREVIOUS_CSV" \
+    ${CAS_DIR:+--cas-dir "$CAS_DIR"} \
     --status PASS
 fi
 
@@ -0,0 +1,91 @@
+"""Content-addressed object store shared across runs.
+
+Layout: <root>/objects/<sha256>. Objects are immutable (read-only).
+
+A hard link shares the object's inode: writing through it (as root, or after
+a chmod) changes the object and every other run linked to it. Hence:
+
+- directories written exactly once (``bareflux run``) may hold hard links
+  (``ingest``/``link``), so disk usage scales with unique content;
+- directories that tools rewrite in place (the orchestration out-dir) only
+  get a copy stored (``put``) and an object reference in their manifest;
+- a linked directory about to be rewritten (a re-run of collect_stable into
+  the same out-dir) is detached first (``detach_tree``): each link becomes a
+  private writable copy.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from .hashing import sha256_file
+
+OBJECTS_DIR = "objects"
+
+
+class ObjectStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects_dir = self.root / OBJECTS_DIR
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest
+
+    def rel_object_path(self, digest: str, start: Path) -> str:
+        return Path(os.path.relpath(self.object_path(digest), start)).as_posix()
+
+    def put(self, path: Path, digest: Optional[str] = None) -> str:
+        """Store a copy of `path` (source left untouched); returns its sha256."""
+        digest = digest or sha256_file(path)
+        obj = self.object_path(digest)
+        if not obj.exists():
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.objects_dir / f".tmp-{uuid.uuid4().hex}"
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp, obj)
+        return digest
+
+    def link(self, digest: str, dest: Path) -> None:
+        """Materialise object `digest` at `dest` (hard link, copy as fallback)."""
+        obj = self.object_path(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            os.link(obj, tmp)
+        except OSError:
+            shutil.copyfile(obj, tmp)
+        os.replace(tmp, dest)
+
+    def ingest(self, path: Path, digest: Optional[str] = None) -> str:
+        """Store `path` and replace it with a link to the object."""
+        digest = self.put(path, digest)
+        self.link(digest, path)
+        return digest
+
+    def detach(self, path: Path) -> bool:
+        """Break the hard link at `path` (copy-on-write before a rewrite).
+
+        A file with other links is replaced by a private, writable copy; the
+        object and the other links are left untouched. Returns True if a
+        link was broken.
+        """
+        st = path.lstat()
+        if not stat.S_ISREG(st.st_mode) or st.st_nlink < 2:
+            return False
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        shutil.copyfile(path, tmp)
+        os.chmod(tmp, stat.S_IMODE(st.st_mode) | stat.S_IWUSR)
+        os.replace(tmp, path)
+        return True
+
+    def detach_tree(self, root: Path) -> int:
+        """detach() every regular file under `root`; returns the count."""
+        if not root.is_dir():
+            return 0
+        return sum(self.detach(p) for p in sorted(root.rglob("*")) if p.is_file())
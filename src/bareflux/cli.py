@@ -3,6 +3,7 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+from .cas import ObjectStore
 from .engine import run_observer
 from .util import load_json_file
 
@@ -21,6 +22,11 @@ def build_parser() -> argparse.ArgumentParser:
     runp.add_argument(
         "--config", required=False, default=None, help="Path to JSON config (optional)"
     )
+    runp.add_argument(
+        "--cas",
+        action="store_true",
+        help="Store artifacts once in <output>/objects/<sha256> and link them into run_*",
+    )
 
     schemap = sub.add_parser("schemas", help="Print available JSON schema paths")
     schemap.add_argument("--json", action="store_true", help="Output as JSON")
@@ -60,6 +66,7 @@ def main(argv=None) -> int:
             output_root=output_root,
             config=config,
             cli_argv=argv,
+            object_store=ObjectStore(output_root) if args.cas else None,
         )
 
         # Minimal run-level report.json for compatibility with smoke tests
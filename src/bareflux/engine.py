@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import zipfile
 from dataclasses import dataclass
@@ -11,7 +12,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
-from .hashing import write_hashes_file
+from .cas import ObjectStore
+from .hashing import hash_rel_paths, write_hashes_file
 
 
 @dataclass
@@ -233,7 +235,11 @@ def _series_config_from_config(
 
 
 def run_observer(
-    input_csv: Path, output_root: Path, config: Dict[str, Any], cli_argv=None
+    input_csv: Path,
+    output_root: Path,
+    config: Dict[str, Any],
+    cli_argv=None,
+    object_store: Optional[ObjectStore] = None,
 ) -> Path:
     if not input_csv.exists():
         raise SystemExit(f"Input not found: {input_csv}")
@@ -247,7 +253,10 @@ def run_observer(
     # Snapshot inputs for auditability
     inputs_dir = run_dir / "inputs"
     inputs_dir.mkdir()
-    shutil.copy2(input_csv, inputs_dir / input_csv.name)
+    if object_store is not None:
+        object_store.link(object_store.put(input_csv), inputs_dir / input_csv.name)
+    else:
+        shutil.copy2(input_csv, inputs_dir / input_csv.name)
 
     config_used_path = run_dir / "config_used.json"
     _write_json(config_used_path, config)
@@ -337,6 +346,11 @@ def run_observer(
             }
         ],
     }
+    if object_store is not None:
+        # artifacts are links to <object_store>/<sha256>, see hashes.sha256
+        manifest["object_store"] = Path(
+            os.path.relpath(object_store.objects_dir, run_dir)
+        ).as_posix()
     run_manifest_path = run_dir / "run_manifest.json"
     _write_json(run_manifest_path, manifest)
 
@@ -354,7 +368,14 @@ def run_observer(
     _zip_dir(bundle_zip_path, run_dir, bundle_rel_paths)
 
     # hashes.sha256 includes sha256 for everything above + bundle.zip (but not hashes.sha256)
-    hash_rel_paths = bundle_rel_paths + [Path("bundle.zip")]
-    write_hashes_file(run_dir, hash_rel_paths, out_name="hashes.sha256")
+    hashed_rel_paths = bundle_rel_paths + [Path("bundle.zip")]
+    digests = hash_rel_paths(run_dir, hashed_rel_paths)
+    write_hashes_file(
+        run_dir, hashed_rel_paths, out_name="hashes.sha256", digests=digests
+    )
+
+    if object_store is not None:
+        for digest, rel in digests:
+            object_store.ingest(run_dir / rel, digest)
 
     return run_dir
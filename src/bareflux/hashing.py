@@ -1,6 +1,6 @@
 import hashlib
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 
 def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
@@ -14,15 +14,24 @@ def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
     return h.hexdigest()
 
 
+def hash_rel_paths(run_dir: Path, rel_paths: Iterable[Path]) -> List[Tuple[str, Path]]:
+    """sha256 for each rel_path (relative to run_dir), in order."""
+    return [(sha256_file(run_dir / rel), rel) for rel in rel_paths]
+
+
 def write_hashes_file(
-    run_dir: Path, rel_paths: Iterable[Path], out_name: str = "hashes.sha256"
+    run_dir: Path,
+    rel_paths: Iterable[Path],
+    out_name: str = "hashes.sha256",
+    digests: Optional[List[Tuple[str, Path]]] = None,
 ) -> Path:
-    """Write sha256 for each rel_path (relative to run_dir). Does not hash the hashes file itself."""
+    """Write sha256 for each rel_path (relative to run_dir). Does not hash the hashes file itself.
+
+    `digests` (from hash_rel_paths) avoids hashing the same files twice.
+    """
     out_path = run_dir / out_name
-    lines = []
-    for rel in rel_paths:
-        abs_path = run_dir / rel
-        digest = sha256_file(abs_path)
-        lines.append(f"{digest}  {rel.as_posix()}")
+    if digests is None:
+        digests = hash_rel_paths(run_dir, rel_paths)
+    lines = [f"{digest}  {rel.as_posix()}" for digest, rel in digests]
     out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
     return out_path
@@ -11,6 +11,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from .cas import ObjectStore
+
 MODULE_NAMES = ("RiftLens", "NullTrace", "VoidMark")
 
 
@@ -59,15 +61,26 @@ def rel_or_abs(path: Path, root: Path) -> str:
         return str(path.resolve())
 
 
-def file_entry(path: Path, root: Path) -> dict[str, Any]:
+def file_entry(
+    path: Path,
+    root: Path,
+    object_store: ObjectStore | None = None,
+) -> dict[str, Any]:
+    """Manifest entry for path. With an object store, a copy of the content
+    is stored as objects/<sha256> and referenced from the entry; path itself
+    is left in place (the out-dir is rewritten by the next run)."""
     if not path.exists() or not path.is_file():
         return {"path": rel_or_abs(path, root), "exists": False, "sha256": ""}
-    return {
+    entry = {
         "path": rel_or_abs(path, root),
         "exists": True,
         "sha256": sha256_file(path),
         "bytes": path.stat().st_size,
     }
+    if object_store is not None:
+        object_store.put(path, entry["sha256"])
+        entry["object"] = rel_or_abs(object_store.object_path(entry["sha256"]), root)
+    return entry
 
 
 def newest(paths: list[Path]) -> Path | None:
@@ -147,8 +160,13 @@ def build_manifest(
     status: str,
     strict: bool,
     failure_step: str = "",
+    object_store: ObjectStore | None = None,
 ) -> dict[str, Any]:
     root = out_dir.resolve()
+
+    def output_entry(path: Path) -> dict[str, Any]:
+        return file_entry(path, root, object_store)
+
     outputs = discover_outputs(out_dir)
     errors = strict_errors(out_dir) if strict else []
     final_status = "FAIL" if errors or status.upper() == "FAIL" else "PASS"
@@ -166,25 +184,26 @@ def build_manifest(
         "modules_dir": str(modules_dir.resolve()),
         "modules": module_metadata(modules_dir),
         "datasets": {
-            key: file_entry(path, root) for key, path in sorted(datasets.items())
+            key: file_entry(path, root, object_store)
+            for key, path in sorted(datasets.items())
         },
         "outputs": {
             "riftlens": {
-                "graph_report": file_entry(outputs["riftlens"]["graph_report"], root)
+                "graph_report": output_entry(outputs["riftlens"]["graph_report"])
             },
             "nulltrace": {
                 "previous_manifest": (
-                    file_entry(nt["previous_manifest"], root)
+                    output_entry(nt["previous_manifest"])
                     if nt["previous_manifest"] is not None
                     else {"exists": False, "path": "", "sha256": ""}
                 ),
                 "current_manifest": (
-                    file_entry(nt["current_manifest"], root)
+                    output_entry(nt["current_manifest"])
                     if nt["current_manifest"] is not None
                     else {"exists": False, "path": "", "sha256": ""}
                 ),
                 "current_diff": (
-                    file_entry(nt["current_diff"], root)
+                    output_entry(nt["current_diff"])
                     if nt["current_diff"] is not None
                     else {"exists": False, "path": "", "sha256": ""}
                 ),
@@ -192,8 +211,7 @@ def build_manifest(
             "voidmark": {
                 "vault_file_count": len(outputs["voidmark"]["vault_files"]),
                 "vault_files": [
-                    file_entry(p, root)
-                    for p in outputs["voidmark"]["vault_files"][:200]
+                    output_entry(p) for p in outputs["voidmark"]["vault_files"][:200]
                 ],
             },
         },
@@ -221,6 +239,7 @@ def write_manifest_from_args(args: argparse.Namespace) -> int:
         status=args.status,
         strict=args.strict,
         failure_step=args.failure_step or "",
+        object_store=ObjectStore(Path(args.cas_dir)) if args.cas_dir else None,
     )
     out_path = out_dir / "bareflux_manifest.json"
     write_json(out_path, manifest)
@@ -371,6 +390,11 @@ def build_parser() -> argparse.ArgumentParser:
     write.add_argument("--status", default="PASS", choices=["PASS", "FAIL"])
     write.add_argument("--failure-step", default="")
     write.add_argument("--strict", action="store_true")
+    write.add_argument(
+        "--cas-dir",
+        default="",
+        help="Content-addressed store root (objects/<sha256>) for manifest files",
+    )
     write.set_defaults(func=write_manifest_from_args)
 
     check = sub.add_parser("strict-check")
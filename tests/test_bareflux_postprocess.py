@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import bareflux_postprocess as pp  # noqa: E402
+
+
+def test_compute_stats_matches_scalar_quantiles():
+    vals = np.random.default_rng(3).normal(size=101)
+    s = sorted(vals.tolist())
+    st = pp.compute_stats(vals)
+    for key, q in zip(("q05", "q25", "q50", "q75", "q95"), pp.QUANTILES):
+        pos = (len(s) - 1) * q
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        frac = pos - lo
+        assert st[key] == s[lo] * (1 - frac) + s[hi] * frac
+    assert st["mad"] == pytest.approx(np.median(np.abs(vals - np.median(vals))))
+    assert st["min"] == s[0] and st["max"] == s[-1]
+
+
+def _baseline_quantile(sorted_vals, q):
+    # implémentation scalaire d'origine (avant vectorisation)
+    if q <= 0:
+        return float(sorted_vals[0])
+    if q >= 1:
+        return float(sorted_vals[-1])
+    pos = (len(sorted_vals) - 1) * q
+    lo, hi = int(math.floor(pos)), int(math.ceil(pos))
+    if lo == hi:
+        return float(sorted_vals[lo])
+    frac = pos - lo
+    return float(sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac)
+
+
+def _baseline_stats(vals):
+    s = sorted(vals)
+    med = _baseline_quantile(s, 0.5)
+    out = {
+        "mean": statistics.mean(vals),
+        "std": statistics.pstdev(vals) if len(vals) > 1 else 0.0,
+        "mad": _baseline_quantile(sorted(abs(v - med) for v in vals), 0.5),
+        "min": s[0],
+        "max": s[-1],
+    }
+    for key, q in zip(("q05", "q25", "q50", "q75", "q95"), pp.QUANTILES):
+        out[key] = _baseline_quantile(s, q)
+    out["iqr"] = out["q75"] - out["q25"]
+    return out
+
+
+def test_compute_stats_regression_against_baseline():
+    rng = np.random.default_rng(27)
+    for _ in range(200):
+        n = int(rng.integers(1, 300))
+        vals = (rng.standard_normal(n) * 10 ** rng.uniform(-3, 3)).tolist()
+        if rng.random() < 0.3:
+            vals += vals[: n // 2]  # doublons : plages égales dans le tri
+        st = pp.compute_stats(vals)
+        ref = _baseline_stats(vals)
+        for key in ("q05", "q25", "q50", "q75", "q95", "mad", "iqr", "min", "max"):
+            assert st[key] == ref[key], key
+        # np.mean / np.std : au dernier ulp près seulement
+        assert st["mean"] == pytest.approx(ref["mean"], rel=1e-12, abs=1e-300)
+        assert st["std"] == pytest.approx(ref["std"], rel=1e-12, abs=1e-300)
+
+
+def test_abs_exceedance_counts_strictly_greater():
+    out = pp.abs_exceedance([0.1, -0.2, 0.05, 0.3], [0.1, 0.2])
+    assert out == {"0.1": {"pct_abs_gt": 0.5}, "0.2": {"pct_abs_gt": 0.25}}
+
+
+def test_multi_column_drift_weights_and_exclusion():
+    stats = {
+        "a": pp.compute_stats([1.0, 1.0]),
+        "b": pp.compute_stats([0.0, 0.0]),
+        "t": pp.compute_stats([5.0, 5.0]),
+    }
+    cfg = {"exclude": ["t"], "weights": {"default": 1.0, "a": 0.5}}
+    score, cols = pp.multi_column_drift(stats, cfg)
+    assert set(cols) == {"a", "b"}
+    assert score == pytest.approx(0.5)
+    score_mean, _ = pp.multi_column_drift(stats, cfg | {"aggregate": "weighted_mean"})
+    assert score_mean == pytest.approx(0.5 / 1.5)
+
+
+def test_postprocess_scores_every_column(tmp_path: Path):
+    out = tmp_path / "out"
+    shadow = out / "nulltrace_curr" / "shadows" / "x" / "shadow_diff.json"
+    shadow.parent.mkdir(parents=True)
+    cols = {f"c{i}": {"deltas": {"0": 0.01 * i, "1": -0.01 * i}} for i in range(40)}
+    cols["b"] = {"deltas": {"0": 0.2, "1": 0.1}}
+    shadow.write_text(json.dumps({"diff": {"column_changes": cols}}), encoding="utf-8")
+    config = json.loads((TOOLS / "config_score.json").read_text(encoding="utf-8"))
+    config["score_formula"] = "multi_column_drift_v1"
+    cfg_path = tmp_path / "config.json"
+    cfg_path.write_text(json.dumps(config), encoding="utf-8")
+
+    cmd = [
+        sys.executable,
+        str(TOOLS / "bareflux_postprocess.py"),
+        "--out",
+        str(out),
+        "--config",
+        str(cfg_path),
+        "--workers",
+        "4",
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+    summary = json.loads(
+        (out / "bareflux_orchestration_summary.patched.json").read_text(
+            encoding="utf-8"
+        )
+    )
+    assert len(summary["drift"]["columns"]) == 41
+    assert summary["drift"]["score_effective_v1"] is None
+    ci = json.loads((out / "bareflux_ci_status.json").read_text(encoding="utf-8"))
+    assert ci["score_formula"] == "multi_column_drift_v1"
+    assert ci["score_multi_column_v1"] == pytest.approx(0.5 * 0.9 * 0.78)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+from bareflux import orchestration
+from bareflux.cas import ObjectStore
+from bareflux.engine import run_observer
+from bareflux.hashing import sha256_file
+from bareflux.util import load_json_file
+
+
+def test_object_store_put_link(tmp_path: Path):
+    src = tmp_path / "a.txt"
+    src.write_text("hello\n", encoding="utf-8")
+    store = ObjectStore(tmp_path / "cas")
+
+    digest = store.put(src)
+    assert digest == sha256_file(src)
+    assert store.object_path(digest).read_text(encoding="utf-8") == "hello\n"
+    assert store.object_path(digest).stat().st_mode & 0o222 == 0
+    assert src.stat().st_ino != store.object_path(digest).stat().st_ino
+
+    dest = tmp_path / "run" / "a.txt"
+    store.link(digest, dest)
+    assert dest.stat().st_ino == store.object_path(digest).stat().st_ino
+    assert store.put(dest) == digest
+    assert len(list(store.objects_dir.iterdir())) == 1
+
+
+def test_run_observer_shares_objects_across_runs(tmp_path: Path):
+    repo_root = Path(__file__).resolve().parents[1]
+    input_csv = repo_root / "tests" / "data" / "minimal_timeseries.csv"
+    config = load_json_file(repo_root / "examples" / "bareflux.json")
+    out_root = tmp_path / "_bareflux_out"
+    store = ObjectStore(out_root)
+
+    runs = [
+        run_observer(input_csv, out_root, config, object_store=store) for _ in range(2)
+    ]
+
+    for run_dir in runs:
+        manifest = json.loads((run_dir / "run_manifest.json").read_text("utf-8"))
+        assert manifest["object_store"] == "../objects"
+        for line in (run_dir / "hashes.sha256").read_text("utf-8").splitlines():
+            digest, rel = line.split(maxsplit=1)
+            obj = store.object_path(digest)
+            assert obj.exists()
+            assert sha256_file(run_dir / rel) == digest
+            assert (run_dir / rel).stat().st_ino == obj.stat().st_ino
+
+    a, b = (r / "inputs" / input_csv.name for r in runs)
+    assert a.stat().st_ino == b.stat().st_ino
+
+
+def _all_objects_intact(store: ObjectStore) -> bool:
+    return all(sha256_file(o) == o.name for o in store.objects_dir.iterdir())
+
+
+def test_detach_breaks_link_without_touching_object(tmp_path: Path):
+    src = tmp_path / "a.txt"
+    src.write_text("v1\n", encoding="utf-8")
+    store = ObjectStore(tmp_path / "cas")
+    digest = store.ingest(src)
+    other = tmp_path / "b.txt"
+    store.link(digest, other)
+
+    assert store.detach(src) is True
+    assert store.detach(src) is False
+    src.write_text("v2\n", encoding="utf-8")
+    assert other.read_text(encoding="utf-8") == "v1\n"
+    assert _all_objects_intact(store)
+    assert store.detach_tree(tmp_path / "missing") == 0
+
+
+def test_write_manifest_cas_dir_keeps_out_dir_writable(tmp_path: Path):
+    out = tmp_path / "_bareflux_out"
+    report = out / "riftlens" / "graph_report.json"
+    report.parent.mkdir(parents=True)
+    cas = tmp_path / "cas"
+    argv = [
+        "write-manifest",
+        "--out-dir",
+        str(out),
+        "--modules-dir",
+        str(tmp_path / "modules"),
+        "--cas-dir",
+        str(cas),
+    ]
+    store = ObjectStore(cas)
+
+    for version in ("v1", "v2"):
+        # le module réécrit sa sortie en place, comme RiftLens
+        with report.open("w", encoding="utf-8") as f:
+            f.write(json.dumps({"edges": [], "version": version}))
+        assert orchestration.main(argv) == 0
+        manifest = load_json_file(out / "bareflux_manifest.json")
+        entry = manifest["outputs"]["riftlens"]["graph_report"]
+        obj = store.object_path(entry["sha256"])
+        assert (out / entry["object"]).resolve() == obj.resolve()
+        assert report.stat().st_nlink == 1
+        assert sha256_file(obj) == entry["sha256"]
+
+    assert len(list(store.objects_dir.iterdir())) == 2
+    assert _all_objects_intact(store)
+
+
+FAKE_MODULES = {
+    "riftlens": """
+import argparse, json, os
+ap = argparse.ArgumentParser()
+ap.add_argument("csv")
+ap.add_argument("--corr-threshold")
+ap.add_argument("--output-dir")
+a = ap.parse_args()
+os.makedirs(a.output_dir, exist_ok=True)
+with open(os.path.join(a.output_dir, "graph_report.json"), "w") as f:
+    json.dump({"edges": [{"source": "a", "target": "b"}],
+               "gen": os.environ["FAKE_GEN"]}, f)
+""",
+    "nulltrace": """
+import argparse, json, os
+ap = argparse.ArgumentParser()
+ap.add_argument("cmd")
+ap.add_argument("csv")
+ap.add_argument("--previous-shadow", default="")
+ap.add_argument("--output-dir")
+a = ap.parse_args()
+d = os.path.join(a.output_dir, "shadows", "s1")
+os.makedirs(d, exist_ok=True)
+with open(os.path.join(d, "manifest.json"), "w") as f:
+    json.dump({"gen": os.environ["FAKE_GEN"]}, f)
+if a.previous_shadow:
+    with open(os.path.join(d, "shadow_diff.json"), "w") as f:
+        json.dump({"diff": {"column_changes": {"b": {"deltas": {"0": 0.1}}}}}, f)
+""",
+    "voidmark": """
+import argparse, os
+ap = argparse.ArgumentParser()
+ap.add_argument("report")
+ap.add_argument("--vault-dir")
+a = ap.parse_args()
+with open(os.path.join(a.vault_dir, "mark.txt"), "w") as f:
+    f.write("gen " + os.environ["FAKE_GEN"])
+""",
+}
+
+
+def _fake_modules(root: Path) -> Path:
+    for (pkg, body), name in zip(
+        FAKE_MODULES.items(), ("RiftLens", "NullTrace", "VoidMark")
+    ):
+        main = root / name / "src" / pkg / "__main__.py"
+        main.parent.mkdir(parents=True)
+        (main.parent / "__init__.py").write_text("", encoding="utf-8")
+        main.write_text(body, encoding="utf-8")
+    return root
+
+
+def test_collect_stable_cas_rerun_into_same_out_dir(tmp_path: Path):
+    repo_root = Path(__file__).resolve().parents[1]
+    modules = _fake_modules(tmp_path / "modules")
+    datasets = tmp_path / "datasets"
+    datasets.mkdir()
+    for name in ("multi.csv", "previous_shadow.csv", "current.csv"):
+        (datasets / name).write_text("a,b\n1,2\n", encoding="utf-8")
+    out = tmp_path / "stability"
+    cmd = [
+        sys.executable,
+        str(repo_root / "tools" / "collect_stable.py"),
+        "--thresholds",
+        "0.5",
+        "--k",
+        "2",
+        "--out-dir",
+        str(out),
+        "--datasets-dir",
+        str(datasets),
+        "--modules-dir",
+        str(modules),
+        "--cas",
+    ]
+    store = ObjectStore(out)
+    run1, run2 = (out / "thr_0.50" / f"run_{i:02d}" for i in (1, 2))
+    report = Path("riftlens") / "graph_report.json"
+
+    for gen in ("1", "2"):
+        env = dict(os.environ, FAKE_GEN=gen)
+        r = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        assert r.returncode == 0, r.stdout + "\n" + r.stderr
+        # les k runs identiques partagent leurs objets
+        assert (run1 / report).stat().st_ino == (run2 / report).stat().st_ino
+        for run_dir in (run1, run2):
+            assert json.loads((run_dir / report).read_text("utf-8"))["gen"] == gen
+        assert _all_objects_intact(store)
+
+    stable = json.loads((out / "stability_report.json").read_text("utf-8"))
+    assert stable["results"]["0.50"]["riftlens"]["n_edges_runs"] == [1, 1]
+    assert "object" in stable["datasets"]["multi.csv"]
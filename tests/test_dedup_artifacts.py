@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import dedup_artifacts  # noqa: E402
+
+
+def test_size_partial_then_full_hash(tmp_path: Path):
+    files = {
+        "a.zip": b"AAAA-middle-1-ZZZZ",
+        "a_copy.zip": b"AAAA-middle-1-ZZZZ",
+        "same_edges.zip": b"AAAA-middle-2-ZZZZ",  # même début/fin, milieu différent
+        "other_size.zip": b"AAAA-ZZZZ",
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+    paths = sorted(str(tmp_path / n) for n in files)
+    dups = dedup_artifacts.find_duplicates(paths, block=4)
+    assert list(dups) == [str(tmp_path / "a_copy.zip")]
+    digest, original = dups[str(tmp_path / "a_copy.zip")]
+    assert original == str(tmp_path / "a.zip")
+    assert digest == dedup_artifacts.sha256_file(original)
+
+
+def test_hardlink_mode(tmp_path: Path):
+    for name in ("dd_graph_artifacts.zip", "dd_graph_artifacts (1).zip"):
+        (tmp_path / name).write_bytes(b"same-bytes" * 100)
+    report = tmp_path / "report.json"
+    cmd = [
+        sys.executable,
+        str(TOOLS / "dedup_artifacts.py"),
+        "--dir",
+        str(tmp_path),
+        "--hardlink",
+        "--report",
+        str(report),
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    rep = json.loads(report.read_text(encoding="utf-8"))
+    assert [a["hardlinked"] for a in rep["actions"]] == [True]
+    a, b = (tmp_path / "dd_graph_artifacts (1).zip"), (
+        tmp_path / "dd_graph_artifacts.zip"
+    )
+    assert os.stat(a).st_ino == os.stat(b).st_ino
+
+    # second passage : déjà liés, rien à faire
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert "duplicates=0" in r.stdout
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+from history_store import HistoryStore, migrate_legacy  # noqa: E402
+
+
+def point(i: int) -> dict:
+    return {"ts_utc": f"2026-01-{i + 1:02d}T00:00:00Z", "score": 0.1 * i}
+
+
+def test_retention_drops_whole_segments(tmp_path: Path):
+    store = HistoryStore(tmp_path / "h")
+    for i in range(12):
+        n = store.append(point(i), segment_size=3, keep=5)
+    # 12 points, segments de 3 : on garde les 2 derniers segments (6 >= keep)
+    assert n == 6
+    assert [s["file"] for s in store.segments] == [
+        "seg_000003.jsonl",
+        "seg_000004.jsonl",
+    ]
+    assert not (tmp_path / "h" / "seg_000001.jsonl").exists()
+
+    reopened = HistoryStore(tmp_path / "h")
+    assert len(reopened) == 6
+    assert [r["score"] for r in reopened.query()][0] == 0.1 * 6
+
+
+def test_time_range_query_and_csv(tmp_path: Path):
+    store = HistoryStore(tmp_path / "h")
+    for i in range(10):
+        store.append(point(i), segment_size=4, keep=100)
+    rows = list(store.query(since="2026-01-03T00:00:00Z", until="2026-01-05T00:00:00Z"))
+    assert [r["ts_utc"][:10] for r in rows] == [
+        "2026-01-03",
+        "2026-01-04",
+        "2026-01-05",
+    ]
+    assert len(list(store._overlapping("2026-01-09T00:00:00Z", None))) == 1
+
+    out = tmp_path / "trend.csv"
+    assert store.write_csv(out, since="2026-01-08T00:00:00Z") == 3
+    with out.open(encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 3
+
+
+def test_cli_import_legacy_and_trend(tmp_path: Path):
+    legacy = tmp_path / "old.jsonl"
+    legacy.write_text("".join(json.dumps(point(i)) + "\n" for i in range(3)), "utf-8")
+    hist = tmp_path / "h"
+    trend = tmp_path / "trend.csv"
+    r = subprocess.run(
+        [
+            sys.executable,
+            str(TOOLS / "store_history.py"),
+            "--out",
+            str(tmp_path / "missing_out"),
+            "--history",
+            str(hist),
+            "--import-jsonl",
+            str(legacy),
+            "--trend-csv",
+            str(trend),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+    assert len(HistoryStore(hist)) == 4
+    r = subprocess.run(
+        [
+            sys.executable,
+            str(TOOLS / "trend_report.py"),
+            "--history",
+            str(legacy),
+            "--out",
+            str(tmp_path / "legacy.csv"),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert r.returncode == 0, r.stderr
+    assert "n= 3" in r.stdout
+
+
+def test_retention_keeps_between_keep_and_keep_plus_segment(tmp_path: Path):
+    store = HistoryStore(tmp_path / "h")
+    sizes = [store.append(point(i % 28), segment_size=4, keep=10) for i in range(40)]
+    assert min(sizes[10:]) >= 10
+    assert max(sizes) <= 10 + 4 - 1
+
+
+def test_legacy_file_is_refused_then_migrated(tmp_path: Path):
+    legacy = tmp_path / ".bareflux_history.jsonl"
+    legacy.write_text("".join(json.dumps(point(i)) + "\n" for i in range(5)), "utf-8")
+    with pytest.raises(ValueError, match="ancien history JSONL"):
+        HistoryStore(legacy)
+
+    store = migrate_legacy(legacy, segment_size=2, keep=100)
+    assert legacy.is_dir() and len(store) == 5
+    assert (tmp_path / ".bareflux_history.jsonl.legacy").is_file()
+    assert [r["score"] for r in HistoryStore(legacy).query()] == [
+        0.1 * i for i in range(5)
+    ]
+    with pytest.raises(ValueError, match="déjà"):
+        (tmp_path / "again.jsonl").write_text("", "utf-8")
+        (tmp_path / "again.jsonl.legacy").write_text("", "utf-8")
+        migrate_legacy(tmp_path / "again.jsonl", segment_size=2, keep=100)
+
+
+def test_cli_migrates_legacy_history_path(tmp_path: Path):
+    legacy = tmp_path / ".bareflux_history.jsonl"
+    legacy.write_text("".join(json.dumps(point(i)) + "\n" for i in range(3)), "utf-8")
+    r = subprocess.run(
+        [
+            sys.executable,
+            str(TOOLS / "store_history.py"),
+            "--out",
+            str(tmp_path / "missing_out"),
+            "--history",
+            str(legacy),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+    assert "Migrated legacy history" in r.stdout
+    assert len(HistoryStore(legacy)) == 4
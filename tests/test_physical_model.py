@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+OPTIONAL = Path(__file__).resolve().parents[1] / "tools" / "optional"
+if str(OPTIONAL) not in sys.path:
+    sys.path.insert(0, str(OPTIONAL))
+
+import physical_model  # noqa: E402
+
+
+def lstsq_power(t: np.ndarray, y: np.ndarray, f: float) -> float:
+    # référence : 1 - chi2(a + b cos + c sin) / chi2(constante)
+    ok = np.isfinite(y)
+    t, y = t[ok], y[ok]
+    X = np.column_stack(
+        [np.ones_like(t), np.cos(2 * np.pi * f * t), np.sin(2 * np.pi * f * t)]
+    )
+    resid = y - X @ np.linalg.lstsq(X, y, rcond=None)[0]
+    return 1.0 - resid @ resid / np.sum((y - y.mean()) ** 2)
+
+
+def test_batch_matches_least_squares_and_caches():
+    rng = np.random.default_rng(1)
+    t = np.sort(rng.uniform(0, 30, 200))
+    freqs = np.linspace(0.05, 2.0, 57)
+    ys = np.stack(
+        [
+            np.sin(2 * np.pi * 0.4 * t) + rng.normal(0, 0.3, t.size),
+            3.0 + np.cos(2 * np.pi * 1.1 * t + 0.5) + rng.normal(0, 0.3, t.size),
+            rng.normal(0, 1, t.size),
+        ]
+    )
+    ys[2, ::7] = np.nan
+
+    physical_model.clear_trig_cache()
+    power = physical_model.lomb_scargle_batch(t, ys, freqs)
+    assert power.shape == (3, 57)
+    for b in range(3):
+        for k in (0, 13, 56):
+            assert power[b, k] == pytest.approx(
+                lstsq_power(t, ys[b], freqs[k]), abs=1e-9
+            )
+    assert freqs[np.argmax(power[0])] == pytest.approx(0.4, abs=0.02)
+    assert len(physical_model._trig_cache) == 1
+
+    single = physical_model.lomb_scargle_batch(t, ys[1], freqs)
+    np.testing.assert_allclose(single, power[1], rtol=1e-12)
+    assert len(physical_model._trig_cache) == 1
+
+
+def test_trig_blocks_split_frequency_grid(monkeypatch):
+    monkeypatch.setattr(physical_model, "TRIG_BLOCK_BYTES", 8 * 50 * 10)
+    physical_model.clear_trig_cache()
+    t = np.linspace(0, 10, 50)
+    y = np.sin(2 * np.pi * 0.7 * t)
+    freqs = np.linspace(0.1, 1.5, 33)
+    blocks = physical_model._trig_blocks(t, freqs)
+    assert [b[0].shape[0] for b in blocks] == [10, 10, 10, 3]
+    p = physical_model.lomb_scargle_batch(t, y, freqs)
+    assert p[16] == pytest.approx(lstsq_power(t, y, freqs[16]), abs=1e-9)
+
+
+def test_trig_blocks_over_cache_budget_are_lazy(monkeypatch):
+    t = np.linspace(0, 10, 50)
+    y = np.sin(2 * np.pi * 0.7 * t)
+    freqs = np.linspace(0.1, 1.5, 33)
+    physical_model.clear_trig_cache()
+    cached = physical_model.lomb_scargle_batch(t, y, freqs)
+
+    monkeypatch.setattr(physical_model, "TRIG_BLOCK_BYTES", 8 * 50 * 10)
+    # 4 x 33 x 50 x 8 octets > budget : aucun tableau complet construit
+    monkeypatch.setattr(physical_model, "TRIG_CACHE_BYTES", 4 * 8 * 50 * 32)
+    physical_model.clear_trig_cache()
+    blocks = physical_model._trig_blocks(t, freqs)
+    assert not isinstance(blocks, list)
+    assert next(iter(blocks))[0].shape == (10, 50)
+    lazy = physical_model.lomb_scargle_batch(t, y, freqs)
+    np.testing.assert_allclose(lazy, cached, rtol=1e-12)
+    assert len(physical_model._trig_cache) == 0
+
+
+def test_transit_grid_numpy_shapes():
+    t = np.linspace(-0.3, 0.3, 601)
+    period, a, rp = 3.0, 10.0, 0.1
+    grid = physical_model.transit_model_grid(
+        t, period, 0.0, [0.05, 0.1], a, [90.0, 89.0], method="trapezoid"
+    )
+    assert grid.shape == (2, t.size)
+    mid = t.size // 2
+    assert grid[1, mid] == pytest.approx(1 - rp**2)
+    assert grid[1, 0] == 1.0 and grid[1, -1] == 1.0
+    np.testing.assert_allclose(grid[1], grid[1][::-1], atol=1e-12)
+
+    # au premier contact interne/externe : rampe à mi-profondeur pour z = 1
+    t_half = period / (2 * np.pi) * np.arcsin(1 / a)
+    half = physical_model.transit_model_grid(
+        [t_half], period, 0.0, rp, a, 90.0, method="trapezoid"
+    )
+    assert half[0, 0] == pytest.approx(1 - rp**2 / 2, rel=1e-9)
+
+    box = physical_model.transit_model_grid(t, period, 0.0, rp, a, method="box")
+    assert set(np.round(box[0], 12)) == {1.0, round(1 - rp**2, 12)}
+
+
+def test_transit_grid_blocks_match_single_rows(monkeypatch):
+    monkeypatch.setattr(physical_model, "TRANSIT_BLOCK_BYTES", 8 * 200 * 3)
+    t = np.linspace(0, 5, 200)
+    periods = np.linspace(1.0, 2.0, 8)
+    grid = physical_model.transit_model_grid(
+        t, periods, 0.4, 0.08, 8.0, method="trapezoid"
+    )
+    for i, p in enumerate(periods):
+        row = physical_model.transit_model_grid(
+            t, p, 0.4, 0.08, 8.0, method="trapezoid"
+        )
+        np.testing.assert_array_equal(grid[i], row[0])
+    with pytest.raises(ValueError):
+        physical_model.transit_model_grid(t, 1.0, 0.0, 0.1, 5.0, method="exact")
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+OPTIONAL = Path(__file__).resolve().parents[1] / "tools" / "optional"
+if str(OPTIONAL) not in sys.path:
+    sys.path.insert(0, str(OPTIONAL))
+
+import preprocess_fits  # noqa: E402
+
+
+def grid_features(img: np.ndarray) -> dict:
+    # formule de référence sur grilles de coordonnées pleine taille
+    img = np.nan_to_num(np.asarray(img, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    total = img.sum()
+    yy, xx = np.indices(img.shape)
+    cx = np.sum(xx * img) / total
+    cy = np.sum(yy * img) / total
+    varx = np.sum(((xx - cx) ** 2) * img) / total
+    vary = np.sum(((yy - cy) ** 2) * img) / total
+    return {
+        "flux": total,
+        "centroid_x": cx,
+        "centroid_y": cy,
+        "fwhm": 2.355 * np.sqrt((varx + vary) / 2.0),
+    }
+
+
+def test_marginal_features_match_grid(tmp_path: Path, monkeypatch):
+    rng = np.random.default_rng(0)
+    yy, xx = np.indices((300, 200))
+    img = np.exp(-((xx - 120.3) ** 2 + (yy - 80.7) ** 2) / 50.0) + rng.random(
+        (300, 200)
+    )
+    img[5, 7] = np.nan
+    img[9, 1] = np.inf
+
+    # memmap en big-endian comme un HDU FITS, parcouru par petits blocs
+    path = tmp_path / "img.dat"
+    mm = np.memmap(path, dtype=">f4", mode="w+", shape=img.shape)
+    mm[:] = img
+    mm.flush()
+    monkeypatch.setattr(preprocess_fits, "ROW_BLOCK", 64)
+    ro = np.memmap(path, dtype=">f4", mode="r", shape=img.shape)
+
+    got = preprocess_fits.extract_basic_features(ro)
+    want = grid_features(np.asarray(ro))
+    for key, val in want.items():
+        assert got[key] == pytest.approx(val, rel=1e-10)
+
+
+def test_empty_and_integer_images():
+    feats = preprocess_fits.extract_basic_features(np.zeros((4, 4), dtype=np.int16))
+    assert feats["flux"] == 0.0 and np.isnan(feats["fwhm"])
+    img = np.zeros((5, 5), dtype=np.uint16)
+    img[1, 3] = 10
+    feats = preprocess_fits.extract_basic_features(img)
+    assert (feats["centroid_x"], feats["centroid_y"], feats["fwhm"]) == (3.0, 1.0, 0.0)
+
+
+def fake_extract(job):
+    idx, fp = job
+    return {"t": idx, "file": fp, "flux": float(Path(fp).read_text())}
+
+
+def os_utime_later(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_stream_features_resume(tmp_path: Path, monkeypatch):
+    files = []
+    for i in range(5):
+        fp = tmp_path / "in" / f"f{i}.fits"
+        fp.parent.mkdir(exist_ok=True)
+        fp.write_text(str(i), encoding="utf-8")
+        files.append(fp)
+    out = tmp_path / "features.csv"
+
+    stats = preprocess_fits.stream_features(
+        files[:3], out, batch_size=2, extract=fake_extract
+    )
+    assert (stats["files_processed"], stats["batches"]) == (3, 2)
+
+    # lot interrompu : lignes écrites mais jamais indexées
+    with out.open("a", encoding="utf-8") as f:
+        f.write("99,partial,1.0\n")
+    files[1].write_text("10", encoding="utf-8")
+    os_utime_later(files[2])
+
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    # f1 modifié + f3, f4 nouveaux ; f2 seulement "touché" (même contenu)
+    assert stats["files_processed"] == 3
+    # la nouvelle ligne de f1 remplace l'ancienne
+    assert stats["rows_replaced"] == 1
+    df = pd.read_csv(out)
+    assert df["t"].tolist() == [0, 2, 1, 3, 4]
+    assert df["flux"].tolist() == [0.0, 2.0, 10.0, 3.0, 4.0]
+
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    assert stats["files_processed"] == 0
+    assert len(pd.read_csv(out)) == 5
+
+    # f2 touché une fois : son mtime est réindexé, il n'est plus rehaché
+    def no_hash(path, chunk_size=0):
+        raise AssertionError(f"fichier inchangé rehaché: {path}")
+
+    monkeypatch.setattr(preprocess_fits, "sha256_file", no_hash)
+    index = preprocess_fits.ResumeIndex(Path(f"{out}.index.jsonl"))
+    assert index.pending([str(f) for f in files]) == []
+
+
+def test_stream_features_compaction_survives_crash(tmp_path: Path, monkeypatch):
+    files = []
+    for i in range(4):
+        fp = tmp_path / f"f{i}.fits"
+        fp.write_text(str(i), encoding="utf-8")
+        files.append(fp)
+    out = tmp_path / "features.csv"
+    preprocess_fits.stream_features(files, out, batch_size=2, extract=fake_extract)
+    files[0].write_text("7", encoding="utf-8")
+
+    # crash juste après la validation (index réécrit, renommage non joué)
+    with pytest.raises(AssertionError, match="crash simulé"):
+        with monkeypatch.context() as m:
+            m.setattr(preprocess_fits.os, "replace", _replace_then_crash)
+            preprocess_fits.stream_features(
+                files, out, batch_size=2, extract=fake_extract
+            )
+    assert list(tmp_path.glob(".*.compact.tmp"))
+
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    assert stats["files_processed"] == 0
+    df = pd.read_csv(out)
+    assert df["flux"].tolist() == [1.0, 2.0, 3.0, 7.0]
+    assert not list(tmp_path.glob(".*.compact.tmp"))
+
+
+_real_replace = os.replace
+
+
+def _replace_then_crash(src, dst):
+    _real_replace(src, dst)
+    if str(dst).endswith(".index.jsonl"):
+        raise AssertionError("crash simulé après validation de la compaction")
+
+
+def _crash_before_index_commit(src, dst):
+    if str(dst).endswith(".index.jsonl"):
+        raise AssertionError("crash simulé avant validation de la compaction")
+    _real_replace(src, dst)
+
+
+def test_stream_features_second_compaction_crash(tmp_path: Path, monkeypatch):
+    files = []
+    for i in range(4):
+        fp = tmp_path / f"f{i}.fits"
+        fp.write_text(str(i), encoding="utf-8")
+        files.append(fp)
+    out = tmp_path / "features.csv"
+    preprocess_fits.stream_features(files, out, batch_size=2, extract=fake_extract)
+    # première compaction menée à terme
+    files[0].write_text("7", encoding="utf-8")
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    assert stats["rows_replaced"] == 1
+    index = preprocess_fits.ResumeIndex(Path(f"{out}.index.jsonl"))
+    assert index.renames == [] and index.deletes == []
+
+    # seconde compaction : crash avant que l'index réécrit ne la valide
+    files[1].write_text("8", encoding="utf-8")
+    with pytest.raises(AssertionError, match="crash simulé"):
+        with monkeypatch.context() as m:
+            m.setattr(preprocess_fits.os, "replace", _crash_before_index_commit)
+            preprocess_fits.stream_features(
+                files, out, batch_size=2, extract=fake_extract
+            )
+    assert list(tmp_path.glob(".*.compact.tmp"))
+
+    # la sortie non validée est jetée, pas renommée sur la sortie
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    assert stats["files_processed"] == 0
+    assert stats["rows_replaced"] == 1
+    assert pd.read_csv(out)["flux"].tolist() == [2.0, 3.0, 7.0, 8.0]
+    assert not list(tmp_path.glob(".*.compact.tmp"))
+    stats = preprocess_fits.stream_features(
+        files, out, batch_size=2, extract=fake_extract
+    )
+    assert (stats["files_processed"], stats["rows_replaced"]) == (0, 0)
+
+
+def test_stream_features_refuses_unindexed_output(tmp_path: Path):
+    fp = tmp_path / "f0.fits"
+    fp.write_text("1", encoding="utf-8")
+    out = tmp_path / "features.csv"
+    out.write_text("t,file,flux\n5,other.fits,9.0\n", encoding="utf-8")
+    with pytest.raises(FileExistsError, match="sans index"):
+        preprocess_fits.stream_features([fp], out, extract=fake_extract)
+    assert out.read_text(encoding="utf-8").endswith("9.0\n")
+
+    stats = preprocess_fits.stream_features(
+        [fp], out, resume=False, extract=fake_extract
+    )
+    assert stats["files_processed"] == 1
+    assert pd.read_csv(out)["flux"].tolist() == [1.0]
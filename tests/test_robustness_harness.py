@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+import textwrap
+
+from test_bareflux_smoke import make_fake_modules
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import robustness_harness  # noqa: E402
+
+
+def test_score_run():
+    assert robustness_harness.score_run("stable", {"status": "green"})["correct"]
+    r = robustness_harness.score_run("correlation_break", {"status": "yellow"})
+    assert r["correct"] and not r["exact"]
+    r = robustness_harness.score_run(
+        "strong_shift",
+        {
+            "status": "red",
+            "score_formula": "effective_drift_v1",
+            "score_effective_v1": 0.9,
+        },
+    )
+    assert r["correct"] and r["exact"] and r["score"] == 0.9
+    assert not robustness_harness.score_run("stable", {"status": "skipped"})["correct"]
+
+
+# NullTrace factice qui calcule de vrais deltas current - previous
+DIFF_NULLTRACE = """
+import argparse, json, uuid
+from pathlib import Path
+import pandas as pd
+
+p = argparse.ArgumentParser()
+sub = p.add_subparsers(dest='cmd', required=True)
+snap = sub.add_parser('snapshot')
+snap.add_argument('csv')
+snap.add_argument('--previous-shadow')
+snap.add_argument('--output-dir', required=True)
+args = p.parse_args()
+shadow = Path(args.output_dir) / 'shadows' / uuid.uuid4().hex[:8]
+shadow.mkdir(parents=True, exist_ok=True)
+(shadow / 'manifest.json').write_text(json.dumps({'input': args.csv}))
+if args.previous_shadow:
+    prev_csv = json.loads(Path(args.previous_shadow).read_text())['input']
+    prev, curr = pd.read_csv(prev_csv), pd.read_csv(args.csv)
+    changes = {
+        col: {'deltas': {str(i): float(d) for i, d in (curr[col] - prev[col]).items()}}
+        for col in ('a', 'b')
+    }
+    (shadow / 'shadow_diff.json').write_text(
+        json.dumps({'diff': {'column_changes': changes}})
+    )
+"""
+
+
+def test_harness_with_fake_modules(tmp_path: Path):
+    modules = tmp_path / "modules"
+    make_fake_modules(modules)
+    (modules / "NullTrace" / "src" / "nulltrace" / "__main__.py").write_text(
+        textwrap.dedent(DIFF_NULLTRACE), encoding="utf-8"
+    )
+    out = tmp_path / "harness"
+    cmd = [
+        sys.executable,
+        str(TOOLS / "robustness_harness.py"),
+        "--out-dir",
+        str(out),
+        "--modules-dir",
+        str(modules),
+        "--scenarios",
+        "null_stable,strong_shift",
+        "--sizes",
+        "60,90",
+        "--seeds",
+        "1",
+        "--workers",
+        "2",
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+
+    runs = json.loads((out / "robustness_runs.json").read_text(encoding="utf-8"))
+    assert runs["runs_total"] == 4 and runs["runs_failed"] == 0
+    for run in runs["runs"]:
+        assert set(run["timings_s"]) == set(robustness_harness.STAGES)
+
+    matrix = json.loads((out / "robustness_matrix.json").read_text(encoding="utf-8"))
+    rows = {(row["scenario"], row["n"]): row for row in matrix["matrix"]}
+    assert sorted(rows) == [
+        ("null_stable", 60),
+        ("null_stable", 90),
+        ("strong_shift", 60),
+        ("strong_shift", 90),
+    ]
+    assert rows[("null_stable", 60)]["accuracy"] == 1.0
+    assert rows[("null_stable", 90)]["score_median"] == 0.0
+    assert rows[("strong_shift", 90)]["accuracy"] == 1.0
+    assert rows[("strong_shift", 90)]["rows_per_s_median"] > 0
+    assert (out / "robustness_matrix.csv").exists()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from array import array
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import shadow_loader  # noqa: E402
+
+
+def write_shadow(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "diff": {
+                    "column_changes": {
+                        "a": {"deltas": {"0": 0.5, "1": -1.25, "2": 0.0}},
+                        "b": {"deltas": {"0": 0.1, "1": None, "2": "0.3"}},
+                        "t.x": {"deltas": {"7": 4}, "meta": {"deltas": {"9": 1}}},
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_stream_and_fallback_agree(tmp_path: Path):
+    path = write_shadow(tmp_path / "shadow_diff.json")
+    streamed = shadow_loader.load_column_deltas(str(path), with_keys=True)
+    loaded = {
+        col: (keys, vals)
+        for col, keys, vals in shadow_loader._iter_json(str(path), None, True)
+    }
+    assert sorted(streamed) == sorted(loaded) == ["a", "b", "t.x"]
+    for col in streamed:
+        assert streamed[col][0] == loaded[col][0]
+        np.testing.assert_array_equal(streamed[col][1], loaded[col][1])
+    assert streamed["b"][0] == ["0", "2"]
+    assert streamed["b"][1].dtype == np.float64
+
+
+def test_stream_without_keys_fills_float_buffer(tmp_path: Path):
+    pytest.importorskip("ijson")
+    path = write_shadow(tmp_path / "shadow_diff.json")
+    with path.open("rb") as f:
+        got = {
+            col: (keys, vals)
+            for col, keys, vals in shadow_loader._iter_ijson(f, {"a", "b"}, False)
+        }
+    assert sorted(got) == ["a", "b"]
+    assert all(keys is None for keys, _ in got.values())
+    vals = got["a"][1]
+    # vue sur le tampon array('d'), sans passage par une liste
+    assert vals.dtype == np.float64 and isinstance(vals.base.obj, array)
+    assert vals.tolist() == [0.5, -1.25, 0.0]
+    np.testing.assert_allclose(got["b"][1], [0.1, 0.3])
+    plain = shadow_loader.load_column_deltas(str(path), ["b"], use_sidecar=False)
+    np.testing.assert_allclose(plain["b"], [0.1, 0.3])
+
+
+def test_sidecar_roundtrip(tmp_path: Path):
+    path = write_shadow(tmp_path / "shadow_diff.json")
+    npz = shadow_loader.write_sidecar(str(path))
+    assert npz.endswith("shadow_diff.deltas.npz")
+    keys, vals = shadow_loader.load_column_deltas(
+        str(path), ["b", "missing"], with_keys=True
+    )["b"]
+    assert keys == ["0", "2"]
+    np.testing.assert_allclose(vals, [0.1, 0.3])
+
+    # sidecar plus ancien que le JSON : ignoré
+    os.utime(npz, (1, 1))
+    assert shadow_loader.load_deltas(str(path), "a").tolist() == [0.5, -1.25, 0.0]
+
+
+def test_postprocess_uses_loader(tmp_path: Path):
+    out = tmp_path / "out"
+    write_shadow(out / "nulltrace_curr" / "shadows" / "x" / "shadow_diff.json")
+    cmd = [
+        sys.executable,
+        str(TOOLS / "bareflux_postprocess.py"),
+        "--out",
+        str(out),
+        "--config",
+        str(TOOLS / "config_score.json"),
+        "--write-sidecar",
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+    assert (
+        out / "nulltrace_curr" / "shadows" / "x" / "shadow_diff.deltas.npz"
+    ).exists()
+    ci = json.loads((out / "bareflux_ci_status.json").read_text(encoding="utf-8"))
+    assert ci["status"] in ("green", "yellow", "red")
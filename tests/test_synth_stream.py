@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import robustness_stress_tests  # noqa: E402
+
+
+def approx(v: float):
+    return pytest.approx(v, rel=1e-9, abs=1e-12)
+
+
+def test_blocks_are_reproducible_and_streamed(tmp_path: Path):
+    (multi, prev, curr), meta = robustness_stress_tests.scenario_frame(
+        1000, 3, "missing_5pct", chunk_size=256
+    )
+    again, _ = robustness_stress_tests.scenario_frame(
+        1000, 3, "missing_5pct", chunk_size=256
+    )
+    pd.testing.assert_frame_equal(multi, again[0])
+    assert multi["t"].tolist() == list(range(1000))
+    # 5 % par bloc : 12 + 12 + 12 + 11
+    assert int(multi["y"].isna().sum()) == 47
+
+    meta2 = robustness_stress_tests.write_scenario(
+        tmp_path / "s", 1000, 3, "missing_5pct", chunk_size=256
+    )
+    assert meta2 == meta
+    streamed = pd.read_csv(tmp_path / "s" / "multi.csv", float_precision="round_trip")
+    np.testing.assert_array_equal(streamed.to_numpy(), multi.to_numpy())
+    truth = json.loads((tmp_path / "s" / "truth.json").read_text(encoding="utf-8"))
+    assert truth["expected_signal"] == "stable"
+
+
+def test_truth_matches_in_memory_statistics():
+    (multi, prev, curr), meta = robustness_stress_tests.scenario_frame(
+        2000, 5, "strong_shift", chunk_size=300
+    )
+    mid = 1000
+    x, y = multi["x"].to_numpy(), multi["y"].to_numpy()
+    assert meta["corr_xy_first_half"] == approx(np.corrcoef(x[:mid], y[:mid])[0, 1])
+    assert meta["corr_xy_second_half"] == approx(np.corrcoef(x[mid:], y[mid:])[0, 1])
+    assert meta["mean_shift_a"] == approx(1.0)
+    assert (curr["b"].iloc[mid:] == prev["b"].iloc[mid:] * 1.5).all()
+
+
+def test_generate_synth_datasets_cli(tmp_path: Path):
+    out = tmp_path / "datasets"
+    cmd = [
+        sys.executable,
+        str(TOOLS / "generate_synth_datasets.py"),
+        "--out-dir",
+        str(out),
+        "--n",
+        "500",
+        "--chunk-size",
+        "128",
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stdout + "\n" + r.stderr
+    prev = pd.read_csv(out / "previous_shadow.csv")
+    curr = pd.read_csv(out / "current.csv")
+    assert len(prev) == len(curr) == 500
+    assert list(pd.read_csv(out / "multi.csv").columns) == ["t", "x", "y", "z"]
+    np.testing.assert_allclose(curr["a"][250:] - prev["a"][250:], 0.25, atol=1e-12)
+    np.testing.assert_array_equal(curr["a"][:250], prev["a"][:250])
+
+
+def test_parallel_blocks_write_identical_files(tmp_path: Path):
+    for workers in (1, 2):
+        robustness_stress_tests.write_scenario(
+            tmp_path / f"w{workers}", 900, 8, "outliers_2pct", 100, workers=workers
+        )
+    for name in ("multi.csv", "previous_shadow.csv", "current.csv"):
+        one = (tmp_path / "w1" / name).read_bytes()
+        assert one == (tmp_path / "w2" / name).read_bytes()
+        assert one.startswith(b"t,")
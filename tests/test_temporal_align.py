@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+OPTIONAL = Path(__file__).resolve().parents[1] / "tools" / "optional"
+if str(OPTIONAL) not in sys.path:
+    sys.path.insert(0, str(OPTIONAL))
+
+import temporal_align  # noqa: E402
+
+# seconde intercalaire réelle du 2016-12-31 : le jour UTC qui la contient
+# dure 86401 s ; ERFA étire son JD, TT - UTC y croît de 1 s linéairement
+LEAP_DAY_JD = 2457753.5  # 2016-12-31 00:00 UTC
+LEAP_JD = 2457754.5  # 2017-01-01 00:00 UTC
+
+
+def fake_tt_minus_utc(jd):
+    jd = np.asarray(jd, dtype=float)
+    return (32.184 + 36.0 + np.clip(jd - LEAP_DAY_JD, 0.0, 1.0)) / 86400.0
+
+
+def fake_bary_minus_tt(tt, ra_deg, dec_deg, location):
+    # t_bary - TT, lisse en TT : termes annuel + diurne (topocentrique)
+    tt = np.asarray(tt, dtype=float)
+    s = 499.0 * np.sin(2 * np.pi * tt / 365.25 + ra_deg) + 0.0213 * np.cos(
+        2 * np.pi * tt / 0.99727
+    )
+    return s / 86400.0
+
+
+def fake_exact(jd, ra_deg, dec_deg, location):
+    # t_bary - UTC
+    d = fake_tt_minus_utc(jd)
+    return d + fake_bary_minus_tt(np.asarray(jd) + d, ra_deg, dec_deg, location)
+
+
+@pytest.fixture
+def fake_astropy(monkeypatch):
+    monkeypatch.setattr(temporal_align, "_exact_bary_minus_tt_days", fake_bary_minus_tt)
+    monkeypatch.setattr(temporal_align, "_tt_minus_utc_days", fake_tt_minus_utc)
+    temporal_align.clear_grid_cache()
+    yield
+    temporal_align.clear_grid_cache()
+
+
+def test_interp_within_error_bound_across_leap_second(fake_astropy):
+    loc = temporal_align.ObserverLocation(2.35, 48.85, 35.0)
+    rng = np.random.default_rng(0)
+    t = np.sort(
+        np.concatenate(
+            [
+                rng.uniform(LEAP_JD - 20, LEAP_JD + 20, 200_000),
+                # densément autour du jour étiré et de ses deux ruptures de pente
+                rng.uniform(LEAP_DAY_JD - 0.05, LEAP_JD + 0.05, 100_000),
+            ]
+        )
+    )
+    got = temporal_align.barycentric_correct_jd(t, 10.0, 20.0, loc, method="interp")
+    # écart au JD exact limité par la résolution float64 du JD (~40 us)
+    assert np.max(np.abs(got - (t + fake_exact(t, 10.0, 20.0, loc)))) < 1e-9
+    grid = temporal_align.barycentric_grid(10.0, 20.0, loc, t.min(), t.max())
+    err = grid.correction_days(t) - fake_exact(t, 10.0, 20.0, loc)
+    assert np.max(np.abs(err)) * 86400.0 <= 1e-6
+    assert grid.measured_error_s <= 1e-6
+    assert grid.smooth_days.size < 2000
+
+
+def test_utc_argument_would_break_the_bound(fake_astropy):
+    # contre-épreuve : la partie "lisse" prise en fonction du JD UTC garde
+    # la rampe du jour intercalaire, que l'interpolation ne suit pas
+    loc = temporal_align.ObserverLocation(2.35, 48.85, 35.0)
+    grid = temporal_align.barycentric_grid(10.0, 20.0, loc, LEAP_JD - 5, LEAP_JD + 5)
+    nodes = grid.start + grid.step * np.arange(grid.smooth_days.size)
+    step_only = (32.184 + np.where(nodes >= LEAP_JD, 37.0, 36.0)) / 86400.0
+    smooth_utc = fake_exact(nodes, 10.0, 20.0, loc) - step_only
+    t = np.linspace(LEAP_DAY_JD - 0.2, LEAP_JD + 0.2, 20_001)
+    step_t = (32.184 + np.where(t >= LEAP_JD, 37.0, 36.0)) / 86400.0
+    old = temporal_align._lagrange4(t, grid.start, grid.step, smooth_utc) + step_t
+    assert np.max(np.abs(old - fake_exact(t, 10.0, 20.0, loc))) * 86400.0 > 1e-5
+    new = grid.correction_days(t) - fake_exact(t, 10.0, 20.0, loc)
+    assert np.max(np.abs(new)) * 86400.0 <= 1e-6
+
+
+def test_tt_minus_utc_follows_erfa_leap_day():
+    pytest.importorskip("astropy")
+    d = temporal_align._tt_minus_utc_days([LEAP_DAY_JD, LEAP_DAY_JD + 0.5, LEAP_JD])
+    np.testing.assert_allclose(d * 86400.0, [68.184, 68.684, 69.184], atol=1e-6)
+
+
+def test_grid_cache_reused_for_sub_range(fake_astropy):
+    loc = temporal_align.ObserverLocation(0.0, 0.0)
+    g1 = temporal_align.barycentric_grid(1.0, 2.0, loc, 2460000.0, 2460010.0)
+    g2 = temporal_align.barycentric_grid(1.0, 2.0, loc, 2460002.0, 2460005.0)
+    assert g1 is g2
+    g3 = temporal_align.barycentric_grid(1.5, 2.0, loc, 2460002.0, 2460005.0)
+    assert g3 is not g1
+
+    with pytest.raises(ValueError):
+        temporal_align.barycentric_correct_jd([2460000.0], 1.0, 2.0, loc, "spline")
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+TOOLS = Path(__file__).resolve().parents[1] / "tools"
+if str(TOOLS) not in sys.path:
+    sys.path.insert(0, str(TOOLS))
+
+import trend_engine  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+
+
+def rows(values, start=0):
+    return [
+        {"ts_utc": f"2026-02-{i + 1:02d}T00:00:00Z", "score": v, "n_edges": 3}
+        for i, v in enumerate(values, start=start)
+    ]
+
+
+def test_incremental_matches_full_recompute():
+    values = [0.1, 0.12, 0.11, 0.13, 0.1, 0.9, 0.92, 0.88, 0.91, 0.9]
+    params = dict(trend_engine.DEFAULT_PARAMS)
+
+    full = trend_engine.new_state(params)
+    trend_engine.update_state(full, rows(values))
+
+    inc = trend_engine.new_state(params)
+    trend_engine.update_state(inc, rows(values[:4]))
+    inc = json.loads(json.dumps(inc))  # aller-retour disque
+    # points déjà traités ignorés, seuls les nouveaux sont intégrés
+    new = trend_engine.update_state(inc, rows(values))
+    assert len(new) == 6
+    assert inc == full
+
+    score = full["metrics"]["score"]
+    assert [cp["ts_utc"][:10] for cp in score["change_points"]] == ["2026-02-06"]
+    assert score["change_points"][0]["direction"] == "up"
+    assert score["ewma"] < score["rolling_mean"]
+    assert full["metrics"]["mean_b"]["n"] == 0
+
+
+def test_cli_processes_only_new_points(tmp_path: Path):
+    store = HistoryStore(tmp_path / "h")
+    for r in rows([0.1, 0.2, 0.3]):
+        store.append(r, segment_size=2, keep=100)
+    cmd = [
+        sys.executable,
+        str(TOOLS / "trend_engine.py"),
+        "--history",
+        str(tmp_path / "h"),
+        "--points-csv",
+        str(tmp_path / "points.csv"),
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    assert "new_points= 3" in r.stdout
+
+    store.append(rows([0.4], start=3)[0], segment_size=2, keep=100)
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    assert "new_points= 1 n= 4" in r.stdout
+    with (tmp_path / "points.csv").open(encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 4
+
+
+def test_same_second_runs_are_all_processed(tmp_path: Path):
+    store = HistoryStore(tmp_path / "h")
+    same = {"ts_utc": "2026-02-01T00:00:00Z", "n_edges": 3}
+    for v in (0.1, 0.2):
+        store.append(same | {"score": v}, segment_size=1, keep=100)
+    state = trend_engine.new_state(dict(trend_engine.DEFAULT_PARAMS))
+    assert len(trend_engine.update_state(state, store.query(with_seq=True))) == 2
+
+    # troisième run, même seconde, dans un segment suivant : intégré au rappel
+    store.append(same | {"score": 0.3}, segment_size=1, keep=100)
+    since = state["last_ts"]
+    new = trend_engine.update_state(state, store.query(since=since, with_seq=True))
+    assert [p["score_value"] for p in new] == [0.3]
+    assert state["n_points"] == 3
+    # rien de neuf : aucun point retraité
+    again = trend_engine.update_state(state, store.query(since=since, with_seq=True))
+    assert again == []
+
+
+def test_flat_window_tolerates_tiny_change_but_flags_real_one():
+    params = dict(trend_engine.DEFAULT_PARAMS)
+    state = trend_engine.new_state(params)
+    trend_engine.update_state(state, rows([0.5] * 5 + [0.5 + 1e-12, 0.5 - 1e-12]))
+    assert state["metrics"]["score"]["change_points"] == []
+    # n_edges constant à 3 sur tout l'historique : jamais de rupture
+    assert state["metrics"]["n_edges"]["change_points"] == []
+
+    trend_engine.update_state(state, rows([0.8], start=7))
+    cps = state["metrics"]["score"]["change_points"]
+    assert [cp["direction"] for cp in cps] == ["up"]
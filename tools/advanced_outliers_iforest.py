@@ -14,6 +14,10 @@ import glob
 import json
 import os
 
+import numpy as np
+
+from shadow_loader import load_column_deltas
+
 
 def find_one(patterns):
     for pat in patterns:
@@ -24,11 +28,6 @@ def find_one(patterns):
     return None
 
 
-def load_json(p):
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--shadow", default="_bareflux_out/**/shadow_diff.json")
@@ -40,13 +39,10 @@ def main():
     if not shadow_path:
         raise SystemExit("shadow_diff.json introuvable")
 
-    sd = load_json(shadow_path)
     try:
-        d = sd["diff"]["column_changes"]["b"]["deltas"]
-        vals = [float(v) for v in d.values()]
-        idx = list(d.keys())
+        idx, vals = load_column_deltas(shadow_path, ["b"], with_keys=True)["b"]
     except Exception:
-        vals, idx = [], []
+        vals, idx = np.empty(0), []
 
     rep = {"shadow_diff": shadow_path, "n": len(vals), "status": "ok", "outliers": []}
 
@@ -60,16 +56,15 @@ def main():
         print("SKIPPED (no sklearn)")
         return
 
-    if not vals:
+    if not len(vals):
         rep["status"] = "no_data"
     else:
-        X = [[v] for v in vals]
+        X = vals.reshape(-1, 1)
         model = IsolationForest(contamination=args.contamination, random_state=0)
         pred = model.fit_predict(X)  # -1 outlier
         out = []
-        for i, p in enumerate(pred):
-            if p == -1:
-                out.append({"row": idx[i], "delta_b": vals[i]})
+        for i in np.flatnonzero(pred == -1):
+            out.append({"row": idx[i], "delta_b": float(vals[i])})
         rep["outliers"] = out
         rep["n_outliers"] = len(out)
 
@@ -3,6 +3,7 @@
 BareFlux post-process (low-hanging fruit)
 - Fix n_edges incohérence en recopiant la valeur depuis riftlens/graph_report.json vers le summary
 - Ajoute score global de dérive + statut CI (green/yellow/red)
+- Score multi-colonnes pondéré (toutes les colonnes de column_changes)
 - Ajoute métriques lisibilité colonne b (IQR/MAD + % outliers)
 
 Usage:
@@ -21,33 +22,67 @@ import glob
 import json
 import math
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from statistics import mean, pstdev
 
+import numpy as np
 
-def quantile(sorted_vals, q: float) -> float:
-    if not sorted_vals:
-        return float("nan")
-    if q <= 0:
-        return float(sorted_vals[0])
-    if q >= 1:
-        return float(sorted_vals[-1])
-    pos = (len(sorted_vals) - 1) * q
-    lo = int(math.floor(pos))
-    hi = int(math.ceil(pos))
-    if lo == hi:
-        return float(sorted_vals[lo])
+from shadow_loader import load_column_deltas, write_sidecar
+
+
+QUANTILES = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+
+def quantiles(sorted_vals: np.ndarray, qs) -> np.ndarray:
+    """Quantiles à interpolation linéaire, en une passe sur un tableau trié.
+
+    Même formule que l'ancienne version scalaire
+    (s[lo] * (1 - frac) + s[hi] * frac), donc résultats identiques au bit près ;
+    np.quantile interpole autrement et peut différer d'un ulp.
+    """
+    n = len(sorted_vals)
+    q = np.clip(np.asarray(qs, dtype=np.float64), 0.0, 1.0)
+    if n == 0:
+        return np.full(q.shape, np.nan)
+    pos = (n - 1) * q
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.ceil(pos).astype(np.intp)
     frac = pos - lo
-    return float(sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac)
+    return sorted_vals[lo] * (1 - frac) + sorted_vals[hi] * frac
 
 
-def mad(vals):
-    if not vals:
+def quantile(sorted_vals, q: float) -> float:
+    return float(quantiles(np.asarray(sorted_vals, dtype=np.float64), [q])[0])
+
+
+def _partition_median(vals: np.ndarray) -> float:
+    # médiane sans tri complet : on ne place que les deux éléments centraux
+    n = len(vals)
+    lo, hi = (n - 1) // 2, n // 2
+    part = np.partition(vals, (lo, hi))
+    return float(part[lo] * 0.5 + part[hi] * 0.5) if lo != hi else float(part[lo])
+
+
+def mad(vals, med: float | None = None) -> float:
+    vals = np.asarray(vals, dtype=np.float64)
+    if vals.size == 0:
         return float("nan")
-    s = sorted(vals)
-    med = quantile(s, 0.5)
-    dev = [abs(v - med) for v in vals]
-    return quantile(sorted(dev), 0.5)
+    if med is None:
+        med = _partition_median(vals)
+    return _partition_median(np.abs(vals - med))
+
+
+def abs_exceedance(vals, thresholds) -> dict:
+    """Part des |v| > seuil pour chaque seuil, via searchsorted sur |v| trié."""
+    vals = np.asarray(vals, dtype=np.float64)
+    if vals.size == 0:
+        return {}
+    abs_sorted = np.sort(np.abs(vals))
+    ths = np.asarray([float(th) for th in thresholds], dtype=np.float64)
+    n_gt = vals.size - np.searchsorted(abs_sorted, ths, side="right")
+    return {
+        str(th): {"pct_abs_gt": int(k) / vals.size} for th, k in zip(thresholds, n_gt)
+    }
 
 
 def load_json(path: str):
@@ -70,30 +105,29 @@ def find_one(patterns):
     return None
 
 
-def extract_deltas(shadow_diff, col: str):
-    try:
-        d = shadow_diff["diff"]["column_changes"][col]["deltas"]
-        vals = [float(v) for v in d.values()]
-        return vals
-    except Exception:
-        return []
+def extract_deltas(deltas, col: str) -> np.ndarray:
+    arr = deltas.get(col)
+    return arr if arr is not None else np.empty(0, dtype=np.float64)
 
 
 def compute_stats(vals):
-    if not vals:
+    """Statistiques descriptives d'une colonne de deltas.
+
+    Quantiles, MAD, IQR, min et max sont identiques au bit près à l'ancienne
+    version pure Python. mean et std (np.mean / np.std contre
+    statistics.mean / pstdev, arrondi exact) peuvent différer au dernier ulp.
+    """
+    vals = np.asarray(vals, dtype=np.float64)
+    if vals.size == 0:
         return {"n": 0}
-    s = sorted(vals)
-    mu = mean(vals)
-    sd = pstdev(vals) if len(vals) > 1 else 0.0
-    q05 = quantile(s, 0.05)
-    q25 = quantile(s, 0.25)
-    q50 = quantile(s, 0.50)
-    q75 = quantile(s, 0.75)
-    q95 = quantile(s, 0.95)
-    mad_v = mad(vals)
+    s = np.sort(vals)
+    mu = float(np.mean(vals))
+    sd = float(np.std(vals)) if vals.size > 1 else 0.0
+    q05, q25, q50, q75, q95 = (float(x) for x in quantiles(s, QUANTILES))
+    mad_v = mad(vals, med=q50)
     iqr_v = q75 - q25
     return {
-        "n": len(vals),
+        "n": int(vals.size),
         "mean": mu,
         "std": sd,
         "q05": q05,
@@ -108,8 +142,8 @@ def compute_stats(vals):
             if (mad_v and not math.isnan(mad_v) and mad_v != 0)
             else None
         ),
-        "min": s[0],
-        "max": s[-1],
+        "min": float(s[0]),
+        "max": float(s[-1]),
     }
 
 
@@ -127,6 +161,62 @@ def effective_drift(stats_a, stats_b):
     return float(term1 + term2)
 
 
+def column_drift(stats) -> float | None:
+    # dérive d'une colonne = |mean| + 0.5*(q95 - q05), même forme que v1
+    if not stats or stats.get("n", 0) == 0:
+        return None
+    return float(abs(stats["mean"]) + 0.5 * (stats["q95"] - stats["q05"]))
+
+
+def compute_all_stats(deltas, max_workers: int | None, parallel_min_columns: int):
+    """compute_stats pour chaque colonne ; pool de threads si l'ombre est large.
+
+    Le tri NumPy libère le GIL, donc des threads suffisent et évitent de
+    sérialiser les tableaux vers des processus.
+    """
+    cols = list(deltas)
+    if len(cols) < parallel_min_columns or max_workers == 1:
+        return {col: compute_stats(deltas[col]) for col in cols}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return dict(zip(cols, ex.map(lambda c: compute_stats(deltas[c]), cols)))
+
+
+def multi_column_drift(stats, mc_cfg):
+    """Score pondéré sur toutes les colonnes de column_changes.
+
+    mc_cfg (clé multi_column_drift_v1 de config_score.json) :
+      exclude   : colonnes ignorées (ex: ["t"])
+      weights   : {"default": w, "<col>": w_col}
+      aggregate : "weighted_max" (défaut) ou "weighted_mean"
+    """
+    exclude = set(mc_cfg.get("exclude", []))
+    weights = mc_cfg.get("weights", {})
+    default_w = float(weights.get("default", 1.0))
+    aggregate = mc_cfg.get("aggregate", "weighted_max")
+
+    per_col = {}
+    for col, st in stats.items():
+        if col in exclude:
+            continue
+        d = column_drift(st)
+        if d is None:
+            continue
+        per_col[col] = {"drift": d, "weight": float(weights.get(col, default_w))}
+
+    scored = [(v["drift"], v["weight"]) for v in per_col.values() if v["weight"] > 0]
+    if not scored:
+        return None, per_col
+    drift = np.array([d for d, _ in scored])
+    w = np.array([w for _, w in scored])
+    if aggregate == "weighted_mean":
+        score = float(np.sum(w * drift) / np.sum(w))
+    elif aggregate == "weighted_max":
+        score = float(np.max(w * drift))
+    else:
+        raise SystemExit(f"aggregate inconnu: {aggregate}")
+    return score, per_col
+
+
 def colorize(score, green_max, yellow_max):
     if score is None or math.isnan(score):
         return "unknown"
@@ -159,6 +249,17 @@ def main():
         action="store_true",
         help="Exit 0 (status=skipped) if required inputs are missing",
     )
+    ap.add_argument(
+        "--write-sidecar",
+        action="store_true",
+        help="Write shadow_diff.deltas.npz next to shadow_diff.json for later tools",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Threads for per-column stats on wide shadows (default: auto)",
+    )
     args = ap.parse_args()
 
     out_dir = args.out
@@ -167,6 +268,8 @@ def main():
     green_max = float(thr.get("green_max", 0.20))
     yellow_max = float(thr.get("yellow_max", 0.50))
     b_thr = cfg.get("b_outlier_thresholds", [0.05, 0.10, 0.20])
+    score_formula = cfg.get("score_formula", "effective_drift_v1")
+    mc_cfg = cfg.get("multi_column_drift_v1", {})
 
     shadow_diff_path = find_one([os.path.join(out_dir, "**", "shadow_diff.json")])
     if not shadow_diff_path:
@@ -181,15 +284,20 @@ def main():
             return
         raise SystemExit(f"shadow_diff.json introuvable sous {out_dir}")
 
-    shadow = load_json(shadow_diff_path)
+    if args.write_sidecar:
+        write_sidecar(shadow_diff_path)
+    deltas = load_column_deltas(shadow_diff_path)
 
-    stats = {}
+    stats = compute_all_stats(
+        deltas,
+        max_workers=args.workers,
+        parallel_min_columns=int(mc_cfg.get("parallel_min_columns", 32)),
+    )
     for col in ("a", "b", "t"):
-        vals = extract_deltas(shadow, col)
-        stats[col] = compute_stats(vals)
+        stats.setdefault(col, {"n": 0})
 
     # b readability
-    b_vals = extract_deltas(shadow, "b")
+    b_vals = extract_deltas(deltas, "b")
     b_read = {
         "n": len(b_vals),
         "thresholds": {},
@@ -197,10 +305,7 @@ def main():
         "mad": stats["b"].get("mad"),
         "iqr_over_mad": stats["b"].get("iqr_over_mad"),
     }
-    if b_vals:
-        for th in b_thr:
-            pct = sum(1 for v in b_vals if abs(v) > float(th)) / len(b_vals)
-            b_read["thresholds"][str(th)] = {"pct_abs_gt": pct}
+    b_read["thresholds"] = abs_exceedance(b_vals, b_thr)
 
     # graph_report (n_edges fix)
     graph_report_path = os.path.join(out_dir, "riftlens", "graph_report.json")
@@ -223,24 +328,32 @@ def main():
             "n_edges", summary["riftlens"].get("n_edges")
         )
 
-    score = effective_drift(stats["a"], stats["b"])
+    score_v1 = effective_drift(stats["a"], stats["b"])
+    score_mc, drift_cols = multi_column_drift(stats, mc_cfg)
+    if score_formula == "effective_drift_v1":
+        score = score_v1
+    elif score_formula == "multi_column_drift_v1":
+        score = score_mc
+    else:
+        raise SystemExit(f"score_formula inconnue: {score_formula}")
     status = colorize(score, green_max, yellow_max)
 
     summary.setdefault("drift", {})
-    summary["drift"]["score_effective_v1"] = score
+    summary["drift"]["score_effective_v1"] = score_v1
+    summary["drift"]["score_multi_column_v1"] = score_mc
+    summary["drift"]["score_formula"] = score_formula
     summary["drift"]["status"] = status
     summary["drift"]["thresholds"] = {"green_max": green_max, "yellow_max": yellow_max}
+    summary["drift"]["columns"] = drift_cols
 
     summary.setdefault("shadow_diff", {})
-    summary["shadow_diff"]["columns"] = {
-        "a": stats["a"],
-        "b": stats["b"],
-        "t": stats["t"],
-    }
+    summary["shadow_diff"]["columns"] = stats
     summary["shadow_diff"]["b_readability"] = b_read
 
     ci_status = {
-        "score_effective_v1": score,
+        "score_effective_v1": score_v1,
+        "score_multi_column_v1": score_mc,
+        "score_formula": score_formula,
         "status": status,
         "thresholds": {"green_max": green_max, "yellow_max": yellow_max},
     }
@@ -9,6 +9,10 @@ import subprocess
 from pathlib import Path
 from typing import Any, Dict, List
 
+import numpy as np
+
+from shadow_loader import load_column_deltas
+
 
 def run_cmd(cmd: List[str], cwd: Path, env: Dict[str, str] | None = None) -> None:
     p = subprocess.run(cmd, cwd=str(cwd), env=env, capture_output=True, text=True)
@@ -49,32 +53,24 @@ def jaccard(a: set, b: set) -> float:
     return 1.0 if not u else len(a & b) / len(u)
 
 
-def extract_nulltrace_abs_deltas(diff_path: Path) -> List[float]:
-    diff_obj = load_json(diff_path)
-    diff = diff_obj.get("diff", {})
-    col_changes = diff.get("column_changes", {})
-    values: List[float] = []
-    for _, ch in (col_changes or {}).items():
-        deltas = (ch or {}).get("deltas", {}) or {}
-        for _, v in deltas.items():
-            try:
-                values.append(abs(float(v)))
-            except Exception:
-                pass
-    return values
+def extract_nulltrace_abs_deltas(diff_path: Path) -> np.ndarray:
+    arrays = list(load_column_deltas(str(diff_path)).values())
+    if not arrays:
+        return np.empty(0, dtype=np.float64)
+    return np.abs(np.concatenate(arrays))
 
 
-def quantiles(xs: List[float]) -> Dict[str, float | int]:
-    if not xs:
+def quantiles(xs: np.ndarray | List[float]) -> Dict[str, float | int]:
+    xs2 = np.sort(np.asarray(xs, dtype=np.float64))
+    if xs2.size == 0:
         return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "mad": 0.0, "n": 0}
-    xs2 = sorted(xs)
 
     def q(p: float) -> float:
         i = int(round((len(xs2) - 1) * p))
         return float(xs2[i])
 
-    med = statistics.median(xs2)
-    mad = statistics.median([abs(x - med) for x in xs2])
+    med = np.median(xs2)
+    mad = np.median(np.abs(xs2 - med))
     return {
         "p50": float(med),
         "p90": q(0.90),
@@ -112,10 +108,21 @@ def main() -> None:
     p.add_argument("--k", type=int, default=5)
     p.add_argument("--out-dir", type=str, default="_ci_out/stability")
     p.add_argument("--datasets-dir", type=str, default="_ci_out/datasets")
+    p.add_argument(
+        "--cas",
+        action="store_true",
+        help="Dédupliquer datasets et artefacts dans <out-dir>/objects/<sha256>",
+    )
+    p.add_argument(
+        "--modules-dir",
+        type=str,
+        default="modules",
+        help="Répertoire contenant RiftLens, NullTrace et VoidMark",
+    )
     args = p.parse_args()
 
     repo_dir = Path(__file__).resolve().parents[1]
-    modules_dir = repo_dir / "modules"
+    modules_dir = _resolve_under_repo(repo_dir, Path(args.modules_dir))
     rift = modules_dir / "RiftLens"
     nt = modules_dir / "NullTrace"
     vm = modules_dir / "VoidMark"
@@ -147,6 +154,14 @@ def main() -> None:
         ]
     ).strip(":")
 
+    store = None
+    if args.cas or (out / "objects").is_dir():
+        from bareflux.cas import ObjectStore
+
+        # out-dir déjà dédupliqué : même sans --cas, les runs réécrits
+        # doivent être détachés des objets partagés
+        store = ObjectStore(out)
+
     report: Dict[str, Any] = {
         "tool": "BareFlux.collect-stable",
         "mode": "A",
@@ -163,6 +178,14 @@ def main() -> None:
         },
         "results": {},
     }
+    if args.cas and store is not None:
+        # les datasets sources restent en place, seule une copie est stockée
+        for entry in report["datasets"].values():
+            store.put(Path(entry["path"]), entry["sha256"])
+            entry["object"] = store.rel_object_path(entry["sha256"], out)
+        report["object_store"] = Path(
+            os.path.relpath(store.objects_dir, out)
+        ).as_posix()
 
     for thr in thresholds:
         thr_key = f"{thr:.2f}"
@@ -170,12 +193,16 @@ def main() -> None:
         thr_dir.mkdir(parents=True, exist_ok=True)
 
         edge_sets: List[set[tuple[str, str]]] = []
-        nt_deltas_all: List[float] = []
+        nt_deltas_all: List[np.ndarray] = []
         marks_counts: List[int] = []
 
         for i in range(1, k + 1):
             run_dir = thr_dir / f"run_{i:02d}"
             run_dir.mkdir(parents=True, exist_ok=True)
+            if store is not None:
+                # re-run dans le même out-dir : les modules réécrivent leurs
+                # sorties en place, jamais à travers un lien vers un objet
+                store.detach_tree(run_dir)
 
             r_out = run_dir / "riftlens"
             r_out.mkdir(parents=True, exist_ok=True)
@@ -241,7 +268,7 @@ def main() -> None:
                 reverse=True,
             )
             if diffs:
-                nt_deltas_all.extend(extract_nulltrace_abs_deltas(diffs[0]))
+                nt_deltas_all.append(extract_nulltrace_abs_deltas(diffs[0]))
 
             v_out = run_dir / "vault"
             v_out.mkdir(parents=True, exist_ok=True)
@@ -262,6 +289,10 @@ def main() -> None:
                 + len(list(v_out.rglob("*.md")))
                 + len(list(v_out.rglob("*.txt")))
             )
+            if args.cas and store is not None:
+                for f in sorted(run_dir.rglob("*")):
+                    if f.is_file() and not f.is_symlink():
+                        store.ingest(f)
 
         base_edges = edge_sets[0] if edge_sets else set()
         j_list = (
@@ -277,7 +308,9 @@ def main() -> None:
                 "jaccard_median": float(statistics.median(j_list)) if j_list else 1.0,
             },
             "nulltrace": {
-                "abs_delta_stats": quantiles(nt_deltas_all),
+                "abs_delta_stats": quantiles(
+                    np.concatenate(nt_deltas_all) if nt_deltas_all else []
+                ),
             },
             "voidmark": {
                 "marks_files_count_runs": marks_counts,
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """
 Déduplication d'artefacts zip (ex: dd_graph_artifacts.zip / dd_graph_artifacts (1).zip)
-- calcule SHA256
-- supprime les doublons exacts
+- regroupe par taille : une taille unique prouve l'unicité, aucun hash calculé
+- compare ensuite un hash partiel (début + fin du fichier)
+- calcule SHA256 complet uniquement pour les candidats encore en collision
+  (hashing en parallèle, pool de threads)
+- supprime les doublons exacts, ou les remplace par des hardlinks (--hardlink)
 - écrit un rapport JSON
 
 Usage:
   python tools/dedup_artifacts.py --dir . --pattern "dd_graph_artifacts*.zip" --report _bareflux_out/dedup_report.json
+  python tools/dedup_artifacts.py --dir . --pattern "*.zip" --hardlink --workers 8
 """
 
 from __future__ import annotations
@@ -16,8 +20,12 @@ import glob
 import hashlib
 import json
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+PARTIAL_BYTES = 64 * 1024
+
 
 def sha256_file(path: str) -> str:
     h = hashlib.sha256()
@@ -27,41 +35,120 @@ def sha256_file(path: str) -> str:
     return h.hexdigest()
 
 
+def partial_hash(path: str, size: int, block: int = PARTIAL_BYTES) -> str:
+    """sha256(début + fin). Si size <= 2*block, c'est le sha256 complet."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        if size <= 2 * block:
+            h.update(f.read())
+        else:
+            h.update(f.read(block))
+            f.seek(size - block)
+            h.update(f.read(block))
+    return h.hexdigest()
+
+
+def _group_by(files, key_fn, workers):
+    groups = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for fp, key in zip(files, ex.map(key_fn, files)):
+            groups[key].append(fp)
+    return groups
+
+
+def find_duplicates(files, workers=None, block=PARTIAL_BYTES):
+    """Retourne {fichier_dupliqué: (sha256, original)}, original = premier dans l'ordre."""
+    order = {fp: i for i, fp in enumerate(files)}
+    sizes = {fp: os.path.getsize(fp) for fp in files}
+    by_size = defaultdict(list)
+    for fp in files:
+        by_size[sizes[fp]].append(fp)
+    candidates = [fp for group in by_size.values() if len(group) > 1 for fp in group]
+
+    by_partial = _group_by(
+        candidates, lambda fp: (sizes[fp], partial_hash(fp, sizes[fp], block)), workers
+    )
+    # petits fichiers : le hash partiel couvre tout le contenu
+    final_groups = {}
+    to_hash = []
+    for (size, ph), group in by_partial.items():
+        if len(group) < 2:
+            continue
+        if size <= 2 * block:
+            final_groups[ph] = group
+        else:
+            to_hash.extend(group)
+    for digest, group in _group_by(to_hash, sha256_file, workers).items():
+        if len(group) > 1:
+            final_groups[digest] = group
+
+    dups = {}
+    for digest, group in final_groups.items():
+        group = sorted(group, key=order.__getitem__)
+        for fp in group[1:]:
+            dups[fp] = (digest, group[0])
+    return dups
+
+
+def same_inode(a: str, b: str) -> bool:
+    sa, sb = os.stat(a), os.stat(b)
+    return (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino)
+
+
+def hardlink_replace(dup: str, original: str) -> None:
+    tmp = dup + ".dedup_tmp"
+    os.link(original, tmp)
+    os.replace(tmp, dup)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--dir", default=".", help="Répertoire où scanner")
     ap.add_argument("--pattern", default="dd_graph_artifacts*.zip", help="Glob pattern")
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Remplace les doublons par des hardlinks au lieu de les supprimer",
+    )
+    ap.add_argument("--workers", type=int, default=None, help="Threads de hashing")
     ap.add_argument("--report", default="dedup_report.json")
     args = ap.parse_args()
 
     pat = os.path.join(args.dir, args.pattern)
     files = sorted(glob.glob(pat))
-    seen = {}
+    dups = find_duplicates(files, workers=args.workers)
     actions = []
 
     for fp in files:
-        s = sha256_file(fp)
-        if s in seen:
-            action = {
-                "file": fp,
-                "sha256": s,
-                "duplicate_of": seen[s],
-                "deleted": (not args.dry_run),
-            }
-            actions.append(action)
+        if fp not in dups:
+            continue
+        s, original = dups[fp]
+        action = {"file": fp, "sha256": s, "duplicate_of": original}
+        if args.hardlink:
+            if same_inode(fp, original):
+                continue  # déjà un hardlink de l'original
+            action["hardlinked"] = not args.dry_run
             if not args.dry_run:
-                os.remove(fp)
+                try:
+                    hardlink_replace(fp, original)
+                except OSError as e:
+                    action["hardlinked"] = False
+                    action["error"] = str(e)
         else:
-            seen[s] = fp
+            action["deleted"] = not args.dry_run
+            if not args.dry_run:
+                os.remove(fp)
+        actions.append(action)
 
-    report = {"scanned": files, "unique": list(seen.values()), "actions": actions}
+    unique = [fp for fp in files if fp not in dups]
+    report = {"scanned": files, "unique": unique, "actions": actions}
     Path(os.path.dirname(args.report) or ".").mkdir(parents=True, exist_ok=True)
     with open(args.report, "w", encoding="utf-8") as f:
         json.dump(report, f, indent=2)
 
     print("OK")
-    print(f"unique={len(seen)} duplicates={len(actions)} report={args.report}")
+    print(f"unique={len(unique)} duplicates={len(actions)} report={args.report}")
 
 
 if __name__ == "__main__":
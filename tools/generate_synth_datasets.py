@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
-import numpy as np
-import pandas as pd
+
+from synth_stream import DEFAULT_CHUNK_SIZE, FORMATS, synth_maker, write_datasets
 
 
 def main() -> None:
@@ -15,36 +15,25 @@ def main() -> None:
     )
     p.add_argument("--n", type=int, default=200, help="Nombre de lignes")
     p.add_argument("--seed", type=int, default=42, help="Seed RNG")
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Lignes par bloc (un RNG par bloc, mémoire bornée)",
+    )
+    p.add_argument("--format", choices=FORMATS, default="csv", help="csv ou parquet")
+    p.add_argument(
+        "--workers", type=int, default=1, help="Processus de génération des blocs"
+    )
     args = p.parse_args()
 
     out = Path(args.out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    rng = np.random.default_rng(args.seed)
-    n = int(args.n)
-
-    # Dataset multi (RiftLens) : corrélation puis rupture
-    t = np.arange(n)
-    x = rng.normal(0, 1, size=n)
-    y = x + rng.normal(0, 0.1, size=n)  # corrélé
-    z = rng.normal(0, 1, size=n)
-    mid = n // 2
-    y[mid:] = rng.normal(0, 1, size=n - mid)  # rupture: décorrélation
-
-    df_multi = pd.DataFrame({"t": t, "x": x, "y": y, "z": z})
-    df_multi.to_csv(out / "multi.csv", index=False)
-
-    # NullTrace previous/current : rupture contrôlée
-    base = pd.DataFrame(
-        {"t": t, "a": rng.normal(0, 1, size=n), "b": rng.normal(0, 1, size=n)}
-    )
-    prev = base.copy()
-    curr = base.copy()
-    curr.loc[mid:, "a"] = curr.loc[mid:, "a"] + 0.25
-    curr.loc[mid:, "b"] = curr.loc[mid:, "b"] * 1.10
-
-    prev.to_csv(out / "previous_shadow.csv", index=False)
-    curr.to_csv(out / "current.csv", index=False)
+    # multi (RiftLens) : corrélation puis rupture ; NullTrace previous/current :
+    # rupture contrôlée à n // 2 (voir synth_stream.synth_block)
+    make_block, count = synth_maker(int(args.n), args.seed, args.chunk_size)
+    write_datasets(out, make_block, count, args.format, workers=args.workers)
 
     print(f"datasets_written={out.resolve()}")
 
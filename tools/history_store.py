@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+History BareFlux append-only, segmenté.
+
+Arborescence:
+  <root>/index.json          segments, bornes temporelles, nombre de points
+  <root>/seg_000001.jsonl    un point de monitoring par ligne
+  <root>/seg_000002.jsonl    ...
+
+- append O(1): écrit une ligne dans le dernier segment, met à jour l'index
+- rétention par suppression de segments entiers (jamais de réécriture)
+- requêtes par plage temporelle: seuls les segments qui chevauchent la
+  plage (d'après l'index) sont lus
+
+Rétention (--keep): l'ancien history JSONL gardait exactement les `keep`
+derniers points. Le store garde AU MOINS `keep` points et au plus
+keep + segment_size - 1 : un segment n'est supprimé qu'entier, quand les
+suivants contiennent déjà `keep` points.
+
+Ancien history JSONL (fichier .bareflux_history.jsonl): HistoryStore refuse
+un chemin qui est un fichier; migrate_legacy() le convertit en store au même
+chemin (l'original est conservé en <chemin>.legacy).
+
+Les timestamps sont des chaînes ISO UTC (YYYY-MM-DDTHH:MM:SSZ), comparables
+lexicographiquement.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+INDEX_NAME = "index.json"
+LEGACY_SUFFIX = ".legacy"
+SEQ_KEY = "_seq"
+SCHEMA_VERSION = "bareflux.history_index.v1"
+
+TREND_KEYS = ["ts_utc", "score", "status", "mean_b", "std_b", "n_nodes", "n_edges"]
+
+
+def _write_json_atomic(path: Path, obj: Any) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _segment_seq(seg: Dict[str, Any]) -> int:
+    # "seg_000042.jsonl" -> 42
+    return int(Path(seg["file"]).stem.split("_", 1)[1])
+
+
+class HistoryStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        if self.root.is_file():
+            raise ValueError(
+                f"{self.root} est un ancien history JSONL (fichier), pas un store; "
+                "le convertir avec store_history.py (migration automatique) "
+                "ou history_store.migrate_legacy()"
+            )
+        self.index_path = self.root / INDEX_NAME
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        else:
+            self.index = {
+                "schema_version": SCHEMA_VERSION,
+                "next_seq": 1,
+                "segments": [],
+            }
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        return self.index["segments"]
+
+    def __len__(self) -> int:
+        return sum(int(s["n"]) for s in self.segments)
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.index_path, self.index)
+
+    def _new_segment(self) -> Dict[str, Any]:
+        seq = int(self.index["next_seq"])
+        self.index["next_seq"] = seq + 1
+        seg = {
+            "file": f"seg_{seq:06d}.jsonl",
+            "first_ts": None,
+            "last_ts": None,
+            "n": 0,
+        }
+        self.segments.append(seg)
+        return seg
+
+    def append(self, point: Dict[str, Any], segment_size: int, keep: int) -> int:
+        """Ajoute un point puis applique la rétention. Retourne le nombre retenu.
+
+        La rétention garde au moins `keep` points : le plus ancien segment
+        n'est supprimé que si les suivants en contiennent déjà `keep`.
+        """
+        if segment_size < 1:
+            raise ValueError("segment_size doit être >= 1")
+        self.root.mkdir(parents=True, exist_ok=True)
+        seg = self.segments[-1] if self.segments else None
+        if seg is None or int(seg["n"]) >= segment_size:
+            seg = self._new_segment()
+
+        with (self.root / seg["file"]).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(point) + "\n")
+
+        ts = point.get("ts_utc")
+        if ts is not None:
+            seg["first_ts"] = (
+                ts if seg["first_ts"] is None else min(seg["first_ts"], ts)
+            )
+            seg["last_ts"] = ts if seg["last_ts"] is None else max(seg["last_ts"], ts)
+        seg["n"] = int(seg["n"]) + 1
+
+        self.drop_old_segments(keep)
+        self._save_index()
+        return len(self)
+
+    def drop_old_segments(self, keep: int) -> List[str]:
+        dropped: List[str] = []
+        total = len(self)
+        while len(self.segments) > 1 and total - int(self.segments[0]["n"]) >= keep:
+            seg = self.segments.pop(0)
+            total -= int(seg["n"])
+            try:
+                (self.root / seg["file"]).unlink()
+            except FileNotFoundError:
+                pass
+            dropped.append(seg["file"])
+        return dropped
+
+    def _overlapping(self, since: Optional[str], until: Optional[str]):
+        for seg in self.segments:
+            if (
+                since is not None
+                and seg["last_ts"] is not None
+                and seg["last_ts"] < since
+            ):
+                continue
+            if (
+                until is not None
+                and seg["first_ts"] is not None
+                and seg["first_ts"] > until
+            ):
+                continue
+            yield seg
+
+    def query(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        with_seq: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Points avec since <= ts_utc <= until (bornes optionnelles, incluses).
+
+        with_seq=True ajoute à chaque point SEQ_KEY = [n° de segment, n° de
+        ligne], rang d'insertion stable (la rétention ne renumérote pas) qui
+        départage les points de même ts_utc.
+        """
+        for seg in self._overlapping(since, until):
+            path = self.root / seg["file"]
+            if not path.exists():
+                continue
+            seg_seq = _segment_seq(seg)
+            for line_no, row in enumerate(_read_jsonl(path)):
+                ts = row.get("ts_utc")
+                if since is not None and (ts is None or ts < since):
+                    continue
+                if until is not None and (ts is None or ts > until):
+                    continue
+                if with_seq:
+                    row[SEQ_KEY] = [seg_seq, line_no]
+                yield row
+
+    def write_csv(
+        self,
+        out_path: str | Path,
+        keys: List[str] = TREND_KEYS,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> int:
+        return write_rows_csv(out_path, self.query(since, until), keys)
+
+    def import_jsonl(self, path: str | Path, segment_size: int, keep: int) -> int:
+        """Reprend un ancien history JSONL (une ligne par point)."""
+        n = 0
+        for row in _read_jsonl(Path(path)):
+            self.append(row, segment_size=segment_size, keep=keep)
+            n += 1
+        return n
+
+
+def migrate_legacy(path: str | Path, segment_size: int, keep: int) -> HistoryStore:
+    """Convertit un ancien history JSONL en store au même chemin.
+
+    Le fichier est renommé <path>.legacy (conservé), puis ses lignes sont
+    importées dans le store créé à `path`, avec la rétention du store.
+    """
+    path = Path(path)
+    backup = path.with_name(path.name + LEGACY_SUFFIX)
+    if backup.exists():
+        raise ValueError(f"{backup} existe déjà: migration déjà tentée?")
+    os.replace(path, backup)
+    store = HistoryStore(path)
+    store.import_jsonl(backup, segment_size=segment_size, keep=keep)
+    store._save_index()
+    return store
+
+
+def write_rows_csv(out_path: str | Path, rows, keys: List[str] = TREND_KEYS) -> int:
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with out_path.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r.get(k) for k in keys})
+            n += 1
+    return n
@@ -1,19 +1,165 @@
 from __future__ import annotations
 
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Callable, Iterable, List, Optional, Sequence, TypeVar
+import math
+import os
+import time
+import weakref
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
 
 T = TypeVar("T")
 R = TypeVar("R")
 
+BACKENDS = ("process", "thread")
+
+# Nombre de chunks visé par worker (équilibrage vs coût de sérialisation),
+# même heuristique que multiprocessing.Pool.map.
+CHUNKS_PER_WORKER = 4
+
+
+def auto_chunksize(n_items: int, workers: int) -> int:
+    return max(1, math.ceil(n_items / (workers * CHUNKS_PER_WORKER)))
+
+
+def _run_chunk(func: Callable[[T], R], chunk: Sequence[T]) -> Tuple[List[R], float]:
+    t0 = time.perf_counter()
+    out = [func(it) for it in chunk]
+    return out, time.perf_counter() - t0
+
 
 def parallel_map(
-    func: Callable[[T], R], items: Sequence[T], max_workers: Optional[int] = None
+    func: Callable[[T], R],
+    items: Sequence[T],
+    max_workers: Optional[int] = None,
+    *,
+    chunksize: Optional[int] = None,
+    backend: str = "process",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_timing: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> List[R]:
-    """Parallélisme massif minimal (stdlib), sans dépendances lourdes."""
-    results: List[R] = []
-    with ProcessPoolExecutor(max_workers=max_workers) as ex:
-        futs = [ex.submit(func, it) for it in items]
-        for fut in as_completed(futs):
-            results.append(fut.result())
-    return results
+    """Parallélisme massif minimal (stdlib), sans dépendances lourdes.
+
+    - résultats dans l'ordre de `items`
+    - les items sont envoyés par chunks (un aller-retour de sérialisation par
+      chunk, pas par item) ; chunksize automatique si None
+    - backend "process" (func et items picklables) ou "thread" (code qui
+      libère le GIL : NumPy, I/O)
+    - on_progress(items_faits, total) après chaque chunk ; on_timing(stats)
+      une fois à la fin (temps mur, temps de calcul cumulé, chunks)
+
+    Pour de gros tableaux NumPy, passer des SharedArray (voir shared_arrays)
+    plutôt que les tableaux eux-mêmes.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend inconnu: {backend} (attendu: {BACKENDS})")
+    items = list(items)
+    n = len(items)
+    workers = max_workers or os.cpu_count() or 1
+    size = chunksize or auto_chunksize(n, workers)
+    chunks = [items[i : i + size] for i in range(0, n, size)]
+
+    t0 = time.perf_counter()
+    parts: List[Optional[List[R]]] = [None] * len(chunks)
+    task_s = 0.0
+    done = 0
+    pool = ProcessPoolExecutor if backend == "process" else ThreadPoolExecutor
+    if chunks:
+        with pool(max_workers=min(workers, len(chunks))) as ex:
+            pending = {
+                ex.submit(_run_chunk, func, chunk): i for i, chunk in enumerate(chunks)
+            }
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    i = pending.pop(fut)
+                    parts[i], dt = fut.result()
+                    task_s += dt
+                    done += len(chunks[i])
+                    if on_progress is not None:
+                        on_progress(done, n)
+
+    if on_timing is not None:
+        on_timing(
+            {
+                "backend": backend,
+                "workers": workers,
+                "n_items": n,
+                "n_chunks": len(chunks),
+                "chunksize": size,
+                "wall_s": time.perf_counter() - t0,
+                "task_s": task_s,
+            }
+        )
+    return [r for part in parts for r in part]  # type: ignore[union-attr]
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Référence picklable vers un tableau en mémoire partagée.
+
+    Seul (name, shape, dtype) transite vers les workers ; les données ne sont
+    jamais copiées. Côté worker : `with ref.attach() as arr: ...` (lecture,
+    ou écriture si les workers écrivent des tranches disjointes).
+    """
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @contextmanager
+    def attach(self) -> Iterator[np.ndarray]:
+        """Tableau projeté sur le segment partagé.
+
+        La projection vit aussi longtemps que le tableau : une vue gardée
+        après le bloc with reste valide (le segment n'est fermé qu'à la
+        disparition de la dernière vue, via weakref.finalize).
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        arr = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf)
+        # np.ndarray(buffer=...) ne retient pas d'export sur shm.buf : fermer
+        # shm ici démapperait la mémoire sous les vues encore vivantes
+        weakref.finalize(arr, shm.close)
+        yield arr
+
+
+@contextmanager
+def shared_arrays(**arrays: np.ndarray) -> Iterator[Dict[str, SharedArray]]:
+    """Copie chaque tableau une fois en mémoire partagée et libère les
+    segments à la sortie. Les résultats écrits par les workers sont lisibles
+    via `ref.attach()` avant la sortie du bloc."""
+    segments: List[shared_memory.SharedMemory] = []
+    refs: Dict[str, SharedArray] = {}
+    try:
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            segments.append(shm)
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            del view
+            refs[key] = SharedArray(shm.name, tuple(arr.shape), arr.dtype.str)
+        yield refs
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
@@ -1,17 +1,111 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from parallel_runner import auto_chunksize, parallel_map
 
-def lomb_scargle_power(
-    times: Sequence[float], values: Sequence[float], freqs: Sequence[float]
-) -> np.ndarray:
-    """Lomb-Scargle via astropy si dispo.
 
-    C'est du post-traitement optionnel. A utiliser explicitement, hors core.
+# Cache des termes trigonométriques (par blocs de fréquences), clé
+# (hash des temps, hash des fréquences) ; LRU borné en octets.
+TRIG_CACHE_BYTES = 256 * 1024 * 1024
+# taille visée d'un bloc (fréquences x temps x 8 octets)
+TRIG_BLOCK_BYTES = 32 * 1024 * 1024
+
+_trig_cache: "OrderedDict[Tuple[str, str], List[Tuple[np.ndarray, ...]]]" = (
+    OrderedDict()
+)
+_trig_cache_bytes = 0
+
+
+def _digest(arr: np.ndarray) -> str:
+    return hashlib.sha1(np.ascontiguousarray(arr).view(np.uint8)).hexdigest()
+
+
+def _trig_block_iter(
+    t: np.ndarray, f: np.ndarray, step: int
+) -> Iterator[Tuple[np.ndarray, ...]]:
+    for f0 in range(0, f.size, step):
+        arg = 2.0 * np.pi * np.outer(f[f0 : f0 + step], t)
+        c, s = np.cos(arg), np.sin(arg)
+        yield c, s, c * c, c * s
+
+
+def _trig_blocks(t: np.ndarray, f: np.ndarray) -> Iterable[Tuple[np.ndarray, ...]]:
+    """(cos, sin, cos², cos·sin) de 2π f t, par blocs de fréquences.
+
+    Si l'ensemble des blocs (4·F·T·8 octets) tient dans TRIG_CACHE_BYTES,
+    ils sont calculés, mis en cache et renvoyés en liste ; sinon ils sont
+    produits un à un par un générateur (jamais plus d'un bloc en mémoire,
+    ~4·TRIG_BLOCK_BYTES) et pas mis en cache.
+    """
+    global _trig_cache_bytes
+    step = max(1, TRIG_BLOCK_BYTES // (8 * max(t.size, 1)))
+    nbytes = 4 * 8 * f.size * t.size
+    if nbytes > TRIG_CACHE_BYTES:
+        return _trig_block_iter(t, f, step)
+
+    key = (_digest(t), _digest(f))
+    blocks = _trig_cache.get(key)
+    if blocks is not None:
+        _trig_cache.move_to_end(key)
+        return blocks
+
+    blocks = list(_trig_block_iter(t, f, step))
+    _trig_cache[key] = blocks
+    _trig_cache_bytes += nbytes
+    while _trig_cache_bytes > TRIG_CACHE_BYTES:
+        _, old = _trig_cache.popitem(last=False)
+        _trig_cache_bytes -= sum(a.nbytes for blk in old for a in blk)
+    return blocks
+
+
+def clear_trig_cache() -> None:
+    global _trig_cache_bytes
+    _trig_cache.clear()
+    _trig_cache_bytes = 0
+
+
+def _gls_power_numpy(t: np.ndarray, y: np.ndarray, f: np.ndarray) -> np.ndarray:
+    """Lomb-Scargle généralisé (moyenne flottante), normalisation "standard".
+
+    Même quantité que astropy LombScargle(t, y).power(f) avec ses options
+    par défaut (fit_mean, center_data). y: (B, T), NaN = point ignoré pour la
+    série concernée. Toutes les sommes sont des produits matriciels avec les
+    termes trigonométriques partagés.
     """
+    valid = np.isfinite(y)
+    w = valid.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w /= w.sum(axis=1, keepdims=True)
+    w = np.nan_to_num(w)
+    yv = np.where(valid, y, 0.0)
+    ym = np.sum(w * yv, axis=1, keepdims=True)
+    yc = np.where(valid, yv - ym, 0.0)
+    wy = w * yc
+    yy = np.sum(wy * yc, axis=1, keepdims=True)
+
+    out = np.empty((y.shape[0], f.size), dtype=float)
+    f0 = 0
+    for c, s, cc, cs in _trig_blocks(t, f):
+        C, S = w @ c.T, w @ s.T
+        YC, YS = wy @ c.T, wy @ s.T
+        CC = w @ cc.T - C * C
+        SS = (1.0 - w @ cc.T) - S * S
+        CS = w @ cs.T - C * S
+        D = CC * SS - CS * CS
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p = (SS * YC * YC + CC * YS * YS - 2.0 * CS * YC * YS) / (yy * D)
+        out[:, f0 : f0 + c.shape[0]] = p
+        f0 += c.shape[0]
+    return out
+
+
+def _import_lombscargle():
     try:
         from astropy.timeseries import LombScargle  # type: ignore
     except Exception as e:
@@ -19,27 +113,65 @@ def lomb_scargle_power(
             "Dépendance manquante: astropy.timeseries.\n"
             "Installe astropy uniquement si tu actives ce module optionnel."
         ) from e
+    return LombScargle
+
+
+def lomb_scargle_batch(
+    times: Sequence[float],
+    values: Sequence[Sequence[float]],
+    freqs: Sequence[float],
+    method: str = "numpy",
+) -> np.ndarray:
+    """Périodogrammes de plusieurs séries échantillonnées aux mêmes temps.
 
+    values: (B, T) ou (T,) ; retourne (B, F) ou (F,).
+    method="numpy" (défaut, sans dépendance) : calcul vectorisé, termes
+    trigonométriques calculés une fois par (temps, fréquences) et mis en
+    cache. method="astropy" : un LombScargle par série.
+    """
     t = np.asarray(times, dtype=float)
     y = np.asarray(values, dtype=float)
     f = np.asarray(freqs, dtype=float)
-    ls = LombScargle(t, y)
-    return np.asarray(ls.power(f), dtype=float)
+    single = y.ndim == 1
+    y2 = np.atleast_2d(y)
+    if y2.shape[1] != t.size:
+        raise ValueError(f"values: {y2.shape[1]} points, times: {t.size}")
 
+    if method == "numpy":
+        out = _gls_power_numpy(t, y2, f)
+    elif method == "astropy":
+        LombScargle = _import_lombscargle()
+        out = np.empty((y2.shape[0], f.size), dtype=float)
+        for i, row in enumerate(y2):
+            ok = np.isfinite(row)
+            out[i] = LombScargle(t[ok], row[ok]).power(f)
+    else:
+        raise ValueError(f"method inconnue: {method}")
+    return out[0] if single else out
 
-def transit_model_batman(
-    times: Sequence[float],
-    period: float,
-    t0: float,
-    rp: float,
-    a: float,
-    inc_deg: float = 90.0,
+
+def lomb_scargle_power(
+    times: Sequence[float], values: Sequence[float], freqs: Sequence[float]
 ) -> np.ndarray:
-    """Modèle transit via batman si dispo.
+    """Lomb-Scargle via astropy si dispo, sinon calcul NumPy équivalent.
 
-    Attention: c'est un modèle physique, donc interprétatif par nature.
-    On le garde optionnel, en post-traitement.
+    C'est du post-traitement optionnel. A utiliser explicitement, hors core.
     """
+    try:
+        _import_lombscargle()
+        method = "astropy"
+    except RuntimeError:
+        method = "numpy"
+    return lomb_scargle_batch(times, values, freqs, method=method)
+
+
+LIMB_DARK_U = (0.1, 0.3)
+TRANSIT_METHODS = ("auto", "batman", "trapezoid", "box")
+# taille visée d'un bloc (paramètres x temps x 8 octets) en mode NumPy
+TRANSIT_BLOCK_BYTES = 32 * 1024 * 1024
+
+
+def _import_batman():
     try:
         import batman  # type: ignore
     except Exception as e:
@@ -47,18 +179,133 @@ def transit_model_batman(
             "Dépendance manquante: batman-package.\n"
             "Installe-la uniquement si tu actives le module de modélisation."
         ) from e
+    return batman
 
-    params = batman.TransitParams()
+
+def _set_batman_params(params, period, t0, rp, a, inc_deg) -> None:
     params.t0 = float(t0)
     params.per = float(period)
     params.rp = float(rp)
     params.a = float(a)
     params.inc = float(inc_deg)
+
+
+def _new_batman_params(batman, period, t0, rp, a, inc_deg, u=LIMB_DARK_U):
+    params = batman.TransitParams()
+    _set_batman_params(params, period, t0, rp, a, inc_deg)
     params.ecc = 0.0
     params.w = 90.0
     params.limb_dark = "quadratic"
-    params.u = [0.1, 0.3]
+    params.u = list(u)
+    return params
+
+
+def transit_model_batman(
+    times: Sequence[float],
+    period: float,
+    t0: float,
+    rp: float,
+    a: float,
+    inc_deg: float = 90.0,
+) -> np.ndarray:
+    """Modèle transit via batman si dispo.
+
+    Attention: c'est un modèle physique, donc interprétatif par nature.
+    On le garde optionnel, en post-traitement.
+    """
+    batman = _import_batman()
+    params = _new_batman_params(batman, period, t0, rp, a, inc_deg)
 
     t = np.asarray(times, dtype=float)
     m = batman.TransitModel(params, t)
     return np.asarray(m.light_curve(params), dtype=float)
+
+
+def _batman_chunk(job: Tuple[np.ndarray, np.ndarray, Tuple[float, ...]]) -> np.ndarray:
+    """Un TransitModel initialisé une fois, évalué pour chaque ligne du lot."""
+    t, rows, u = job
+    batman = _import_batman()
+    params = _new_batman_params(batman, *rows[0], u=u)
+    m = batman.TransitModel(params, t)
+    out = np.empty((len(rows), t.size), dtype=float)
+    for i, row in enumerate(rows):
+        _set_batman_params(params, *row)
+        out[i] = m.light_curve(params)
+    return out
+
+
+def transit_model_numpy(
+    t: np.ndarray, grid: np.ndarray, shape: str = "trapezoid"
+) -> np.ndarray:
+    """Modèle analytique sans limb darkening, orbite circulaire.
+
+    grid: (P, 5) colonnes period, t0, rp, a, inc_deg ; retourne (P, T).
+    z = distance projetée (rayons stellaires). box: profondeur rp² si z < 1 ;
+    trapezoid: rampe linéaire de z = 1 + rp (contact 1) à z = 1 - rp.
+    """
+    out = np.empty((grid.shape[0], t.size), dtype=float)
+    step = max(1, TRANSIT_BLOCK_BYTES // (8 * max(t.size, 1)))
+    for p0 in range(0, grid.shape[0], step):
+        period, t0, rp, a, inc = (col[:, None] for col in grid[p0 : p0 + step].T)
+        phi = 2.0 * np.pi * (t[None, :] - t0) / period
+        cos_phi = np.cos(phi)
+        z = a * np.sqrt(np.sin(phi) ** 2 + (np.cos(np.radians(inc)) * cos_phi) ** 2)
+        if shape == "box":
+            frac = (z < 1.0).astype(float)
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                frac = np.clip((1.0 + rp - z) / (2.0 * rp), 0.0, 1.0)
+            frac = np.nan_to_num(frac)
+        out[p0 : p0 + step] = 1.0 - rp * rp * frac * (cos_phi > 0)
+    return out
+
+
+def transit_model_grid(
+    times: Sequence[float],
+    period,
+    t0,
+    rp,
+    a,
+    inc_deg=90.0,
+    method: str = "auto",
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    """Courbes de transit pour une grille de paramètres, (P, T).
+
+    Chaque paramètre est un scalaire ou un tableau 1-D ; ils sont diffusés
+    (broadcast) en P jeux de paramètres.
+    method: "batman" (un TransitModel par lot, lots répartis sur un pool de
+    processus), "trapezoid" / "box" (NumPy vectorisé), "auto" = batman si
+    installé, sinon trapezoid.
+    """
+    if method not in TRANSIT_METHODS:
+        raise ValueError(f"method inconnue: {method}")
+    t = np.asarray(times, dtype=float)
+    cols = np.broadcast_arrays(
+        *(
+            np.atleast_1d(np.asarray(v, dtype=float))
+            for v in (period, t0, rp, a, inc_deg)
+        )
+    )
+    if cols[0].ndim != 1:
+        raise ValueError("paramètres: scalaires ou tableaux 1-D")
+    grid = np.column_stack(cols)
+
+    if method == "auto":
+        try:
+            _import_batman()
+            method = "batman"
+        except RuntimeError:
+            method = "trapezoid"
+    if method != "batman":
+        return transit_model_numpy(t, grid, shape=method)
+
+    _import_batman()
+    workers = max_workers or os.cpu_count() or 1
+    size = auto_chunksize(len(grid), workers)
+    jobs = [(t, grid[i : i + size], LIMB_DARK_U) for i in range(0, len(grid), size)]
+    if workers == 1 or len(jobs) <= 1:
+        parts = [_batman_chunk(job) for job in jobs]
+    else:
+        parts = parallel_map(_batman_chunk, jobs, max_workers=workers, chunksize=1)
+    return np.vstack(parts) if parts else np.empty((0, t.size), dtype=float)
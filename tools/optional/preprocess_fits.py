@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from parallel_runner import parallel_map
+
 
 def _import_astropy():
     try:
@@ -54,60 +60,504 @@ def _safe_time_from_header(header: Dict[str, Any]) -> Any:
     return None
 
 
+NAN_FEATURES = {
+    "flux": 0.0,
+    "centroid_x": float("nan"),
+    "centroid_y": float("nan"),
+    "fwhm": float("nan"),
+}
+
+# lignes lues par bloc : borne la copie float64 quel que soit l'image
+ROW_BLOCK = 1024
+
+
+def image_marginals(
+    image: np.ndarray, row_block: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sommes par ligne (axe y) et par colonne (axe x), NaN/inf comptés 0.
+
+    L'image (souvent un memmap) est parcourue par blocs de lignes : seule
+    une tranche est convertie en float64 à la fois.
+    """
+    if image.ndim != 2:
+        raise ValueError(f"image 2D attendue, ndim={image.ndim}")
+    ny, nx = image.shape
+    row_block = row_block or ROW_BLOCK
+    rows = np.zeros(ny, dtype=float)
+    cols = np.zeros(nx, dtype=float)
+    for r0 in range(0, ny, row_block):
+        block = np.array(image[r0 : r0 + row_block], dtype=float)
+        if image.dtype.kind == "f":
+            block[~np.isfinite(block)] = 0.0
+        rows[r0 : r0 + len(block)] = block.sum(axis=1)
+        cols += block.sum(axis=0)
+    return rows, cols
+
+
 def extract_basic_features(image: np.ndarray) -> Dict[str, float]:
-    img = np.asarray(image, dtype=float)
-    img = np.nan_to_num(img, nan=0.0, posinf=0.0, neginf=0.0)
+    """Flux, centroid et FWHM approximatif (moments d'ordre 2).
 
-    total = float(np.sum(img))
+    Les moments se calculent sur les marginales : sum(x * img) = sum(x * cols),
+    pas de grilles de coordonnées pleine taille.
+    """
+    rows, cols = image_marginals(np.asarray(image))
+
+    total = float(np.sum(cols))
     if total == 0.0:
-        return {
-            "flux": 0.0,
-            "centroid_x": float("nan"),
-            "centroid_y": float("nan"),
-            "fwhm": float("nan"),
-        }
+        return dict(NAN_FEATURES)
 
-    yy, xx = np.indices(img.shape)
-    cx = float(np.sum(xx * img) / total)
-    cy = float(np.sum(yy * img) / total)
+    xs = np.arange(cols.size, dtype=float)
+    ys = np.arange(rows.size, dtype=float)
+    cx = float(np.dot(xs, cols) / total)
+    cy = float(np.dot(ys, rows) / total)
 
-    varx = float(np.sum(((xx - cx) ** 2) * img) / total)
-    vary = float(np.sum(((yy - cy) ** 2) * img) / total)
+    varx = float(np.dot((xs - cx) ** 2, cols) / total)
+    vary = float(np.dot((ys - cy) ** 2, rows) / total)
     sigma = float(np.sqrt(max((varx + vary) / 2.0, 0.0)))
     fwhm = 2.355 * sigma
     return {"flux": total, "centroid_x": cx, "centroid_y": cy, "fwhm": fwhm}
 
 
-def extract_features_from_fits_files(files: Iterable[Path]) -> pd.DataFrame:
+def features_from_fits(job: Tuple[int, str]) -> Dict[str, Any]:
+    """Features d'un fichier (exécutable dans un worker)."""
+    idx, fp = job
     fits, _Time = _import_astropy()
+    # memmap: les pixels sont lus à la demande, bloc par bloc
+    with fits.open(fp, memmap=True) as hdul:
+        img, header = _find_first_ndarray(hdul)
+        feats = extract_basic_features(img) if img.size else dict(NAN_FEATURES)
+        del img
+    t = _safe_time_from_header(header)
+    return {"t": t if t is not None else idx, "file": str(fp), **feats}
 
-    rows: List[Dict[str, Any]] = []
-    for idx, fp in enumerate(files):
-        with fits.open(fp) as hdul:
-            img, header = _find_first_ndarray(hdul)
-        feats = (
-            extract_basic_features(img)
-            if img.size
-            else {
-                "flux": 0.0,
-                "centroid_x": float("nan"),
-                "centroid_y": float("nan"),
-                "fwhm": float("nan"),
-            }
+
+def extract_features_from_fits_files(
+    files: Iterable[Path], workers: Optional[int] = 1, chunksize: Optional[int] = None
+) -> pd.DataFrame:
+    """Une ligne par fichier, dans l'ordre de `files`.
+
+    workers > 1 (ou None = nombre de CPU) répartit les fichiers sur un pool de
+    processus (parallel_runner.parallel_map).
+    """
+    _import_astropy()
+    jobs = [(idx, str(fp)) for idx, fp in enumerate(files)]
+    if workers == 1 or len(jobs) <= 1:
+        rows = [features_from_fits(job) for job in jobs]
+    else:
+        rows = parallel_map(
+            features_from_fits, jobs, max_workers=workers, chunksize=chunksize
         )
-        t = _safe_time_from_header(header)
-        rows.append({"t": t if t is not None else idx, "file": str(fp), **feats})
     return pd.DataFrame(rows)
 
 
+INDEX_SCHEMA = "bareflux.fits_index.v1"
+DEFAULT_BATCH_SIZE = 512
+FORMATS = ("csv", "parquet")
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_info(path: str, digest: Optional[str] = None) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {
+        "file": str(Path(path).resolve()),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": digest or sha256_file(path),
+    }
+
+
+def _process(
+    extract: Callable[[Tuple[int, str]], Dict[str, Any]], job: Tuple[int, str]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return extract(job), file_info(job[1])
+
+
+class ResumeIndex:
+    """Index de reprise JSONL : une ligne par lot écrit.
+
+    {"batch": n, "part": ..., "out_bytes": ..., "files": [{file, size,
+    mtime_ns, sha256}, ...]}
+
+    Une ligne n'est ajoutée qu'après écriture complète du lot : un lot
+    interrompu n'est pas indexé, ses fichiers seront retraités. Deux autres
+    sortes de lignes :
+
+    - {"refresh": [...]} : fichiers touchés mais de contenu identique (mtime
+      à jour, pour ne pas les rehacher à chaque exécution) ;
+    - {"renames": [[tmp, final], ...], "deletes": [...]} : opérations d'une
+      compaction validée (voir _compact), rejouées si un crash les a
+      interrompues ; une ligne aux listes vides les efface une fois jouées.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.batches: List[Dict[str, Any]] = []
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.renames: List[List[str]] = []
+        self.deletes: List[str] = []
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # ligne tronquée par un crash : fin de l'index
+                    self._load(entry)
+
+    def _load(self, entry: Dict[str, Any]) -> None:
+        if "refresh" in entry:
+            for info in entry["refresh"]:
+                self.files[info["file"]] = info
+        elif "renames" in entry:
+            self.renames = entry["renames"]
+            self.deletes = entry.get("deletes", [])
+        else:
+            self.batches.append(entry)
+            for info in entry.get("files", []):
+                self.files[info["file"]] = info
+
+    def pending(self, paths: List[str]) -> List[str]:
+        """Chemins à (re)traiter : absents de l'index ou contenu modifié.
+
+        Taille et mtime identiques : fichier considéré inchangé sans relecture ;
+        sinon le sha256 tranche. Un fichier seulement touché (même contenu)
+        voit son mtime mis à jour dans l'index : il ne sera plus relu.
+        """
+        todo: List[str] = []
+        touched: List[Dict[str, Any]] = []
+        for p in paths:
+            info = self.files.get(str(Path(p).resolve()))
+            if info is None:
+                todo.append(p)
+                continue
+            st = os.stat(p)
+            if st.st_size == info["size"] and st.st_mtime_ns == info["mtime_ns"]:
+                continue
+            if st.st_size != info["size"]:
+                todo.append(p)
+                continue
+            digest = sha256_file(p)
+            if digest != info["sha256"]:
+                todo.append(p)
+            else:
+                touched.append(file_info(p, digest))
+        if touched:
+            self._write_line({"schema_version": INDEX_SCHEMA, "refresh": touched})
+            for info in touched:
+                self.files[info["file"]] = info
+        return todo
+
+    def _write_line(self, entry: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self._write_line(entry)
+        self._load(entry)
+
+    def rewrite(self, entries: List[Dict[str, Any]]) -> None:
+        """Remplace atomiquement tout l'index (point de validation)."""
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.batches, self.files, self.renames, self.deletes = [], {}, [], []
+        for entry in entries:
+            self._load(entry)
+
+    def replay(self) -> None:
+        """Termine une compaction validée mais interrompue (idempotent), puis
+        l'efface de l'index : les noms temporaires, toujours les mêmes,
+        pourront servir à une compaction suivante sans être rejoués."""
+        if not (self.renames or self.deletes):
+            return
+        for tmp, final in self.renames:
+            if os.path.exists(tmp):
+                os.replace(tmp, final)
+        for path in self.deletes:
+            if os.path.exists(path):
+                os.unlink(path)
+        self.append({"schema_version": INDEX_SCHEMA, "renames": [], "deletes": []})
+
+
+def _fsync_path(path: Path) -> None:
+    with path.open("rb") as f:
+        os.fsync(f.fileno())
+
+
+def _has_output(out: Path, fmt: str) -> bool:
+    if fmt == "csv":
+        return out.exists() and out.stat().st_size > 0
+    return out.exists() and any(out.glob("part-*.parquet"))
+
+
+def _restore_outputs(out: Path, fmt: str, index: ResumeIndex) -> None:
+    """Remet la sortie dans l'état du dernier lot indexé (lot interrompu
+    supprimé, compaction non validée jetée, compaction validée terminée)."""
+    # seuls les temporaires de la compaction validée en attente sont gardés
+    committed = {str(Path(tmp).resolve()) for tmp, _ in index.renames}
+    stale = list(out.parent.glob(f".{out.name}.compact.tmp"))
+    if fmt == "parquet":
+        stale += out.glob(".part-*.compact.tmp")
+    for tmp in stale:
+        if str(tmp.resolve()) not in committed:
+            tmp.unlink()
+    index.replay()
+    if fmt == "csv":
+        size = int(index.batches[-1]["out_bytes"]) if index.batches else 0
+        if out.exists() and out.stat().st_size > size:
+            with out.open("r+b") as f:
+                f.truncate(size)
+    else:
+        known = {b.get("part") for b in index.batches}
+        for part in out.glob("part-*.parquet"):
+            if part.name not in known:
+                part.unlink()
+
+
+def _superseded(batches: List[Dict[str, Any]]) -> List[set]:
+    """Pour chaque lot, positions des lignes remplacées par un lot plus récent
+    (un fichier retraité : seule sa dernière ligne compte)."""
+    last: Dict[str, Tuple[int, int]] = {}
+    for b, entry in enumerate(batches):
+        for i, info in enumerate(entry.get("files", [])):
+            last[info["file"]] = (b, i)
+    return [
+        {
+            i
+            for i, info in enumerate(entry.get("files", []))
+            if last[info["file"]] != (b, i)
+        }
+        for b, entry in enumerate(batches)
+    ]
+
+
+def _compact(out: Path, fmt: str, index: ResumeIndex) -> int:
+    """Supprime les lignes remplacées ; renvoie leur nombre.
+
+    Les sorties compactées sont écrites à côté (*.compact.tmp), puis l'index
+    réécrit (validation) avec les renommages à faire, puis ceux-ci sont
+    joués : un crash avant la validation laisse l'ancien état, après, la
+    reprise rejoue les renommages (ResumeIndex.replay).
+    """
+    drops = _superseded(index.batches)
+    n_drop = sum(len(d) for d in drops)
+    if n_drop == 0:
+        return 0
+    entries: List[Dict[str, Any]] = []
+    renames: List[List[str]] = []
+    deletes: List[str] = []
+    if fmt == "csv":
+        # texte brut : pas de reconversion des valeurs
+        df = pd.read_csv(out, dtype=str, keep_default_na=False)
+        tmp = out.with_name(f".{out.name}.compact.tmp")
+        with tmp.open("w", newline="", encoding="utf-8") as f:
+            row0 = 0
+            for entry, drop in zip(index.batches, drops):
+                n = len(entry["files"])
+                keep = [i for i in range(n) if i not in drop]
+                chunk = df.iloc[[row0 + i for i in keep]]
+                chunk.to_csv(f, index=False, header=f.tell() == 0)
+                row0 += n
+                f.flush()
+                entries.append(
+                    entry
+                    | {
+                        "files": [entry["files"][i] for i in keep],
+                        "out_bytes": f.tell(),
+                    }
+                )
+            os.fsync(f.fileno())
+        renames.append([str(tmp), str(out)])
+    else:
+        for entry, drop in zip(index.batches, drops):
+            if not drop or entry.get("part") is None:
+                entries.append(entry)
+                continue
+            keep = [i for i in range(len(entry["files"])) if i not in drop]
+            part = out / entry["part"]
+            if keep:
+                tmp = out / f".{entry['part']}.compact.tmp"
+                df = pd.read_parquet(part).iloc[keep]
+                df.to_parquet(tmp, index=False)
+                _fsync_path(tmp)
+                renames.append([str(tmp), str(part)])
+            else:
+                deletes.append(str(part))
+            entries.append(
+                entry
+                | {
+                    "part": entry["part"] if keep else None,
+                    "files": [entry["files"][i] for i in keep],
+                }
+            )
+    # mtime à jour des fichiers seulement touchés (lignes "refresh")
+    in_batches = {info["file"]: info for e in entries for info in e["files"]}
+    refreshed = [
+        info for key, info in index.files.items() if in_batches.get(key) != info
+    ]
+    if refreshed:
+        entries.append({"schema_version": INDEX_SCHEMA, "refresh": refreshed})
+    entries.append(
+        {"schema_version": INDEX_SCHEMA, "renames": renames, "deletes": deletes}
+    )
+    index.rewrite(entries)
+    index.replay()
+    return n_drop
+
+
+def _write_batch(out: Path, fmt: str, rows: List[Dict[str, Any]], seq: int):
+    """Écrit un lot ; renvoie (part, out_bytes)."""
+    df = pd.DataFrame(rows)
+    if fmt == "csv":
+        header = not out.exists() or out.stat().st_size == 0
+        with out.open("a", newline="", encoding="utf-8") as f:
+            df.to_csv(f, index=False, header=header)
+            f.flush()
+            os.fsync(f.fileno())
+        return None, out.stat().st_size
+    name = f"part-{seq:06d}.parquet"
+    tmp = out / f".{name}.tmp"
+    df.to_parquet(tmp, index=False)
+    _fsync_path(tmp)
+    os.replace(tmp, out / name)
+    return name, None
+
+
+def stream_features(
+    paths: List[Path],
+    out: Path,
+    fmt: str = "csv",
+    index_path: Optional[Path] = None,
+    resume: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = 1,
+    extract: Callable[[Tuple[int, str]], Dict[str, Any]] = features_from_fits,
+) -> Dict[str, int]:
+    """Extraction incrémentale : écrit les features lot par lot.
+
+    - csv : un seul fichier, lots ajoutés en fin de fichier
+    - parquet : `out` est un dossier de fichiers part-NNNNNN.parquet
+      (un par lot, lisible avec pandas.read_parquet(out))
+
+    Avec resume, les fichiers déjà indexés et inchangés sont ignorés ; un
+    fichier modifié est retraité et sa nouvelle ligne remplace l'ancienne
+    (compaction en fin d'exécution). Une sortie existante sans index de
+    reprise n'est pas la nôtre : FileExistsError (la déplacer, ou
+    resume=False pour l'écraser).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format inconnu: {fmt}")
+    out = Path(out)
+    index_path = Path(index_path) if index_path else Path(f"{out}.index.jsonl")
+    if not resume:
+        if index_path.exists():
+            index_path.unlink()
+        if fmt == "csv" and out.exists():
+            out.unlink()
+        elif fmt == "parquet" and out.exists():
+            for part in out.glob("part-*.parquet"):
+                part.unlink()
+    if fmt == "csv":
+        out.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        out.mkdir(parents=True, exist_ok=True)
+
+    if not index_path.exists() and _has_output(out, fmt):
+        raise FileExistsError(
+            f"{out} existe sans index de reprise ({index_path}) : la déplacer, "
+            "ou relancer sans reprise (--no-resume) pour l'écraser"
+        )
+    index = ResumeIndex(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    index_path.touch()  # la sortie qui suit est désormais la nôtre
+    _restore_outputs(out, fmt, index)
+
+    # idx global (position dans la liste complète) : t de repli stable
+    position = {str(p): i for i, p in enumerate(paths)}
+    todo = index.pending([str(p) for p in paths])
+    job = partial(_process, extract)
+    seq = len(index.batches)
+    written = 0
+    for b0 in range(0, len(todo), batch_size):
+        jobs = [(position[p], p) for p in todo[b0 : b0 + batch_size]]
+        if workers == 1 or len(jobs) <= 1:
+            results = [job(j) for j in jobs]
+        else:
+            results = parallel_map(job, jobs, max_workers=workers)
+        seq += 1
+        part, out_bytes = _write_batch(out, fmt, [r for r, _ in results], seq)
+        index.append(
+            {
+                "schema_version": INDEX_SCHEMA,
+                "batch": seq,
+                "part": part,
+                "out_bytes": out_bytes,
+                "files": [info for _, info in results],
+            }
+        )
+        written += len(results)
+    replaced = _compact(out, fmt, index)
+    return {
+        "files_total": len(paths),
+        "files_processed": written,
+        "files_skipped": len(paths) - written,
+        "rows_replaced": replaced,
+        "batches": seq,
+    }
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(
-        description="Pré-traitement FITS optionnel: extraction descriptive vers CSV."
+        description="Pré-traitement FITS optionnel: extraction descriptive vers CSV ou Parquet."
     )
     ap.add_argument(
         "--input", type=str, required=True, help="Fichier FITS ou glob, ex data/*.fits"
     )
-    ap.add_argument("--out-csv", type=str, required=True, help="Chemin CSV de sortie")
+    out_group = ap.add_mutually_exclusive_group(required=True)
+    out_group.add_argument("--out-csv", type=str, help="Chemin CSV de sortie")
+    out_group.add_argument(
+        "--out-parquet", type=str, help="Dossier Parquet de sortie (un fichier par lot)"
+    )
+    ap.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Fichiers FITS par lot écrit",
+    )
+    ap.add_argument(
+        "--index",
+        type=str,
+        default="",
+        help="Index de reprise JSONL (défaut: <sortie>.index.jsonl)",
+    )
+    ap.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignorer l'index et réécrire la sortie depuis zéro",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Processus d'extraction (0 = nombre de CPU, 1 = séquentiel)",
+    )
     args = ap.parse_args()
 
     pattern = args.input
@@ -121,11 +571,22 @@ def main() -> None:
     if not paths:
         raise FileNotFoundError(f"Aucun FITS trouvé pour input={args.input}")
 
-    df = extract_features_from_fits_files(paths)
-    out = Path(args.out_csv)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out, index=False)
-    print(f"fits_features_csv={out.resolve()}")
+    _import_astropy()
+    fmt = "csv" if args.out_csv else "parquet"
+    out = Path(args.out_csv or args.out_parquet)
+    stats = stream_features(
+        paths,
+        out,
+        fmt=fmt,
+        index_path=Path(args.index) if args.index else None,
+        resume=not args.no_resume,
+        batch_size=args.batch_size,
+        workers=args.workers or None,
+    )
+    print(
+        f"fits_features_{fmt}={out.resolve()} processed={stats['files_processed']} "
+        f"skipped={stats['files_skipped']}"
+    )
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Iterable, List, Sequence
 
@@ -21,13 +22,7 @@ class ObserverLocation:
     height_m: float = 0.0
 
 
-def barycentric_correct_jd(
-    times_jd: Sequence[float], ra_deg: float, dec_deg: float, location: ObserverLocation
-) -> np.ndarray:
-    """Correction barycentrique avec astropy si installé.
-
-    Important: ce module est optionnel. Le core ne dépend pas de cette fonction.
-    """
+def _import_astropy_time():
     try:
         from astropy.coordinates import SkyCoord, EarthLocation  # type: ignore
         from astropy.time import Time  # type: ignore
@@ -37,11 +32,21 @@ def barycentric_correct_jd(
             "Dépendance manquante: astropy (coordinates/time/units).\n"
             "Ce module est optionnel et ne fait pas partie du core."
         ) from e
+    return SkyCoord, EarthLocation, Time, u
 
+
+def _barycentric_time(
+    times_jd: Sequence[float],
+    ra_deg: float,
+    dec_deg: float,
+    location: ObserverLocation,
+    scale: str = "utc",
+):
+    SkyCoord, EarthLocation, Time, u = _import_astropy_time()
     t = Time(
         np.asarray(times_jd, dtype=float),
         format="jd",
-        scale="utc",
+        scale=scale,
         location=EarthLocation(
             lon=location.lon_deg * u.deg,
             lat=location.lat_deg * u.deg,
@@ -51,5 +56,217 @@ def barycentric_correct_jd(
     target = SkyCoord(ra=ra_deg * u.deg, dec=dec_deg * u.deg, frame="icrs")
 
     ltt = t.light_travel_time(target, kind="barycentric")
-    t_bary = t.tdb + ltt
-    return np.asarray(t_bary.jd, dtype=float)
+    return t, t.tdb + ltt
+
+
+SECONDS_PER_DAY = 86400.0
+C_KM_S = 299792.458
+
+# Termes (amplitude s, période jours) de t_bary - TT, pour majorer la dérivée
+# quatrième et en déduire le pas de grille.
+_ANNUAL_S = 499.004784
+_ECC = 0.0167
+_YEAR_D = 365.25636
+_SIDEREAL_DAY_D = 0.99726957
+_BOUND_SAFETY = 2.0
+# Lagrange cubique (4 noeuds, intervalle central) : erreur <= 3/128 h^4 M4
+_LAGRANGE_C = 3.0 / 128.0
+
+GRID_CACHE_SIZE = 32
+MAX_REFINE = 4
+VERIFY_POINTS = 64
+
+
+def _exact_bary_minus_tt_days(
+    times_tt: np.ndarray, ra_deg: float, dec_deg: float, location: ObserverLocation
+) -> np.ndarray:
+    """t_bary - TT en jours, pour des JD en échelle TT (fonction lisse de TT)."""
+    t, t_bary = _barycentric_time(times_tt, ra_deg, dec_deg, location, scale="tt")
+    return np.asarray((t_bary.jd1 - t.jd1) + (t_bary.jd2 - t.jd2), dtype=float)
+
+
+def _tt_minus_utc_days(times_jd: np.ndarray) -> np.ndarray:
+    """TT - UTC en jours pour des JD UTC (32.184 s + secondes intercalaires).
+
+    Le JD UTC d'un jour à seconde intercalaire s'étire sur 86401 s (convention
+    ERFA/astropy) : l'écart croît linéairement de 1 s au cours de ce jour, il
+    n'est constant par morceaux qu'en dehors.
+    """
+    _import_astropy_time()
+    import erfa  # type: ignore  # installé avec astropy
+
+    utc = np.asarray(times_jd, dtype=float)
+    tai1, tai2 = erfa.utctai(utc, np.zeros_like(utc))
+    return (tai1 - utc) + tai2 + 32.184 / SECONDS_PER_DAY
+
+
+def fourth_derivative_bound(location: ObserverLocation) -> float:
+    """Majorant de |d^4 (t_bary - TT) / dt^4| en s / jour^4."""
+    r_km = 6378.137 + location.height_m / 1000.0
+    terms = [
+        (r_km * abs(np.cos(np.radians(location.lat_deg))) / C_KM_S, _SIDEREAL_DAY_D),
+        (_ANNUAL_S * (1.0 + _ECC), _YEAR_D),
+        (_ANNUAL_S * _ECC, _YEAR_D / 2.0),
+        (4671.0 / C_KM_S, 27.321661),  # barycentre Terre-Lune
+        (0.001657, _YEAR_D),  # TDB - TT
+    ]
+    return _BOUND_SAFETY * sum(amp * (2 * np.pi / per) ** 4 for amp, per in terms)
+
+
+def grid_step_days(location: ObserverLocation, max_error_s: float) -> float:
+    m4 = fourth_derivative_bound(location)
+    return float((max_error_s / (_LAGRANGE_C * m4)) ** 0.25)
+
+
+def _lagrange4(x: np.ndarray, start: float, h: float, y: np.ndarray) -> np.ndarray:
+    """Interpolation cubique locale sur la grille régulière start + k*h."""
+    u = (x - start) / h
+    i = np.clip(np.floor(u).astype(np.int64), 1, y.size - 3)
+    s = u - i
+    y0, y1, y2, y3 = y[i - 1], y[i], y[i + 1], y[i + 2]
+    return (
+        -s * (s - 1) * (s - 2) / 6.0 * y0
+        + (s + 1) * (s - 1) * (s - 2) / 2.0 * y1
+        - (s + 1) * s * (s - 2) / 2.0 * y2
+        + (s + 1) * s * (s - 1) / 6.0 * y3
+    )
+
+
+@dataclass
+class BarycentricGrid:
+    """Correction exacte sur une grille régulière, interpolée ailleurs.
+
+    On interpole la partie lisse (t_bary - TT) en fonction de TT : start,
+    step et les noeuds sont des JD TT. TT - UTC (secondes intercalaires,
+    jour étiré compris) est ajouté exactement, et sert à passer l'argument
+    UTC en TT. Interpoler en fonction du JD UTC ferait apparaître les
+    ruptures de pente du jour intercalaire dans la partie "lisse".
+    """
+
+    ra_deg: float
+    dec_deg: float
+    location: ObserverLocation
+    start: float
+    step: float
+    smooth_days: np.ndarray
+    measured_error_s: float = 0.0
+
+    @property
+    def stop(self) -> float:
+        return self.start + self.step * (self.smooth_days.size - 1)
+
+    def covers(self, tt_min: float, tt_max: float) -> bool:
+        return self.start + self.step <= tt_min and tt_max <= self.stop - 2 * self.step
+
+    def smooth_at(self, times_tt: np.ndarray) -> np.ndarray:
+        """t_bary - TT interpolé, pour des JD TT."""
+        t = np.asarray(times_tt, dtype=float)
+        return _lagrange4(t, self.start, self.step, self.smooth_days)
+
+    def correction_days(self, times_jd: np.ndarray) -> np.ndarray:
+        """t_bary - UTC en jours, pour des JD UTC."""
+        t = np.asarray(times_jd, dtype=float)
+        tt_minus_utc = _tt_minus_utc_days(t)
+        return self.smooth_at(t + tt_minus_utc) + tt_minus_utc
+
+
+def _build_grid(
+    ra_deg: float,
+    dec_deg: float,
+    location: ObserverLocation,
+    tt_min: float,
+    tt_max: float,
+    step: float,
+) -> BarycentricGrid:
+    # noeuds TT alignés sur des multiples du pas : grilles réutilisables
+    k0 = int(np.floor(tt_min / step)) - 1
+    k1 = int(np.ceil(tt_max / step)) + 2
+    nodes = np.arange(k0, k1 + 1, dtype=float) * step
+    smooth = _exact_bary_minus_tt_days(nodes, ra_deg, dec_deg, location)
+    grid = BarycentricGrid(ra_deg, dec_deg, location, nodes[0], step, smooth)
+
+    # contrôle aux milieux d'intervalles (pire cas de l'interpolation)
+    idx = np.unique(np.linspace(1, nodes.size - 3, VERIFY_POINTS).astype(np.int64))
+    mid = nodes[idx] + step / 2.0
+    exact = _exact_bary_minus_tt_days(mid, ra_deg, dec_deg, location)
+    err = np.max(np.abs(grid.smooth_at(mid) - exact)) * SECONDS_PER_DAY
+    grid.measured_error_s = float(err)
+    return grid
+
+
+_grid_cache: "OrderedDict[tuple, BarycentricGrid]" = OrderedDict()
+
+
+def barycentric_grid(
+    ra_deg: float,
+    dec_deg: float,
+    location: ObserverLocation,
+    t_min: float,
+    t_max: float,
+    max_error_s: float = 1e-6,
+) -> BarycentricGrid:
+    """Grille pour (cible, lieu, plage de temps UTC), depuis le cache si
+    possible.
+
+    Le pas vient de la borne analytique sur la dérivée quatrième ; l'erreur
+    est vérifiée aux milieux d'intervalles et le pas divisé par 2 si besoin.
+    """
+    # TT - UTC croissant : les bornes UTC donnent les bornes TT
+    tt_min, tt_max = np.array([t_min, t_max]) + _tt_minus_utc_days([t_min, t_max])
+    key = (float(ra_deg), float(dec_deg), location, float(max_error_s))
+    for ckey, grid in _grid_cache.items():
+        if ckey[:4] == key and grid.covers(tt_min, tt_max):
+            _grid_cache.move_to_end(ckey)
+            return grid
+
+    step = grid_step_days(location, max_error_s)
+    for _ in range(MAX_REFINE + 1):
+        grid = _build_grid(ra_deg, dec_deg, location, tt_min, tt_max, step)
+        if grid.measured_error_s <= max_error_s:
+            break
+        step /= 2.0
+    else:
+        raise RuntimeError(
+            f"interpolation barycentrique: erreur {grid.measured_error_s:.3g} s "
+            f"> {max_error_s:.3g} s après {MAX_REFINE} raffinements"
+        )
+    _grid_cache[key + (grid.start, grid.stop)] = grid
+    while len(_grid_cache) > GRID_CACHE_SIZE:
+        _grid_cache.popitem(last=False)
+    return grid
+
+
+def clear_grid_cache() -> None:
+    _grid_cache.clear()
+
+
+def barycentric_correct_jd(
+    times_jd: Sequence[float],
+    ra_deg: float,
+    dec_deg: float,
+    location: ObserverLocation,
+    method: str = "exact",
+    max_error_s: float = 1e-6,
+) -> np.ndarray:
+    """Correction barycentrique avec astropy si installé.
+
+    method="exact": astropy sur chaque timestamp.
+    method="interp": calcul exact sur une grille grossière (mise en cache par
+    cible, lieu et plage de temps) puis interpolation cubique, erreur
+    <= max_error_s. Pour les courbes de lumière de millions de points.
+
+    Important: ce module est optionnel. Le core ne dépend pas de cette fonction.
+    """
+    if method == "exact":
+        _t, t_bary = _barycentric_time(times_jd, ra_deg, dec_deg, location)
+        return np.asarray(t_bary.jd, dtype=float)
+    if method != "interp":
+        raise ValueError(f"method inconnue: {method}")
+
+    t = np.asarray(times_jd, dtype=float)
+    if t.size == 0:
+        return t.copy()
+    grid = barycentric_grid(
+        ra_deg, dec_deg, location, float(t.min()), float(t.max()), max_error_s
+    )
+    return t + grid.correction_days(t)
@@ -11,6 +11,8 @@ Dépendance:
 from __future__ import annotations
 import argparse, json, glob, os
 
+from shadow_loader import load_deltas
+
 
 def find_one(patterns):
     for pat in patterns:
@@ -32,11 +34,8 @@ def main():
     if not path:
         raise SystemExit("shadow_diff.json introuvable")
 
-    with open(path, "r", encoding="utf-8") as f:
-        sd = json.load(f)
-    d = sd["diff"]["column_changes"]["b"]["deltas"]
     # shape (n,1)
-    X = [[float(v)] for v in d.values()]
+    X = load_deltas(path, "b").reshape(-1, 1)
 
     try:
         from sklearn.ensemble import IsolationForest
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Banc de robustesse BareFlux : précision vs débit.
+
+Pour chaque combinaison scénario × taille × seed (pool de processus) :
+- génération des datasets (robustness_stress_tests.write_scenario)
+- orchestration étape par étape, comme run_modules.sh :
+  riftlens, nulltrace_previous, nulltrace_current, voidmark, manifest
+- bareflux_postprocess (score de dérive + statut CI)
+- comparaison du signal détecté (statut CI) avec expected_signal
+
+Chaque étape est chronométrée. Sorties dans --out-dir :
+  robustness_runs.json     un enregistrement par combinaison
+  robustness_matrix.json   agrégats par scénario × taille
+  robustness_matrix.csv
+
+Usage:
+  python tools/robustness_harness.py --sizes 240,2400 --seeds 7000,7001 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from robustness_stress_tests import write_scenario
+from synth_stream import DEFAULT_CHUNK_SIZE, SCENARIOS
+
+SCHEMA_VERSION = "bareflux.robustness_matrix.v1"
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+
+STAGES = (
+    "generate",
+    "riftlens",
+    "nulltrace_previous",
+    "nulltrace_current",
+    "voidmark",
+    "manifest",
+    "postprocess",
+)
+
+# statut CI de bareflux_postprocess -> signal détecté
+STATUS_SIGNAL = {"green": "stable", "yellow": "weak_shift", "red": "strong_shift"}
+
+
+class StageError(RuntimeError):
+    def __init__(self, stage: str, detail: str):
+        super().__init__(f"{stage}: {detail}")
+        self.stage = stage
+
+
+def default_modules_dir() -> Path:
+    if (REPO_DIR / "modules" / "RiftLens" / "src").is_dir():
+        return REPO_DIR / "modules"
+    return REPO_DIR.parent
+
+
+def module_env(modules_dir: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [
+            str((modules_dir / name / "src").resolve())
+            for name in ("RiftLens", "NullTrace", "VoidMark")
+        ]
+        + [str(REPO_DIR / "src"), env.get("PYTHONPATH", "")]
+    ).strip(os.pathsep)
+    return env
+
+
+def _newest(paths: List[Path]) -> Optional[Path]:
+    return max(paths, key=lambda p: p.stat().st_mtime) if paths else None
+
+
+def run_pipeline(
+    run_dir: Path,
+    modules_dir: Path,
+    score_config: Path,
+    corr_threshold: float,
+    timings: Dict[str, float],
+) -> Dict[str, Any]:
+    """Orchestration + postprocess sur run_dir/data ; renvoie le statut CI."""
+    env = module_env(modules_dir)
+    data = run_dir / "data"
+    out = run_dir / "out"
+    multi, prev, curr = (
+        data / "multi.csv",
+        data / "previous_shadow.csv",
+        data / "current.csv",
+    )
+
+    def stage(name: str, cmd: List[str]) -> None:
+        t0 = time.perf_counter()
+        r = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        timings[name] = time.perf_counter() - t0
+        if r.returncode != 0:
+            raise StageError(name, (r.stderr or r.stdout).strip()[-2000:])
+
+    py = sys.executable
+    stage(
+        "riftlens",
+        [py, "-m", "riftlens", str(multi), "--corr-threshold", str(corr_threshold)]
+        + ["--output-dir", str(out / "riftlens")],
+    )
+    stage(
+        "nulltrace_previous",
+        [py, "-m", "nulltrace", "snapshot", str(prev)]
+        + ["--output-dir", str(out / "nulltrace_prev")],
+    )
+    prev_manifest = _newest(
+        list((out / "nulltrace_prev" / "shadows").glob("*/manifest.json"))
+    )
+    if prev_manifest is None:
+        raise StageError("nulltrace_previous", "no shadow manifest produced")
+    stage(
+        "nulltrace_current",
+        [py, "-m", "nulltrace", "snapshot", str(curr)]
+        + ["--previous-shadow", str(prev_manifest)]
+        + ["--output-dir", str(out / "nulltrace_curr")],
+    )
+    stage(
+        "voidmark",
+        [py, "-m", "voidmark", str(out / "riftlens" / "graph_report.json")]
+        + ["--vault-dir", str(out / "vault")],
+    )
+    stage(
+        "manifest",
+        [py, "-m", "bareflux.orchestration", "write-manifest"]
+        + ["--out-dir", str(out), "--modules-dir", str(modules_dir)]
+        + ["--multi-csv", str(multi), "--current-csv", str(curr)]
+        + ["--previous-csv", str(prev), "--status", "PASS"],
+    )
+    stage(
+        "postprocess",
+        [py, str(TOOLS_DIR / "bareflux_postprocess.py")]
+        + ["--out", str(out), "--config", str(score_config)],
+    )
+    return json.loads((out / "bareflux_ci_status.json").read_text(encoding="utf-8"))
+
+
+def score_run(expected_signal: str, ci: Dict[str, Any]) -> Dict[str, Any]:
+    """Signal détecté vs attendu.
+
+    `correct` juge la détection binaire (dérive ou non) ; `exact` exige le
+    bon niveau (stable / weak_shift / strong_shift). correlation_break n'a
+    pas de niveau propre : seule la détection binaire compte.
+    """
+    formula = ci.get("score_formula")
+    score = ci.get(
+        "score_multi_column_v1"
+        if formula == "multi_column_drift_v1"
+        else "score_effective_v1"
+    )
+    detected = STATUS_SIGNAL.get(str(ci.get("status")), "unknown")
+    expected_drift = expected_signal != "stable"
+    detected_drift = detected not in ("stable", "unknown")
+    return {
+        "status": ci.get("status"),
+        "score": score,
+        "detected_signal": detected,
+        "correct": detected != "unknown" and detected_drift == expected_drift,
+        "exact": detected == expected_signal,
+    }
+
+
+def run_job(
+    out_dir: Path,
+    scenario: str,
+    n: int,
+    seed: int,
+    modules_dir: Path,
+    score_config: Path,
+    corr_threshold: float,
+    chunk_size: int,
+) -> Dict[str, Any]:
+    run_dir = out_dir / scenario / f"n_{n}" / f"seed_{seed}"
+    timings: Dict[str, float] = {}
+    rec: Dict[str, Any] = {
+        "scenario": scenario,
+        "n": n,
+        "seed": seed,
+        "expected_signal": SCENARIOS[scenario][0],
+        "path": str(run_dir),
+        "timings_s": timings,
+    }
+    try:
+        t0 = time.perf_counter()
+        write_scenario(run_dir / "data", n, seed, scenario, chunk_size)
+        timings["generate"] = time.perf_counter() - t0
+        ci = run_pipeline(run_dir, modules_dir, score_config, corr_threshold, timings)
+        rec.update(score_run(rec["expected_signal"], ci))
+        rec["ok"] = True
+    except StageError as exc:
+        rec.update(ok=False, failed_stage=exc.stage, error=str(exc))
+    except Exception as exc:  # noqa: BLE001 - une combinaison ne bloque pas le banc
+        failed = "generate" if "generate" not in timings else "harness"
+        rec.update(ok=False, failed_stage=failed, error=repr(exc))
+    rec["total_s"] = sum(timings.values())
+    rec["rows_per_s"] = n / rec["total_s"] if rec["total_s"] > 0 else None
+    return rec
+
+
+def aggregate(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Matrice précision/débit par scénario × taille."""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for r in runs:
+        groups.setdefault((r["scenario"], r["n"]), []).append(r)
+    order = {name: i for i, name in enumerate(SCENARIOS)}
+    rows = []
+    for (scenario, n), rs in sorted(
+        groups.items(), key=lambda kv: (order.get(kv[0][0], len(order)), kv[0][1])
+    ):
+        ok = [r for r in rs if r.get("ok")]
+        scores = [r["score"] for r in ok if r["score"] is not None]
+        row: Dict[str, Any] = {
+            "scenario": scenario,
+            "n": n,
+            "expected_signal": rs[0]["expected_signal"],
+            "runs": len(rs),
+            "failed": len(rs) - len(ok),
+            "accuracy": sum(bool(r["correct"]) for r in ok) / len(ok) if ok else None,
+            "exact_rate": sum(bool(r["exact"]) for r in ok) / len(ok) if ok else None,
+            "score_median": statistics.median(scores) if scores else None,
+            "total_s_median": (
+                statistics.median(r["total_s"] for r in ok) if ok else None
+            ),
+            "rows_per_s_median": (
+                statistics.median(r["rows_per_s"] for r in ok) if ok else None
+            ),
+        }
+        for st in STAGES:
+            vals = [r["timings_s"][st] for r in ok if st in r["timings_s"]]
+            row[f"{st}_s_median"] = statistics.median(vals) if vals else None
+        rows.append(row)
+    return rows
+
+
+def _csv_list(s: str, cast) -> list:
+    return [cast(x.strip()) for x in s.split(",") if x.strip()]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Run the BareFlux pipeline over robustness scenarios."
+    )
+    ap.add_argument("--out-dir", default="_ci_out/robustness_harness")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--sizes", default="240", help="Comma-separated row counts")
+    ap.add_argument("--seeds", default="7000", help="Comma-separated base seeds")
+    ap.add_argument("--modules-dir", default="")
+    ap.add_argument("--config", default=str(TOOLS_DIR / "config_score.json"))
+    ap.add_argument("--corr-threshold", type=float, default=0.6)
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    scenarios = _csv_list(args.scenarios, str)
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}")
+    sizes = _csv_list(args.sizes, int)
+    seeds = _csv_list(args.seeds, int)
+
+    modules_dir = (
+        Path(args.modules_dir).resolve() if args.modules_dir else default_modules_dir()
+    )
+    missing = [
+        name
+        for name in ("RiftLens", "NullTrace", "VoidMark")
+        if not (modules_dir / name / "src").is_dir()
+    ]
+    if missing:
+        raise SystemExit(
+            f"Modules not found in {modules_dir}: expected {{{','.join(missing)}}}/src"
+        )
+
+    out = Path(args.out_dir).resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    score_config = Path(args.config).resolve()
+
+    # même convention que robustness_stress_tests : seed + index du scénario
+    index = {name: i for i, name in enumerate(SCENARIOS)}
+    jobs = [
+        (scenario, n, seed + index[scenario])
+        for scenario in scenarios
+        for n in sizes
+        for seed in seeds
+    ]
+
+    t0 = time.perf_counter()
+    runs: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        futures = [
+            ex.submit(
+                run_job,
+                out,
+                scenario,
+                n,
+                seed,
+                modules_dir,
+                score_config,
+                args.corr_threshold,
+                args.chunk_size,
+            )
+            for scenario, n, seed in jobs
+        ]
+        for fut in as_completed(futures):
+            rec = fut.result()
+            runs.append(rec)
+            state = "ok" if rec["ok"] else f"FAILED at {rec['failed_stage']}"
+            print(f"{rec['scenario']} n={rec['n']} seed={rec['seed']}: {state}")
+    wall_s = time.perf_counter() - t0
+    runs.sort(key=lambda r: (index[r["scenario"]], r["n"], r["seed"]))
+
+    matrix = aggregate(runs)
+    meta = {
+        "schema_version": SCHEMA_VERSION,
+        "out_dir": str(out),
+        "modules_dir": str(modules_dir),
+        "workers": args.workers,
+        "wall_s": wall_s,
+        "runs_total": len(runs),
+        "runs_failed": sum(not r["ok"] for r in runs),
+    }
+    (out / "robustness_runs.json").write_text(
+        json.dumps(meta | {"runs": runs}, indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    (out / "robustness_matrix.json").write_text(
+        json.dumps(meta | {"matrix": matrix}, indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    pd.DataFrame(matrix).to_csv(out / "robustness_matrix.csv", index=False)
+    print(f"robustness_matrix={out / 'robustness_matrix.json'}")
+    return 1 if meta["runs_failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,91 +5,62 @@ import json
 from pathlib import Path
 from typing import Any
 
-import numpy as np
 import pandas as pd
 
-
-def corr(a: np.ndarray, b: np.ndarray) -> float:
-    mask = np.isfinite(a) & np.isfinite(b)
-    if mask.sum() < 3:
-        return 0.0
-    return float(np.corrcoef(a[mask], b[mask])[0, 1])
-
-
-def write_csv(path: Path, df: pd.DataFrame) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False)
-
-
-def scenario_frame(
-    n: int, seed: int, scenario: str
-) -> tuple[pd.DataFrame, dict[str, Any]]:
-    rng = np.random.default_rng(seed)
-    t = np.arange(n)
-    mid = n // 2
-    x = rng.normal(0, 1, n)
-    y = x + rng.normal(0, 0.10, n)
-    z = rng.normal(0, 1, n)
-    a = rng.normal(0, 1, n)
-    b = rng.normal(0, 1, n)
-
-    expected_signal = "stable"
-    severity = 0.0
-
-    if scenario == "null_stable":
-        pass
-    elif scenario == "noise_low":
-        y = y + rng.normal(0, 0.15, n)
-        severity = 0.15
-    elif scenario == "noise_high":
-        y = y + rng.normal(0, 0.60, n)
-        severity = 0.60
-    elif scenario == "missing_5pct":
-        mask = rng.choice(n, size=max(1, int(0.05 * n)), replace=False)
-        y[mask] = np.nan
-        severity = 0.05
-    elif scenario == "outliers_2pct":
-        mask = rng.choice(n, size=max(1, int(0.02 * n)), replace=False)
-        y[mask] = y[mask] + rng.normal(6, 1, size=len(mask))
-        severity = 0.02
-    elif scenario == "weak_shift":
-        y[mid:] = y[mid:] + 0.25
-        a[mid:] = a[mid:] + 0.25
-        expected_signal = "weak_shift"
-        severity = 0.25
-    elif scenario == "strong_shift":
-        y[mid:] = rng.normal(0, 1, n - mid)
-        a[mid:] = a[mid:] + 1.00
-        b[mid:] = b[mid:] * 1.50
-        expected_signal = "strong_shift"
-        severity = 1.00
-    elif scenario == "correlation_break":
-        y[mid:] = rng.normal(0, 1, n - mid)
-        expected_signal = "correlation_break"
-        severity = 1.00
-    else:
-        raise ValueError(f"unknown scenario: {scenario}")
-
-    multi = pd.DataFrame({"t": t, "x": x, "y": y, "z": z})
-    prev = pd.DataFrame({"t": t, "a": a, "b": b})
-    curr = prev.copy()
-    if expected_signal != "stable":
-        curr.loc[mid:, "a"] = curr.loc[mid:, "a"] + severity
-        curr.loc[mid:, "b"] = curr.loc[mid:, "b"] * (1.0 + min(severity, 1.0) / 2.0)
-
-    meta = {
+from synth_stream import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    SCENARIOS,
+    TruthAccumulator,
+    concat_blocks,
+    iter_blocks,
+    scenario_maker,
+    write_datasets,
+)
+
+
+def truth_meta(
+    n: int, seed: int, scenario: str, truth: TruthAccumulator
+) -> dict[str, Any]:
+    expected_signal, severity = SCENARIOS[scenario]
+    return {
         "scenario": scenario,
         "expected_signal": expected_signal,
         "severity": severity,
         "n": n,
         "seed": seed,
-        "corr_xy_first_half": corr(x[:mid], y[:mid]),
-        "corr_xy_second_half": corr(x[mid:], y[mid:]),
-        "mean_shift_a": float(
-            curr["a"].iloc[mid:].mean() - prev["a"].iloc[mid:].mean()
-        ),
-    }
-    return (multi, prev, curr), meta
+    } | truth.meta()
+
+
+def scenario_frame(
+    n: int, seed: int, scenario: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> tuple[tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame], dict[str, Any]]:
+    """Scénario en mémoire (multi, previous, current) et sa vérité."""
+    blocks = list(iter_blocks(*scenario_maker(n, seed, scenario, chunk_size)))
+    truth = TruthAccumulator(n)
+    for block in blocks:
+        truth.update(*block)
+    return concat_blocks(iter(blocks)), truth_meta(n, seed, scenario, truth)
+
+
+def write_scenario(
+    scenario_dir: Path,
+    n: int,
+    seed: int,
+    scenario: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fmt: str = "csv",
+    workers: int = 1,
+) -> dict[str, Any]:
+    """Écrit le scénario en flux (mémoire bornée par chunk_size) + truth.json."""
+    truth = TruthAccumulator(n)
+    make_block, count = scenario_maker(n, seed, scenario, chunk_size)
+    write_datasets(scenario_dir, make_block, count, fmt, truth, workers)
+    meta = truth_meta(n, seed, scenario, truth)
+    (scenario_dir / "truth.json").write_text(
+        json.dumps(meta, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    return meta
 
 
 def main() -> int:
@@ -99,31 +70,33 @@ def main() -> int:
     parser.add_argument("--out-dir", default="_ci_out/robustness")
     parser.add_argument("--n", type=int, default=240)
     parser.add_argument("--seed", type=int, default=7000)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows per generated block (bounds memory)",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes generating blocks"
+    )
     args = parser.parse_args()
 
     out = Path(args.out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    scenarios = [
-        "null_stable",
-        "noise_low",
-        "noise_high",
-        "missing_5pct",
-        "outliers_2pct",
-        "weak_shift",
-        "strong_shift",
-        "correlation_break",
-    ]
+    scenarios = list(SCENARIOS)
 
     rows: list[dict[str, Any]] = []
     for i, scenario in enumerate(scenarios):
-        frames, meta = scenario_frame(args.n, args.seed + i, scenario)
-        multi, prev, curr = frames
         scenario_dir = out / scenario
-        write_csv(scenario_dir / "multi.csv", multi)
-        write_csv(scenario_dir / "previous_shadow.csv", prev)
-        write_csv(scenario_dir / "current.csv", curr)
-        (scenario_dir / "truth.json").write_text(
-            json.dumps(meta, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        meta = write_scenario(
+            scenario_dir,
+            args.n,
+            args.seed + i,
+            scenario,
+            args.chunk_size,
+            args.format,
+            args.workers,
         )
         rows.append(meta | {"path": str(scenario_dir)})
 
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Chargement partagé des deltas NullTrace (shadow_diff.json) en tableaux NumPy.
+
+- lit diff.column_changes.<col>.deltas sans matérialiser tout le document
+  (parsing incrémental via ijson si installé, sinon json.load en repli)
+- accumule les valeurs dans un tampon float64 (array('d')), sans liste de
+  floats Python ; les clés de lignes ne sont construites que si demandées
+- sidecar binaire optionnel (shadow_diff.deltas.npz) : relu en priorité
+  s'il est plus récent que le JSON
+
+Usage (depuis un autre outil de tools/):
+  from shadow_loader import load_column_deltas
+  deltas = load_column_deltas("_bareflux_out/.../shadow_diff.json", ["a", "b"])
+
+Dépendance optionnelle (streaming):
+  pip install ijson
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SIDECAR_SUFFIX = ".deltas.npz"
+
+# Préfixe JSON des deltas : diff -> column_changes -> <col> -> deltas -> <row>
+_DELTAS_DEPTH = 5
+
+
+def sidecar_path(shadow_path: str) -> str:
+    """shadow_diff.json -> shadow_diff.deltas.npz (même dossier)."""
+    root, _ext = os.path.splitext(shadow_path)
+    return root + SIDECAR_SUFFIX
+
+
+def _sidecar_is_fresh(shadow_path: str, npz_path: str) -> bool:
+    try:
+        return os.path.getmtime(npz_path) >= os.path.getmtime(shadow_path)
+    except OSError:
+        return False
+
+
+def _as_float(v) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(v) -> float:
+    """Valeur JSON -> float ; NaN si non numérique (écartée ensuite)."""
+    x = _as_float(v)
+    return math.nan if x is None else x
+
+
+def _drop_missing(
+    keys: Optional[List[str]], arr: np.ndarray
+) -> Tuple[Optional[List[str]], np.ndarray]:
+    # null, texte non numérique et NaN : même traitement, la ligne est ignorée
+    keep = ~np.isnan(arr)
+    if keep.all():
+        return keys, arr
+    if keys is not None:
+        keys = [k for k, ok in zip(keys, keep) if ok]
+    return keys, arr[keep]
+
+
+def _iter_ijson(
+    fh, wanted: Optional[set], with_keys: bool
+) -> Iterator[Tuple[str, Optional[List[str]], np.ndarray]]:
+    """Machine à états sur les événements ijson.
+
+    Le chemin est suivi explicitement (pas via les préfixes pointés d'ijson)
+    pour rester correct si un nom de colonne contient un point. Les valeurs
+    sont accumulées dans un tampon array('d') (8 octets par valeur, pas
+    d'objet float Python conservé) ; les clés seulement si with_keys.
+    """
+    import ijson  # type: ignore
+
+    path: List[Optional[str]] = []
+    col: Optional[str] = None
+    keys: Optional[List[str]] = None
+    buf = array("d")
+
+    for _prefix, event, value in ijson.parse(fh, use_float=True):
+        if event == "map_key":
+            path[-1] = value
+            continue
+        if event in ("start_map", "start_array"):
+            if (
+                event == "start_map"
+                and len(path) == _DELTAS_DEPTH - 1
+                and path[0] == "diff"
+                and path[1] == "column_changes"
+                and path[3] == "deltas"
+                and (wanted is None or path[2] in wanted)
+            ):
+                col = path[2]
+                keys = [] if with_keys else None
+                buf = array("d")
+            path.append(None if event == "start_map" else "item")
+            continue
+        if event in ("end_map", "end_array"):
+            path.pop()
+            # fin du dict deltas d'une colonne
+            if col is not None and len(path) == _DELTAS_DEPTH - 1:
+                arr = np.frombuffer(buf, dtype=np.float64) if buf else np.empty(0)
+                yield (col,) + _drop_missing(keys, arr)
+                col, keys = None, None
+            continue
+        if col is not None and len(path) == _DELTAS_DEPTH:
+            if keys is not None:
+                keys.append(str(path[4]))
+            buf.append(value if type(value) is float else _to_float(value))
+
+
+def _iter_json(
+    path: str, wanted: Optional[set], with_keys: bool
+) -> Iterator[Tuple[str, Optional[List[str]], np.ndarray]]:
+    with open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    col_changes = ((obj or {}).get("diff") or {}).get("column_changes") or {}
+    for col, ch in col_changes.items():
+        if wanted is not None and col not in wanted:
+            continue
+        deltas = (ch or {}).get("deltas") or {}
+        if isinstance(deltas, dict):
+            arr = np.fromiter(
+                (_to_float(v) for v in deltas.values()),
+                dtype=np.float64,
+                count=len(deltas),
+            )
+            keys = [str(k) for k in deltas] if with_keys else None
+            yield (col,) + _drop_missing(keys, arr)
+
+
+def iter_column_deltas(
+    shadow_path: str, columns: Optional[Iterable[str]] = None, with_keys: bool = True
+) -> Iterator[Tuple[str, Optional[List[str]], np.ndarray]]:
+    """Itère (colonne, clés de lignes, deltas float64) sur les deltas du JSON.
+
+    Les valeurs non numériques sont déjà écartées ; clés None si
+    with_keys=False (elles ne sont alors pas construites).
+    """
+    wanted = set(columns) if columns is not None else None
+    try:
+        import ijson  # type: ignore  # noqa: F401
+    except Exception:
+        yield from _iter_json(shadow_path, wanted, with_keys)
+        return
+    with open(shadow_path, "rb") as f:
+        yield from _iter_ijson(f, wanted, with_keys)
+
+
+def _load_sidecar(
+    npz_path: str, columns: Optional[Iterable[str]], with_keys: bool
+) -> Dict[str, object]:
+    out: Dict[str, object] = {}
+    with np.load(npz_path, allow_pickle=False) as z:
+        names = [n[len("values/") :] for n in z.files if n.startswith("values/")]
+        wanted = names if columns is None else [c for c in columns if c in names]
+        for col in wanted:
+            vals = z[f"values/{col}"]
+            if with_keys:
+                out[col] = (z[f"keys/{col}"].tolist(), vals)
+            else:
+                out[col] = vals
+    return out
+
+
+def write_sidecar(shadow_path: str) -> str:
+    """Écrit le sidecar binaire de toutes les colonnes (clés + valeurs)."""
+    arrays: Dict[str, np.ndarray] = {}
+    for col, keys, vals in iter_column_deltas(shadow_path):
+        arrays[f"values/{col}"] = vals
+        arrays[f"keys/{col}"] = np.asarray(keys, dtype=np.str_)
+    npz_path = sidecar_path(shadow_path)
+    tmp = npz_path + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, npz_path)
+    return npz_path
+
+
+def load_column_deltas(
+    shadow_path: str,
+    columns: Optional[Iterable[str]] = None,
+    with_keys: bool = False,
+    use_sidecar: bool = True,
+) -> Dict[str, object]:
+    """Deltas par colonne, en float64.
+
+    - columns=None : toutes les colonnes de diff.column_changes
+    - with_keys=True : valeurs retournées sous forme (clés de lignes, tableau)
+    - les colonnes absentes ne figurent pas dans le résultat
+    - les valeurs non numériques (null, texte, NaN) sont ignorées
+    """
+    columns = list(columns) if columns is not None else None
+    npz_path = sidecar_path(shadow_path)
+    if use_sidecar and _sidecar_is_fresh(shadow_path, npz_path):
+        return _load_sidecar(npz_path, columns, with_keys)
+
+    out: Dict[str, object] = {}
+    for col, keys, vals in iter_column_deltas(shadow_path, columns, with_keys):
+        out[col] = (keys, vals) if with_keys else vals
+    return out
+
+
+def load_deltas(shadow_path: str, col: str) -> np.ndarray:
+    """Deltas d'une seule colonne (tableau vide si absente)."""
+    arr = load_column_deltas(shadow_path, [col]).get(col)
+    return arr if arr is not None else np.empty(0, dtype=np.float64)
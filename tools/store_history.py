@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 """
-Append un point de monitoring dans un history JSONL.
+Append un point de monitoring dans le history segmenté (voir history_store.py).
 Usage:
-  python tools/store_history.py --out _bareflux_out --history .bareflux_history.jsonl --keep 10
+  python tools/store_history.py --out _bareflux_out --history .bareflux_history --keep 10
+  python tools/store_history.py --out _bareflux_out --history .bareflux_history --trend-csv _bareflux_out/bareflux_trend.csv
+
+Reprise d'un ancien history JSONL (une fois, store vide):
+  python tools/store_history.py --history .bareflux_history --import-jsonl .bareflux_history.jsonl
+
+Si --history désigne encore l'ancien fichier JSONL, il est migré en place: le
+fichier devient <history>.legacy et un store est créé au même chemin.
+
+Rétention: --keep garde au moins `keep` points (segments entiers), soit
+jusqu'à keep + segment_size - 1 points, et non plus exactement `keep`.
 """
 
 from __future__ import annotations
@@ -12,8 +22,9 @@ import glob
 import json
 import os
 import time
-from pathlib import Path
-from statistics import mean, pstdev
+
+from history_store import HistoryStore, migrate_legacy
+from shadow_loader import load_column_deltas
 
 
 def load_json(p):
@@ -33,10 +44,32 @@ def find_one(patterns):
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--out", default="_bareflux_out")
-    ap.add_argument("--history", default=".bareflux_history.jsonl")
-    ap.add_argument("--keep", type=int, default=10)
+    ap.add_argument("--history", default=".bareflux_history", help="Store directory")
+    ap.add_argument(
+        "--keep",
+        type=int,
+        default=10,
+        help="Keep at least this many points (whole segments are dropped)",
+    )
+    ap.add_argument(
+        "--segment-size",
+        type=int,
+        default=0,
+        help="Points per segment (0 = auto, keep // 4)",
+    )
+    ap.add_argument("--import-jsonl", default="", help="Legacy JSONL to import")
+    ap.add_argument("--trend-csv", default="", help="Also write the trend CSV")
     args = ap.parse_args()
 
+    segment_size = args.segment_size or max(1, args.keep // 4)
+    if os.path.isfile(args.history):
+        store = migrate_legacy(args.history, segment_size=segment_size, keep=args.keep)
+        print("Migrated legacy history", args.history, "n=", len(store))
+    else:
+        store = HistoryStore(args.history)
+    if args.import_jsonl and len(store) == 0 and os.path.exists(args.import_jsonl):
+        store.import_jsonl(args.import_jsonl, segment_size=segment_size, keep=args.keep)
+
     out_dir = args.out
 
     ci = {}
@@ -53,12 +86,10 @@ def main():
     mean_b = None
     std_b = None
     if shadow_path:
-        sd = load_json(shadow_path)
         try:
-            d = sd["diff"]["column_changes"]["b"]["deltas"]
-            vals = [float(v) for v in d.values()]
-            mean_b = mean(vals) if vals else None
-            std_b = pstdev(vals) if len(vals) > 1 else 0.0
+            vals = load_column_deltas(shadow_path, ["b"])["b"]
+            mean_b = float(vals.mean()) if vals.size else None
+            std_b = float(vals.std()) if vals.size > 1 else 0.0
         except Exception:
             pass
 
@@ -72,20 +103,11 @@ def main():
         "n_edges": graph.get("n_edges"),
     }
 
-    Path(os.path.dirname(args.history) or ".").mkdir(parents=True, exist_ok=True)
-
-    with open(args.history, "a", encoding="utf-8") as f:
-        f.write(json.dumps(point) + "\n")
-
-    with open(args.history, "r", encoding="utf-8") as f:
-        lines = f.read().splitlines()
-
-    if len(lines) > args.keep:
-        lines = lines[-args.keep :]
-        with open(args.history, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n")
+    n = store.append(point, segment_size=segment_size, keep=args.keep)
+    if args.trend_csv:
+        store.write_csv(args.trend_csv)
 
-    print("OK", args.history, "n=", len(lines))
+    print("OK", args.history, "n=", n)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Génération synthétique par blocs pour les datasets de charge BareFlux.
+
+- chaque bloc de `chunk_size` lignes a son propre générateur, dérivé de
+  SeedSequence(seed).spawn(n_blocks) : un bloc ne dépend que de
+  (seed, chunk_size, index du bloc), la génération est reproductible
+  et la mémoire bornée par un bloc, quelle que soit la taille totale
+- écriture CSV ou Parquet en flux (un bloc à la fois) ; les blocs étant
+  indépendants, génération et formatage CSV peuvent être répartis sur un
+  pool de processus (`workers`), l'écriture restant dans l'ordre
+- les métadonnées de vérité (corrélations x/y par moitié, décalage moyen
+  de a) sont accumulées bloc par bloc
+
+Parquet nécessite pyarrow (extra `stream`).
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+FORMATS = ("csv", "parquet")
+
+# scénario -> (expected_signal, severity)
+SCENARIOS: Dict[str, Tuple[str, float]] = {
+    "null_stable": ("stable", 0.0),
+    "noise_low": ("stable", 0.15),
+    "noise_high": ("stable", 0.60),
+    "missing_5pct": ("stable", 0.05),
+    "outliers_2pct": ("stable", 0.02),
+    "weak_shift": ("weak_shift", 0.25),
+    "strong_shift": ("strong_shift", 1.00),
+    "correlation_break": ("correlation_break", 1.00),
+}
+
+Columns = Dict[str, np.ndarray]
+
+
+Block = Tuple[Columns, Columns, Columns]
+
+
+def n_blocks(n: int, chunk_size: int) -> int:
+    if chunk_size < 1:
+        raise ValueError("chunk_size doit être >= 1")
+    return -(-n // chunk_size)
+
+
+def block_rng(seed: int, i: int) -> np.random.Generator:
+    """Générateur du bloc i : identique à SeedSequence(seed).spawn(...)[i]."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+
+
+def synth_block(n: int, seed: int, chunk_size: int, i: int) -> Block:
+    """Bloc i des datasets bloc 4 (multi, previous, current) : décorrélation
+    de y et rupture contrôlée de a/b à partir de n // 2."""
+    rng = block_rng(seed, i)
+    start = i * chunk_size
+    t = np.arange(start, min(n, start + chunk_size))
+    m = t.size
+    after = t >= n // 2
+    x = rng.normal(0, 1, m)
+    y = x + rng.normal(0, 0.1, m)
+    z = rng.normal(0, 1, m)
+    y[after] = rng.normal(0, 1, int(after.sum()))
+    a = rng.normal(0, 1, m)
+    b = rng.normal(0, 1, m)
+    a_curr = np.where(after, a + 0.25, a)
+    b_curr = np.where(after, b * 1.10, b)
+    return (
+        {"t": t, "x": x, "y": y, "z": z},
+        {"t": t, "a": a, "b": b},
+        {"t": t, "a": a_curr, "b": b_curr},
+    )
+
+
+def scenario_block(n: int, seed: int, scenario: str, chunk_size: int, i: int) -> Block:
+    """Bloc i (multi, previous, current) d'un scénario de robustesse.
+
+    Les fractions (valeurs manquantes, outliers) s'appliquent par bloc.
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"unknown scenario: {scenario}")
+    expected_signal, severity = SCENARIOS[scenario]
+    rng = block_rng(seed, i)
+    start = i * chunk_size
+    t = np.arange(start, min(n, start + chunk_size))
+    m = t.size
+    after = t >= n // 2
+    n_after = int(after.sum())
+    x = rng.normal(0, 1, m)
+    y = x + rng.normal(0, 0.10, m)
+    z = rng.normal(0, 1, m)
+    a = rng.normal(0, 1, m)
+    b = rng.normal(0, 1, m)
+
+    if scenario in ("noise_low", "noise_high"):
+        y += rng.normal(0, severity, m)
+    elif scenario == "missing_5pct":
+        mask = rng.choice(m, size=max(1, int(0.05 * m)), replace=False)
+        y[mask] = np.nan
+    elif scenario == "outliers_2pct":
+        mask = rng.choice(m, size=max(1, int(0.02 * m)), replace=False)
+        y[mask] += rng.normal(6, 1, size=len(mask))
+    elif scenario == "weak_shift":
+        y[after] += 0.25
+        a[after] += 0.25
+    elif scenario == "strong_shift":
+        y[after] = rng.normal(0, 1, n_after)
+        a[after] += 1.00
+        b[after] *= 1.50
+    elif scenario == "correlation_break":
+        y[after] = rng.normal(0, 1, n_after)
+
+    a_curr, b_curr = a, b
+    if expected_signal != "stable":
+        a_curr = np.where(after, a + severity, a)
+        b_curr = np.where(after, b * (1.0 + min(severity, 1.0) / 2.0), b)
+    return (
+        {"t": t, "x": x, "y": y, "z": z},
+        {"t": t, "a": a, "b": b},
+        {"t": t, "a": a_curr, "b": b_curr},
+    )
+
+
+def synth_maker(n: int, seed: int, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """(make_block, n_blocks) pour write_datasets / iter_blocks."""
+    return partial(synth_block, n, seed, chunk_size), n_blocks(n, chunk_size)
+
+
+def scenario_maker(
+    n: int, seed: int, scenario: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    if scenario not in SCENARIOS:
+        raise ValueError(f"unknown scenario: {scenario}")
+    return (
+        partial(scenario_block, n, seed, scenario, chunk_size),
+        n_blocks(n, chunk_size),
+    )
+
+
+def iter_blocks(make_block: Callable[[int], Block], count: int) -> Iterator[Block]:
+    for i in range(count):
+        yield make_block(i)
+
+
+class CorrAccumulator:
+    """Corrélation de Pearson en flux (paires finies uniquement)."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.syy = self.sxy = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> None:
+        ok = np.isfinite(x) & np.isfinite(y)
+        x, y = x[ok], y[ok]
+        self.n += int(x.size)
+        self.sx += float(x.sum())
+        self.sy += float(y.sum())
+        self.sxx += float(x @ x)
+        self.syy += float(y @ y)
+        self.sxy += float(x @ y)
+
+    def value(self) -> float:
+        if self.n < 3:
+            return 0.0
+        cxx = self.sxx - self.sx * self.sx / self.n
+        cyy = self.syy - self.sy * self.sy / self.n
+        cxy = self.sxy - self.sx * self.sy / self.n
+        den = math.sqrt(cxx * cyy)
+        return cxy / den if den > 0 else float("nan")
+
+
+class TruthAccumulator:
+    """Métadonnées de vérité d'un scénario, accumulées bloc par bloc."""
+
+    def __init__(self, n: int) -> None:
+        self.mid = n // 2
+        self.first = CorrAccumulator()
+        self.second = CorrAccumulator()
+        self.n_after = 0
+        self.sum_a_prev = 0.0
+        self.sum_a_curr = 0.0
+
+    def update(self, multi: Columns, prev: Columns, curr: Columns) -> None:
+        after = multi["t"] >= self.mid
+        self.first.update(multi["x"][~after], multi["y"][~after])
+        self.second.update(multi["x"][after], multi["y"][after])
+        self.n_after += int(after.sum())
+        self.sum_a_prev += float(prev["a"][after].sum())
+        self.sum_a_curr += float(curr["a"][after].sum())
+
+    def meta(self) -> Dict[str, Any]:
+        shift = (
+            (self.sum_a_curr - self.sum_a_prev) / self.n_after
+            if self.n_after
+            else float("nan")
+        )
+        return {
+            "corr_xy_first_half": self.first.value(),
+            "corr_xy_second_half": self.second.value(),
+            "mean_shift_a": shift,
+        }
+
+
+class TableWriter:
+    """Écriture d'un tableau bloc par bloc (CSV avec en-tête unique, ou
+    Parquet avec un row group par bloc)."""
+
+    def __init__(self, path: Path, fmt: str = "csv") -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"format inconnu: {fmt}")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.rows = 0
+        self._f = None
+        self._pq = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "csv":
+            self._f = self.path.open("w", newline="", encoding="utf-8")
+
+    def write(self, cols: Columns, rendered: Optional[str] = None) -> None:
+        """Ajoute un bloc ; `rendered` = CSV déjà formaté (sans en-tête)."""
+        if self.fmt == "csv":
+            if self.rows == 0:
+                self._f.write(",".join(cols) + "\n")
+            self._f.write(render_csv(cols) if rendered is None else rendered)
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as exc:
+                raise SystemExit(
+                    "Parquet output requires pyarrow (pip install bareflux[stream])"
+                ) from exc
+            table = pa.Table.from_pydict(cols)
+            if self._pq is None:
+                self._pq = pq.ParquetWriter(self.path, table.schema)
+            self._pq.write_table(table)
+        self.rows += len(next(iter(cols.values())))
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        if self._pq is not None:
+            self._pq.close()
+            self._pq = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def render_csv(cols: Columns) -> str:
+    """Lignes CSV d'un bloc, sans en-tête (formatage pandas)."""
+    return pd.DataFrame(cols).to_csv(index=False, header=False, lineterminator="\n")
+
+
+def _make_and_render(make_block: Callable[[int], Block], fmt: str, i: int):
+    block = make_block(i)
+    rendered = [render_csv(cols) for cols in block] if fmt == "csv" else None
+    return block, rendered
+
+
+DATASET_NAMES = ("multi", "previous_shadow", "current")
+
+
+def write_datasets(
+    out_dir: Path,
+    make_block: Callable[[int], Block],
+    count: int,
+    fmt: str = "csv",
+    truth: Optional[TruthAccumulator] = None,
+    workers: int = 1,
+) -> Dict[str, Path]:
+    """Écrit multi / previous_shadow / current en flux dans out_dir.
+
+    Avec workers > 1, les blocs sont générés (et formatés en CSV) dans un
+    pool de processus ; au plus 2 * workers blocs sont en vol.
+    """
+    out_dir = Path(out_dir)
+    paths = {name: out_dir / f"{name}.{fmt}" for name in DATASET_NAMES}
+    writers = [TableWriter(paths[name], fmt) for name in DATASET_NAMES]
+
+    def consume(block: Block, rendered: Optional[List[str]]) -> None:
+        for j, (writer, cols) in enumerate(zip(writers, block)):
+            writer.write(cols, rendered[j] if rendered else None)
+        if truth is not None:
+            truth.update(*block)
+
+    try:
+        if workers <= 1 or count <= 1:
+            for block in iter_blocks(make_block, count):
+                consume(block, None)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                job = partial(_make_and_render, make_block, fmt)
+                pending = []
+                for i in range(count):
+                    pending.append(ex.submit(job, i))
+                    if len(pending) >= 2 * workers:
+                        consume(*pending.pop(0).result())
+                for fut in pending:
+                    consume(*fut.result())
+    finally:
+        for writer in writers:
+            writer.close()
+    return paths
+
+
+def concat_blocks(
+    blocks: Iterator[Block],
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Version en mémoire (petits n) : concatène les blocs en DataFrames."""
+    parts: Tuple[list, list, list] = ([], [], [])
+    for block in blocks:
+        for acc, cols in zip(parts, block):
+            acc.append(cols)
+    frames = []
+    for acc in parts:
+        keys = acc[0].keys() if acc else ()
+        frames.append(
+            pd.DataFrame({k: np.concatenate([c[k] for c in acc]) for k in keys})
+        )
+    return frames[0], frames[1], frames[2]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Analyse de tendances incrémentale sur le history BareFlux (history_store.py).
+
+Pour chaque métrique (score, mean_b, std_b, n_edges):
+- moyenne glissante sur les `window` derniers points
+- EWMA (alpha)
+- détection de ruptures par CUSUM bilatéral sur la valeur standardisée
+  par rapport à la fenêtre précédente (k = dérive tolérée, h = seuil)
+
+La fenêtre de référence a un écart-type plancher (relatif à sa moyenne, et
+absolu) : après une fenêtre constante, une variation infime ne déclenche pas
+de rupture, une variation franche oui.
+
+L'état (fenêtres, EWMA, sommes CUSUM, dernier point traité) est persisté en
+JSON: chaque exécution ne traite que les points postérieurs au dernier point
+traité, dans l'ordre (ts_utc, rang d'insertion dans le store) ; deux runs de
+même ts à la seconde près sont donc tous deux intégrés.
+
+Usage:
+  python tools/trend_engine.py --history .bareflux_history --out _bareflux_out/bareflux_trend_state.json
+  python tools/trend_engine.py --history .bareflux_history --points-csv _bareflux_out/bareflux_trend_points.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from history_store import SEQ_KEY, HistoryStore
+
+METRICS = ("score", "mean_b", "std_b", "n_edges")
+STATE_NAME = "trend_state.json"
+SCHEMA_VERSION = "bareflux.trend_state.v1"
+MAX_CHANGE_POINTS = 50
+
+DEFAULT_PARAMS = {"window": 5, "alpha": 0.3, "cusum_k": 0.5, "cusum_h": 4.0}
+
+# écart-type plancher de la fenêtre : max(sd, SIGMA_REL_FLOOR*|mu|, SIGMA_ABS_FLOOR)
+SIGMA_REL_FLOOR = 1e-3
+SIGMA_ABS_FLOOR = 1e-9
+
+
+def _new_metric_state() -> Dict[str, Any]:
+    return {
+        "n": 0,
+        "window": [],
+        "rolling_mean": None,
+        "ewma": None,
+        "cusum_pos": 0.0,
+        "cusum_neg": 0.0,
+        "last_value": None,
+        "change_points": [],
+    }
+
+
+def new_state(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "params": dict(params),
+        "last_ts": None,
+        "last_seq": None,
+        "n_points": 0,
+        "metrics": {m: _new_metric_state() for m in METRICS},
+    }
+
+
+def _mean_std(xs: List[float]) -> tuple[float, float]:
+    mu = sum(xs) / len(xs)
+    var = sum((x - mu) ** 2 for x in xs) / len(xs)
+    return mu, math.sqrt(var)
+
+
+def update_metric(
+    st: Dict[str, Any], x: float, ts: Optional[str], params: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Intègre une observation. Retourne les indicateurs du point."""
+    window: List[float] = st["window"]
+    change = None
+
+    # CUSUM : référence = fenêtre AVANT le point (au moins 2 valeurs)
+    if len(window) >= 2:
+        mu, sd = _mean_std(window)
+        z = (x - mu) / max(sd, SIGMA_REL_FLOOR * abs(mu), SIGMA_ABS_FLOOR)
+        k = float(params["cusum_k"])
+        st["cusum_pos"] = max(0.0, st["cusum_pos"] + z - k)
+        st["cusum_neg"] = max(0.0, st["cusum_neg"] - z - k)
+        h = float(params["cusum_h"])
+        if st["cusum_pos"] > h or st["cusum_neg"] > h:
+            change = "up" if st["cusum_pos"] > h else "down"
+            st["change_points"].append({"ts_utc": ts, "direction": change, "value": x})
+            del st["change_points"][:-MAX_CHANGE_POINTS]
+            # nouveau régime : la fenêtre repart du point de rupture
+            st["cusum_pos"] = st["cusum_neg"] = 0.0
+            window.clear()
+
+    window.append(x)
+    del window[: -int(params["window"])]
+    alpha = float(params["alpha"])
+    st["ewma"] = x if st["ewma"] is None else alpha * x + (1 - alpha) * st["ewma"]
+    st["rolling_mean"] = sum(window) / len(window)
+    st["last_value"] = x
+    st["n"] += 1
+    return {
+        "value": x,
+        "rolling_mean": st["rolling_mean"],
+        "ewma": st["ewma"],
+        "change_point": change,
+    }
+
+
+def _is_new(state: Dict[str, Any], ts: Optional[str], seq) -> bool:
+    last_ts, last_seq = state["last_ts"], state.get("last_seq")
+    if last_ts is None:
+        return True
+    if ts is None or ts < last_ts:
+        return False
+    if ts > last_ts:
+        return True
+    # même ts : départage par rang d'insertion (sans rang : déjà traité)
+    return seq is not None and last_seq is not None and list(seq) > list(last_seq)
+
+
+def update_state(state: Dict[str, Any], rows) -> List[Dict[str, Any]]:
+    """Intègre les points de `rows` postérieurs au dernier point traité.
+
+    Ordre (ts_utc, row[SEQ_KEY]) : voir HistoryStore.query(with_seq=True).
+    """
+    params = state["params"]
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        ts = row.get("ts_utc")
+        seq = row.get(SEQ_KEY)
+        if not _is_new(state, ts, seq):
+            continue
+        point: Dict[str, Any] = {"ts_utc": ts}
+        for m in METRICS:
+            v = row.get(m)
+            if v is None:
+                continue
+            try:
+                x = float(v)
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(x):
+                continue
+            for key, val in update_metric(state["metrics"][m], x, ts, params).items():
+                point[f"{m}_{key}"] = val
+        if ts is not None:
+            state["last_ts"], state["last_seq"] = ts, seq
+        state["n_points"] += 1
+        out.append(point)
+    return out
+
+
+def load_state(path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+    if path.exists():
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("params") == params:
+            return state
+        # paramètres changés : l'état incrémental n'est plus valide
+    return new_state(params)
+
+
+def save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+POINT_FIELDS = ["ts_utc"] + [
+    f"{m}_{k}"
+    for m in METRICS
+    for k in ("value", "rolling_mean", "ewma", "change_point")
+]
+
+
+def append_points_csv(
+    path: Path, points: List[Dict[str, Any]], truncate: bool = False
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new_file = truncate or not path.exists()
+    with path.open("w" if new_file else "a", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=POINT_FIELDS)
+        if new_file:
+            w.writeheader()
+        for p in points:
+            w.writerow({k: p.get(k) for k in POINT_FIELDS})
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--history", default=".bareflux_history", help="Store directory")
+    ap.add_argument(
+        "--state", default="", help=f"State JSON (default: <history>/{STATE_NAME})"
+    )
+    ap.add_argument("--out", default="", help="Copy of the trend state for dashboards")
+    ap.add_argument("--points-csv", default="", help="Append per-point analytics")
+    ap.add_argument("--window", type=int, default=DEFAULT_PARAMS["window"])
+    ap.add_argument("--alpha", type=float, default=DEFAULT_PARAMS["alpha"])
+    ap.add_argument("--cusum-k", type=float, default=DEFAULT_PARAMS["cusum_k"])
+    ap.add_argument("--cusum-h", type=float, default=DEFAULT_PARAMS["cusum_h"])
+    args = ap.parse_args()
+
+    params = {
+        "window": args.window,
+        "alpha": args.alpha,
+        "cusum_k": args.cusum_k,
+        "cusum_h": args.cusum_h,
+    }
+    try:
+        store = HistoryStore(args.history)
+    except ValueError as e:
+        ap.error(str(e))
+    state_path = Path(args.state) if args.state else store.root / STATE_NAME
+    state = load_state(state_path, params)
+    rebuilt = state["n_points"] == 0
+
+    points = update_state(state, store.query(since=state["last_ts"], with_seq=True))
+    save_state(state_path, state)
+    if args.out:
+        save_state(Path(args.out), state)
+    if args.points_csv and points:
+        append_points_csv(Path(args.points_csv), points, truncate=rebuilt)
+
+    print("OK", state_path, "new_points=", len(points), "n=", state["n_points"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,55 @@
 #!/usr/bin/env python3
 """
-Convertit un history JSONL en CSV de tendances.
+Exporte le history BareFlux en CSV de tendances.
 Usage:
-  python tools/trend_report.py --history .bareflux_history.jsonl --out _bareflux_out/bareflux_trend.csv
+  python tools/trend_report.py --history .bareflux_history --out _bareflux_out/bareflux_trend.csv
+  python tools/trend_report.py --history .bareflux_history --since 2026-01-01T00:00:00Z --out trend.csv
+
+--history accepte aussi un ancien history JSONL (fichier).
 """
 
 from __future__ import annotations
 
 import argparse
-import csv
 import json
+import os
 
+from history_store import HistoryStore, write_rows_csv
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--history", default=".bareflux_history.jsonl")
-    ap.add_argument("--out", default="bareflux_trend.csv")
-    args = ap.parse_args()
 
-    rows = []
-    with open(args.history, "r", encoding="utf-8") as f:
+def iter_legacy_jsonl(path, since=None, until=None):
+    with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            rows.append(json.loads(line))
+            row = json.loads(line)
+            ts = row.get("ts_utc")
+            if since is not None and (ts is None or ts < since):
+                continue
+            if until is not None and (ts is None or ts > until):
+                continue
+            yield row
+
 
-    keys = ["ts_utc", "score", "status", "mean_b", "std_b", "n_nodes", "n_edges"]
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--history", default=".bareflux_history")
+    ap.add_argument("--out", default="bareflux_trend.csv")
+    ap.add_argument("--since", default=None, help="ts_utc lower bound (inclusive)")
+    ap.add_argument("--until", default=None, help="ts_utc upper bound (inclusive)")
+    args = ap.parse_args()
 
-    with open(args.out, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k) for k in keys})
+    if os.path.isfile(args.history):
+        n = write_rows_csv(
+            args.out, iter_legacy_jsonl(args.history, args.since, args.until)
+        )
+    else:
+        n = HistoryStore(args.history).write_csv(
+            args.out, since=args.since, until=args.until
+        )
 
-    print("OK", args.out, "n=", len(rows))
+    print("OK", args.out, "n=", n)
 
 
 if __name__ == "__main__":